@@ -1,25 +1,25 @@
-from django.contrib.auth.models import User
-from django.db.models import Avg
-from rest_framework import generics, mixins, status
-from rest_framework.authtoken.models import Token
+from django.db.models import Avg, Count
+from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
+from core.async_views import AsyncAPIView
 from offer_app.models import Offer
 from profile_app.models import Profile
 from review_app.models import Review
 
-class BaseInfoView(mixins.ListModelMixin, generics.GenericAPIView):
+class BaseInfoView(AsyncAPIView):
     """
     API view for retrieving basic platform statistics.
 
     Provides aggregated data including review count, average rating,
     business profile count, and offer count. Accessible without authentication.
+    Implemented as an async view so it does not block a worker under ASGI.
     """
 
     permission_classes = [AllowAny]
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         """
         Get platform statistics.
 
@@ -31,11 +31,14 @@ class BaseInfoView(mixins.ListModelMixin, generics.GenericAPIView):
         Returns:
             Response: JSON with review_count, average_rating, business_profile_count, offer_count
         """
-        review_count = Review.objects.all().count()
-        average_rating = Review.objects.aggregate(Avg('rating'))['rating__avg'] or 0
-        business_profile_count = Profile.objects.filter(type='business').count()
-        offer_count = Offer.objects.all().count()
-        
+        review_stats = await Review.objects.aaggregate(
+            review_count=Count('id'), average_rating=Avg('rating'))
+        business_profile_count = await Profile.objects.filter(type='business').acount()
+        offer_count = await Offer.objects.acount()
+
+        review_count = review_stats['review_count']
+        average_rating = review_stats['average_rating'] or 0
+
         data = {
             'review_count': review_count,
             'average_rating': round(average_rating, 2),
@@ -363,3 +363,40 @@ class BaseInfoUnhappyPathTests(APITestCase):
         self.assertEqual(response1.status_code, status.HTTP_200_OK)
         self.assertEqual(response2.status_code, status.HTTP_200_OK)
         self.assertEqual(response3.status_code, status.HTTP_200_OK)
+
+
+class BaseInfoAsyncTests(APITestCase):
+    """Tests for the base-info endpoint served through the ASGI handler."""
+
+    def setUp(self):
+        """Set up a business user with one offer and one review."""
+        self.business_user = User.objects.create_user(
+            username='business', password='testpass123'
+        )
+        Profile.objects.create(user=self.business_user, type='business')
+        self.customer_user = User.objects.create_user(
+            username='customer', password='testpass123'
+        )
+        Profile.objects.create(user=self.customer_user, type='customer')
+        Offer.objects.create(
+            user=self.business_user, title="Test Offer", description="Test"
+        )
+        Review.objects.create(
+            reviewer=self.customer_user,
+            business_user=self.business_user,
+            rating=4,
+            description="Gut"
+        )
+        self.url = reverse('base-info')
+
+    async def test_get_base_info_through_async_client(self):
+        """Test that the async view returns the same statistics under ASGI."""
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {
+            'review_count': 1,
+            'average_rating': 4.0,
+            'business_profile_count': 1,
+            'offer_count': 1,
+        })
@@ -0,0 +1,123 @@
+"""
+Compare throughput and tail latency of the WSGI and ASGI serving modes.
+
+Boots gunicorn once with sync workers (core.wsgi) and once with Uvicorn
+workers (core.asgi) against the same seeded SQLite database and drives the
+async read endpoints (base-info, offer details, order counts, profile detail)
+with the same number of concurrent keep-alive clients.
+
+Usage:
+    python -m benchmarks.asgi_vs_wsgi --concurrency 200 --duration 20
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.loadgen import RequestSpec, dump, run_load, summarize
+from benchmarks.server import BASE_DIR, benchmark_env, gunicorn, manage
+
+SEED_SCRIPT = """
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from offer_app.models import Offer, OfferDetail
+from order_app.models import Order
+from profile_app.models import Profile
+from review_app.models import Review
+
+business = User.objects.create_user(username='bench_business', password='bench')
+Profile.objects.create(user=business, type='business')
+customer = User.objects.create_user(username='bench_customer', password='bench')
+Profile.objects.create(user=customer, type='customer')
+token = Token.objects.create(user=customer)
+for index in range(50):
+    offer = Offer.objects.create(user=business, title=f'Offer {index}', description='Benchmark offer')
+    for tier, price in (('basic', 100), ('standard', 200), ('premium', 300)):
+        detail = OfferDetail.objects.create(
+            offer=offer, title=f'{tier} {index}', revisions=1, delivery_time_in_days=5,
+            price=price + index, features=['Feature A', 'Feature B'], offer_type=tier)
+        Order.objects.create(offer_detail=detail, customer_user=customer, business_user=business)
+Review.objects.create(reviewer=customer, business_user=business, rating=5, description='Great')
+print(token.key, business.id, OfferDetail.objects.order_by('id').first().id)
+"""
+
+
+def seed(env):
+    """
+    Create and seed a fresh benchmark database.
+
+    Args:
+        env: Environment mapping pointing at the benchmark database
+
+    Returns:
+        tuple: (auth token, business user id, first offer detail id)
+    """
+    manage(env, 'migrate', '--noinput', '-v', '0')
+    output = subprocess.run(
+        [sys.executable, 'manage.py', 'shell', '-c', SEED_SCRIPT],
+        cwd=BASE_DIR, env=env, check=True, capture_output=True, text=True).stdout
+    token, business_id, detail_id = output.split()[-3:]
+    return token, int(business_id), int(detail_id)
+
+
+def request_mix(token, business_id, detail_id):
+    """
+    Build the request generator for the read endpoints.
+
+    Args:
+        token: Auth token of the seeded customer
+        business_id: ID of the seeded business user
+        detail_id: ID of the first seeded offer detail
+
+    Returns:
+        callable: next_request(client, iteration) -> RequestSpec
+    """
+    auth = {'Authorization': f'Token {token}'}
+    specs = [
+        RequestSpec('base-info', 'GET', '/api/base-info/'),
+        RequestSpec('offer-details', 'GET', f'/api/offerdetails/{detail_id}/', auth),
+        RequestSpec('order-count-details', 'GET', f'/api/order-count/{business_id}/', auth),
+        RequestSpec('completed-order-count-details', 'GET',
+                    f'/api/completed-order-count/{business_id}/', auth),
+        RequestSpec('profile-detail', 'GET', f'/api/profile/{business_id}/', auth),
+    ]
+
+    def next_request(client, iteration):
+        return specs[(client + iteration) % len(specs)]
+
+    return next_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--warmup', type=float, default=3.0)
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--output', help='Write the JSON result to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = benchmark_env(Path(tmp) / 'bench.sqlite3')
+        next_request = request_mix(*seed(env))
+
+        result = {'concurrency': args.concurrency, 'workers': args.workers, 'modes': {}}
+        for mode in ('wsgi', 'asgi'):
+            with gunicorn(env, mode=mode, workers=args.workers) as base_url:
+                samples, elapsed = asyncio.run(run_load(
+                    base_url, next_request, args.concurrency, args.duration, args.warmup))
+            result['modes'][mode] = summarize(samples, elapsed)
+
+    dump(result, args.output)
+    for mode, summary in result['modes'].items():
+        total = summary['total']
+        print(f"{mode}: {total['rps']} req/s, p50 {total['p50_ms']} ms, "
+              f"p99 {total['p99_ms']} ms", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    os.chdir(BASE_DIR)
+    main()
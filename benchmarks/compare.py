@@ -0,0 +1,75 @@
+"""
+Compare two load test results route by route.
+
+Prints throughput and latency percentiles of a baseline and a candidate
+result (as written by ``--output`` of the benchmarks) side by side with the
+relative change.
+
+Usage:
+    python -m benchmarks.compare results/main.json results/branch.json
+"""
+import argparse
+import json
+
+METRICS = ('rps', 'p50_ms', 'p95_ms', 'p99_ms')
+
+
+def change(before, after):
+    """
+    Format the relative change between two values.
+
+    Args:
+        before: Baseline value
+        after: Candidate value
+
+    Returns:
+        str: Signed percentage or 'n/a'
+    """
+    if not before:
+        return 'n/a'
+    return f'{(after - before) / before * 100:+.1f}%'
+
+
+def compare(baseline, candidate):
+    """
+    Build comparison rows for all routes present in either result.
+
+    Args:
+        baseline: Result dict with 'total' and 'routes'
+        candidate: Result dict with 'total' and 'routes'
+
+    Returns:
+        list: (route, metric, baseline value, candidate value, change) tuples
+    """
+    rows = []
+    routes = {'total': (baseline['total'], candidate['total'])}
+    for route in sorted(set(baseline['routes']) | set(candidate['routes'])):
+        routes[route] = (baseline['routes'].get(route, {}), candidate['routes'].get(route, {}))
+    for route, (before, after) in routes.items():
+        for metric in METRICS:
+            old, new = before.get(metric), after.get(metric)
+            rows.append((route, metric, old, new,
+                         change(old, new) if old is not None and new is not None else 'n/a'))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding='utf-8') as handle:
+        baseline = json.load(handle)
+    with open(args.candidate, encoding='utf-8') as handle:
+        candidate = json.load(handle)
+
+    print(f"{'route':<24}{'metric':<9}{baseline.get('revision') or 'baseline':>12}"
+          f"{candidate.get('revision') or 'candidate':>12}{'change':>10}")
+    for route, metric, old, new, delta in compare(baseline, candidate):
+        print(f'{route:<24}{metric:<9}{old if old is not None else "-":>12}'
+              f'{new if new is not None else "-":>12}{delta:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare bytes on the wire and CPU cost of the response encodings.
+
+Seeds a small dataset, renders real API payloads in-process (a page of 100
+offers, a business user's order list and 50 offer details) and compresses
+each with gzip, Brotli and Zstandard at the per-request level and at the
+level used for precompressed cache entries. Reports the compressed size,
+the compression ratio and the compression and decompression time. br and
+zstd are skipped when brotli or zstandard are not installed.
+
+Usage:
+    python -m benchmarks.compression --users 1000 --repeat 50
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.json_render import best_of, payloads
+from benchmarks.loadgen import dump
+from benchmarks.server import setup_django
+
+
+def decompressor(encoding):
+    """
+    Return a one-shot decompression function for an encoding.
+
+    Args:
+        encoding: 'gzip', 'br' or 'zstd'
+
+    Returns:
+        callable: bytes -> bytes
+    """
+    from core import compression
+
+    if encoding == 'br':
+        return compression.brotli.decompress
+    if encoding == 'zstd':
+        return compression.zstandard.ZstdDecompressor().decompress
+    import gzip
+    return gzip.decompress
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=1000, help='Dataset size (generate_dataset --users)')
+    parser.add_argument('--repeat', type=int, default=50, help='Calls per timing round')
+    parser.add_argument('--output', help='Write the JSON result to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(SQLITE_PATH=Path(tmp) / 'bench.sqlite3', ALLOWED_HOSTS='testserver', DEBUG='False')
+        from django.core.management import call_command
+
+        from core import compression
+        from core.fast_json import FastJSONRenderer
+
+        call_command('migrate', '--noinput', verbosity=0)
+        call_command('generate_dataset', '--users', str(args.users), verbosity=0)
+        bodies = {name: FastJSONRenderer().render(data) for name, data in payloads().items()}
+
+    encodings = [name for name in ('gzip', 'br', 'zstd') if compression.SUPPORTED[name]]
+    result = {'encodings': encodings, 'payloads': {}}
+    for name, body in bodies.items():
+        entry = result['payloads'][name] = {'identity_bytes': len(body)}
+        for encoding in encodings:
+            decompress = decompressor(encoding)
+            for mode, levels in (('request', compression.LEVELS),
+                                 ('precompressed', compression.PRECOMPRESS_LEVELS)):
+                level = levels[encoding]
+                compressed = compression.compress(body, encoding, level)
+                assert decompress(compressed) == body
+                entry[f'{encoding}-{mode}'] = {
+                    'level': level,
+                    'bytes': len(compressed),
+                    'ratio': round(len(body) / len(compressed), 2),
+                    'compress_us': best_of(lambda: compression.compress(body, encoding, level), args.repeat),
+                    'decompress_us': best_of(lambda: decompress(compressed), args.repeat),
+                }
+
+    dump(result, args.output)
+    page = result['payloads']['offers-page-100']
+    for key, stats in page.items():
+        if isinstance(stats, dict):
+            print(f"offers-page-100 {key}: {page['identity_bytes']} -> {stats['bytes']} bytes, "
+                  f"{stats['compress_us']} us", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Microbenchmark of JSON rendering and parsing with DRF and orjson.
+
+Seeds a small dataset, serializes real API payloads in-process (a page of
+100 offers with nested details and features, a business user's order list
+and offer details) and times DRF's JSONRenderer against the orjson based
+FastJSONRenderer on the same data. Request bodies of order checkouts and
+offer creation are parsed with both parsers. Every payload is checked to
+render to identical bytes before it is timed.
+
+Usage:
+    python -m benchmarks.json_render --users 1000 --repeat 200
+"""
+import argparse
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.loadgen import dump
+from benchmarks.server import setup_django
+
+
+def best_of(function, repeat, rounds=5):
+    """
+    Time a callable.
+
+    Args:
+        function: Callable without arguments
+        repeat: Calls per round
+        rounds: Number of rounds; the fastest one counts
+
+    Returns:
+        float: Microseconds per call
+    """
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        timings.append((time.perf_counter() - started) / repeat)
+    return round(min(timings) * 1e6, 1)
+
+
+def payloads():
+    """
+    Serialize realistic API responses.
+
+    Returns:
+        dict: Payload name -> serialized data (as passed to the renderer)
+    """
+    from django.contrib.auth.models import User
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from offer_app.api.serializers import OfferDetailSerializer
+    from offer_app.api.views import OffersViewSet
+    from offer_app.models import OfferDetail
+    from order_app.api.views import OrderViewSet
+
+    factory = APIRequestFactory()
+    offers = OffersViewSet.as_view({'get': 'list'})(factory.get('/api/offers/', {'page_size': 100}))
+    business = User.objects.filter(profile__type='business', business_orders__isnull=False).first()
+    request = factory.get('/api/orders/')
+    force_authenticate(request, user=business)
+    orders = OrderViewSet.as_view({'get': 'list'})(request)
+    details = OfferDetailSerializer(OfferDetail.objects.order_by('id')[:50], many=True).data
+    return {
+        'offers-page-100': offers.data,
+        'orders-list': orders.data,
+        'offer-details-50': details,
+    }
+
+
+def request_bodies():
+    """
+    Build JSON request bodies as sent by the frontend.
+
+    Returns:
+        dict: Body name -> bytes
+    """
+    checkout = {'offer_detail_ids': list(range(1, 51))}
+    offer = {
+        'title': 'Grafikdesign-Paket', 'description': 'Logo, Visitenkarten und Flyer ' * 10,
+        'details': [
+            {'title': tier, 'revisions': index, 'delivery_time_in_days': 3 + index,
+             'price': 100 * (index + 1), 'features': ['Logo Design', 'Visitenkarte', 'Flyer'],
+             'offer_type': tier}
+            for index, tier in enumerate(('basic', 'standard', 'premium'))
+        ],
+    }
+    return {'orders-checkout': json.dumps(checkout).encode(),
+            'offers-create': json.dumps(offer).encode()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=1000, help='Dataset size (generate_dataset --users)')
+    parser.add_argument('--repeat', type=int, default=200, help='Calls per timing round')
+    parser.add_argument('--output', help='Write the JSON result to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(SQLITE_PATH=Path(tmp) / 'bench.sqlite3', ALLOWED_HOSTS='testserver', DEBUG='False')
+        from django.core.management import call_command
+        from rest_framework.parsers import JSONParser
+        from rest_framework.renderers import JSONRenderer
+
+        from core import fast_json
+
+        call_command('migrate', '--noinput', verbosity=0)
+        call_command('generate_dataset', '--users', str(args.users), verbosity=0)
+        data = payloads()
+
+        result = {'orjson': fast_json.orjson.__version__ if fast_json.orjson else None,
+                  'render': {}, 'parse': {}}
+        stdlib, fast = JSONRenderer(), fast_json.FastJSONRenderer()
+        for name, payload in data.items():
+            expected = stdlib.render(payload)
+            if fast.render(payload) != expected:
+                raise SystemExit(f'{name}: renderers disagree')
+            drf_us = best_of(lambda: stdlib.render(payload), args.repeat)
+            fast_us = best_of(lambda: fast.render(payload), args.repeat)
+            result['render'][name] = {'bytes': len(expected), 'drf_us': drf_us, 'fast_us': fast_us,
+                                      'speedup': round(drf_us / fast_us, 1)}
+
+        for name, body in request_bodies().items():
+            drf_us = best_of(lambda: JSONParser().parse(io.BytesIO(body)), args.repeat * 10)
+            fast_us = best_of(lambda: fast_json.FastJSONParser().parse(io.BytesIO(body)), args.repeat * 10)
+            result['parse'][name] = {'bytes': len(body), 'drf_us': drf_us, 'fast_us': fast_us,
+                                     'speedup': round(drf_us / fast_us, 1)}
+
+    dump(result, args.output)
+    speedups = [entry['speedup'] for entry in result['render'].values()]
+    print(f"render speedup: median {statistics.median(speedups)}x", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Measure how load shedding protects cheap requests from expensive ones.
+
+Boots gunicorn twice against the same seeded database, once with
+``LOAD_SHEDDING=False`` and once with it enabled. In both runs a group of
+clients sends uncached offer searches with large pages while the other
+clients request base-info. The result compares the base-info latency and
+how many searches were rejected with 503.
+
+Usage:
+    python -m benchmarks.load_shedding --users 5000 --heavy 20 --light 10 --duration 20 --expensive-ms 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.load_suite import SEARCH_TERMS, git_revision, prepare
+from benchmarks.loadgen import RequestSpec, dump, run_load, summarize
+from benchmarks.server import BASE_DIR, benchmark_env, gunicorn
+
+
+def request_mix(heavy, seed):
+    """
+    Build a generator sending searches from the first ``heavy`` clients.
+
+    The random ``min_price`` keeps the searches out of the offer list cache.
+
+    Args:
+        heavy: Number of clients sending expensive searches
+        seed: Seed of the request generator
+
+    Returns:
+        callable: next_request(client, iteration) -> RequestSpec
+    """
+    rng = random.Random(seed)
+
+    def next_request(client, iteration):
+        if client < heavy:
+            return RequestSpec(
+                'offers-search', 'GET',
+                f'/api/offers/?search={rng.choice(SEARCH_TERMS)}&page_size=100'
+                f'&min_price={rng.randint(0, 10000)}&ordering=-min_price')
+        return RequestSpec('base-info', 'GET', '/api/base-info/')
+
+    return next_request
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=5000, help='Dataset size (generate_dataset --users)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', help='Reuse this seeded SQLite file instead of a fresh one')
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--heavy', type=int, default=20, help='Clients sending expensive searches')
+    parser.add_argument('--light', type=int, default=10, help='Clients requesting base-info')
+    parser.add_argument('--expensive-ms', type=float, default=100.0,
+                        help='LOAD_SHED_EXPENSIVE_MS of the shedding run')
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--warmup', type=float, default=5.0)
+    parser.add_argument('--output', help='Write the JSON result to this file')
+    args = parser.parse_args()
+
+    result = {'revision': git_revision(), 'workers': args.workers,
+              'heavy': args.heavy, 'light': args.light, 'expensive_ms': args.expensive_ms, 'runs': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Path(args.database) if args.database else Path(tmp) / 'bench.sqlite3'
+        env = benchmark_env(database, MEDIA_ROOT=Path(tmp) / 'media')
+        prepare(env, args.users, args.seed, pool=1, reuse=bool(args.database) and database.exists())
+        for enabled in (False, True):
+            run_env = {**env, 'LOAD_SHEDDING': str(enabled),
+                       'LOAD_SHED_EXPENSIVE_MS': str(args.expensive_ms)}
+            with gunicorn(run_env, workers=args.workers) as base_url:
+                samples, elapsed = asyncio.run(run_load(
+                    base_url, request_mix(args.heavy, args.seed),
+                    args.heavy + args.light, args.duration, args.warmup))
+            result['runs']['shedding' if enabled else 'baseline'] = summarize(samples, elapsed)
+
+    dump(result, args.output)
+    for run, summary in result['runs'].items():
+        cheap = summary['routes'].get('base-info', {})
+        search = summary['routes'].get('offers-search', {})
+        print(f"{run}: base-info p50 {cheap.get('p50_ms')} ms, p99 {cheap.get('p99_ms')} ms; "
+              f"search statuses {search.get('statuses')}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    os.chdir(BASE_DIR)
+    main()
@@ -0,0 +1,258 @@
+"""
+Repeatable HTTP load test over a realistic request mix.
+
+Seeds a database with ``generate_dataset`` (or reuses an existing one),
+boots gunicorn and drives a weighted mix of anonymous offer browsing with
+search and filters, base-info, logins, order creation, order status
+updates and review posts. The result contains throughput and p50/p95/p99
+latency per route together with the commit and server settings, so runs
+can be compared across commits with ``python -m benchmarks.compare``.
+
+Usage:
+    python -m benchmarks.load_suite --users 5000 --concurrency 50 --duration 30 \\
+        --output results/load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from itertools import count
+from pathlib import Path
+
+from benchmarks.loadgen import RequestSpec, dump, run_load, summarize
+from benchmarks.server import BASE_DIR, benchmark_env, gunicorn, manage
+
+# route -> relative weight
+DEFAULT_MIX = {
+    'offers-list': 30,
+    'offers-search': 15,
+    'offers-filter': 15,
+    'base-info': 15,
+    'login': 3,
+    'orders-create': 8,
+    'orders-status': 8,
+    'reviews-create': 6,
+}
+
+SEARCH_TERMS = ['logo', 'website', 'seo', 'app', 'video', 'translation', 'design', 'premium']
+ORDERINGS = ['updated_at', '-updated_at', 'min_price', '-min_price']
+
+PREPARE_SCRIPT = """
+import json
+import random
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from offer_app.models import OfferDetail
+from order_app.models import Order
+from profile_app.models import Profile
+
+pool = {pool}
+customers = list(User.objects.filter(profile__type='customer').order_by('id')[:pool])
+businesses = list(User.objects.filter(profile__type='business').order_by('id')[:pool])
+password = make_password('loadtest')
+reviewers = []
+for index in range(pool):
+    user, created = User.objects.get_or_create(
+        username=f'bench_reviewer_{{index}}', defaults={{'password': password}})
+    if created:
+        Profile.objects.create(user=user, type='customer')
+    reviewers.append(user)
+token = lambda user: Token.objects.get_or_create(user=user)[0].key
+print(json.dumps({{
+    'customer_tokens': [token(user) for user in customers],
+    'business_tokens': {{token(user): list(Order.objects.filter(
+        business_user=user, status='in_progress').values_list('id', flat=True)[:200])
+        for user in businesses}},
+    'reviewer_tokens': [token(user) for user in reviewers],
+    'business_ids': [user.id for user in businesses],
+    'usernames': [user.username for user in customers + businesses],
+    'detail_ids': random.Random({seed}).sample(
+        list(OfferDetail.objects.values_list('id', flat=True)),
+        min(2000, OfferDetail.objects.count())),
+}}))
+"""
+
+
+def prepare(env, users, seed, pool, reuse):
+    """
+    Seed the database if needed and collect tokens and IDs for the mix.
+
+    Args:
+        env: Environment mapping pointing at the benchmark database
+        users: Number of users passed to generate_dataset
+        seed: Dataset seed
+        pool: Number of users of each kind taking part in the run
+        reuse: True if the database is already seeded
+
+    Returns:
+        dict: Fixture data printed by PREPARE_SCRIPT
+    """
+    manage(env, 'migrate', '--noinput', '-v', '0')
+    if not reuse:
+        manage(env, 'generate_dataset', '--users', str(users), '--seed', str(seed))
+    output = subprocess.run(
+        [sys.executable, 'manage.py', 'shell', '-c', PREPARE_SCRIPT.format(pool=pool, seed=seed)],
+        cwd=BASE_DIR, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def request_mix(fixtures, weights, seed):
+    """
+    Build the weighted request generator.
+
+    Order status updates consume in-progress orders of the seeded business
+    users one by one, and review posts walk through (reviewer, business)
+    pairs that have no review yet, so write requests succeed instead of
+    measuring validation errors.
+
+    Args:
+        fixtures: Output of prepare
+        weights: Route -> weight mapping
+        seed: Seed of the request generator
+
+    Returns:
+        callable: next_request(client, iteration) -> RequestSpec
+    """
+    rng = random.Random(seed)
+    json_header = {'Content-Type': 'application/json'}
+
+    def auth(token):
+        return {'Authorization': f'Token {token}', **json_header}
+
+    status_updates = [(token, order_id)
+                      for token, orders in fixtures['business_tokens'].items()
+                      for order_id in orders]
+    rng.shuffle(status_updates)
+    status_counter = count()
+    review_counter = count()
+    reviewers = fixtures['reviewer_tokens']
+    business_ids = fixtures['business_ids']
+
+    def body(data):
+        return json.dumps(data).encode()
+
+    builders = {
+        'offers-list': lambda: RequestSpec(
+            'offers-list', 'GET', f'/api/offers/?page={rng.randint(1, 20)}&page_size=12'),
+        'offers-search': lambda: RequestSpec(
+            'offers-search', 'GET',
+            f'/api/offers/?search={rng.choice(SEARCH_TERMS)}&page_size=12'
+            f'&ordering={rng.choice(ORDERINGS)}'),
+        'offers-filter': lambda: RequestSpec(
+            'offers-filter', 'GET',
+            f'/api/offers/?creator_id={rng.choice(business_ids)}'
+            f'&min_price={rng.choice([0, 50, 100, 200])}'
+            f'&max_delivery_time={rng.choice([3, 7, 14, 30])}&page_size=12'),
+        'base-info': lambda: RequestSpec('base-info', 'GET', '/api/base-info/'),
+        'login': lambda: RequestSpec(
+            'login', 'POST', '/api/login/', json_header,
+            body({'username': rng.choice(fixtures['usernames']), 'password': 'loadtest'})),
+        'orders-create': lambda: RequestSpec(
+            'orders-create', 'POST', '/api/orders/',
+            auth(rng.choice(fixtures['customer_tokens'])),
+            body({'offer_detail_id': rng.choice(fixtures['detail_ids'])})),
+    }
+
+    def status_update():
+        token, order_id = status_updates[next(status_counter) % len(status_updates)]
+        return RequestSpec('orders-status', 'PATCH', f'/api/orders/{order_id}/', auth(token),
+                           body({'status': rng.choice(['completed', 'canceled'])}))
+
+    def review_post():
+        pair = next(review_counter)
+        reviewer = reviewers[pair % len(reviewers)]
+        business_id = business_ids[(pair // len(reviewers)) % len(business_ids)]
+        return RequestSpec('reviews-create', 'POST', '/api/reviews/', auth(reviewer),
+                           body({'business_user': business_id, 'rating': rng.randint(1, 5),
+                                 'description': 'Load test review'}))
+
+    if status_updates:
+        builders['orders-status'] = status_update
+    builders['reviews-create'] = review_post
+    routes = [route for route, weight in weights.items() if weight > 0 and route in builders]
+    route_weights = [weights[route] for route in routes]
+
+    def next_request(client, iteration):
+        return builders[rng.choices(routes, route_weights)[0]]()
+
+    return next_request
+
+
+def parse_mix(value):
+    """
+    Parse a ``route=weight,...`` override of the default mix.
+
+    Args:
+        value: Command line value or None
+
+    Returns:
+        dict: Route -> weight
+    """
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, (value or '').split(',')):
+        route, weight = item.split('=')
+        if route not in DEFAULT_MIX:
+            raise SystemExit(f'Unknown route {route!r}; known: {", ".join(DEFAULT_MIX)}')
+        mix[route] = int(weight)
+    return mix
+
+
+def git_revision():
+    """Return the current commit hash or None outside a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=5000, help='Dataset size (generate_dataset --users)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', help='Reuse this seeded SQLite file instead of a fresh one')
+    parser.add_argument('--pool', type=int, default=50, help='Users of each kind sending requests')
+    parser.add_argument('--mix', help='Override route weights, e.g. login=0,base-info=30')
+    parser.add_argument('--mode', choices=('wsgi', 'asgi'), default='wsgi')
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--warmup', type=float, default=5.0)
+    parser.add_argument('--output', help='Write the JSON result to this file')
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Path(args.database) if args.database else Path(tmp) / 'bench.sqlite3'
+        env = benchmark_env(database, MEDIA_ROOT=Path(tmp) / 'media')
+        fixtures = prepare(env, args.users, args.seed, args.pool,
+                           reuse=bool(args.database) and database.exists())
+        next_request = request_mix(fixtures, mix, args.seed)
+        with gunicorn(env, mode=args.mode, workers=args.workers) as base_url:
+            samples, elapsed = asyncio.run(run_load(
+                base_url, next_request, args.concurrency, args.duration, args.warmup))
+
+    result = {
+        'revision': git_revision(),
+        'mode': args.mode,
+        'workers': args.workers,
+        'concurrency': args.concurrency,
+        'dataset_users': args.users,
+        'seed': args.seed,
+        'mix': mix,
+        **summarize(samples, elapsed),
+    }
+    dump(result, args.output)
+    total = result['total']
+    print(f"{total['rps']} req/s, p50 {total['p50_ms']} ms, p95 {total['p95_ms']} ms, "
+          f"p99 {total['p99_ms']} ms", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    os.chdir(BASE_DIR)
+    main()
@@ -0,0 +1,233 @@
+"""
+Minimal asyncio HTTP/1.1 load generator.
+
+Uses only the standard library so benchmarks run in the same environment as
+the application. Every client keeps one keep-alive connection open and
+issues requests back to back, recording the latency of each one.
+"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+
+@dataclass
+class Sample:
+    """Result of a single request."""
+
+    route: str
+    status: int
+    latency: float
+    size: int = 0
+
+
+@dataclass
+class RequestSpec:
+    """Request to issue against the server."""
+
+    route: str
+    method: str
+    path: str
+    headers: dict = field(default_factory=dict)
+    body: bytes = b''
+
+
+def percentile(values, pct):
+    """
+    Return the given percentile of a list of numbers.
+
+    Args:
+        values: List of numbers
+        pct: Percentile between 0 and 100
+
+    Returns:
+        float: Percentile value or 0.0 for an empty list
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples, elapsed):
+    """
+    Aggregate samples into overall and per-route statistics.
+
+    Args:
+        samples: List of Sample instances
+        elapsed: Wall clock duration of the run in seconds
+
+    Returns:
+        dict: Throughput, latency percentiles (ms) and status counts
+    """
+    def stats(group):
+        latencies = [s.latency * 1000 for s in group]
+        statuses = {}
+        for s in group:
+            statuses[str(s.status)] = statuses.get(str(s.status), 0) + 1
+        return {
+            'requests': len(group),
+            'rps': round(len(group) / elapsed, 1) if elapsed else 0.0,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'max_ms': round(max(latencies), 2) if latencies else 0.0,
+            'bytes': sum(s.size for s in group),
+            'statuses': statuses,
+        }
+
+    routes = {}
+    for sample in samples:
+        routes.setdefault(sample.route, []).append(sample)
+
+    return {
+        'elapsed_s': round(elapsed, 2),
+        'total': stats(samples),
+        'routes': {route: stats(group) for route, group in sorted(routes.items())},
+    }
+
+
+async def _read_response(reader):
+    """
+    Read one HTTP/1.1 response from the stream.
+
+    Args:
+        reader: asyncio StreamReader
+
+    Returns:
+        tuple: (status code, body bytes, keep-alive flag)
+    """
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed by server')
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        body = b''.join(chunks)
+    else:
+        body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+    keep_alive = headers.get('connection', '').lower() != 'close'
+    return status, body, keep_alive
+
+
+class _Connection:
+    """A reconnecting keep-alive connection to one host."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, spec):
+        """
+        Send a request and wait for the response.
+
+        Args:
+            spec: RequestSpec to send
+
+        Returns:
+            tuple: (status code, body bytes)
+        """
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        headers = {
+            'Host': f'{self.host}:{self.port}',
+            'Connection': 'keep-alive',
+            'Content-Length': str(len(spec.body)),
+            **spec.headers,
+        }
+        head = f'{spec.method} {spec.path} HTTP/1.1\r\n' + ''.join(
+            f'{name}: {value}\r\n' for name, value in headers.items()) + '\r\n'
+        self.writer.write(head.encode('latin-1') + spec.body)
+        await self.writer.drain()
+        status, body, keep_alive = await _read_response(self.reader)
+        if not keep_alive:
+            await self.close()
+        return status, body
+
+    async def close(self):
+        """Close the underlying socket."""
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        self.reader = self.writer = None
+
+
+async def run_load(base_url, next_request, concurrency, duration, warmup=0.0):
+    """
+    Drive the server with ``concurrency`` clients for ``duration`` seconds.
+
+    Args:
+        base_url: Server URL, e.g. http://127.0.0.1:8000
+        next_request: Callable(client_index, iteration) returning a RequestSpec
+        concurrency: Number of simultaneous clients
+        duration: Measured run time in seconds
+        warmup: Seconds of unmeasured traffic before the measurement
+
+    Returns:
+        tuple: (list of Sample, measured elapsed seconds)
+    """
+    parts = urlsplit(base_url)
+    samples = []
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    async def client(index):
+        connection = _Connection(parts.hostname, parts.port or 80)
+        iteration = 0
+        try:
+            while time.perf_counter() < stop_at:
+                spec = next_request(index, iteration)
+                iteration += 1
+                began = time.perf_counter()
+                try:
+                    status, body = await connection.request(spec)
+                except (ConnectionError, asyncio.IncompleteReadError, OSError):
+                    await connection.close()
+                    status, body = 599, b''
+                finished = time.perf_counter()
+                if began >= measure_from:
+                    samples.append(Sample(spec.route, status, finished - began, len(body)))
+        finally:
+            await connection.close()
+
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return samples, time.perf_counter() - measure_from
+
+
+def dump(result, path=None):
+    """
+    Print a result as JSON and optionally write it to a file.
+
+    Args:
+        result: JSON-serializable result
+        path: Optional output file path
+    """
+    text = json.dumps(result, indent=2)
+    print(text)
+    if path:
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(text + '\n')
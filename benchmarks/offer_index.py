@@ -0,0 +1,119 @@
+"""
+Compare the in-memory offer index with the SQL path of the offer listing.
+
+Seeds a database with about ``--offers`` offers (or reuses one), loads the
+index and reports its load time and memory budget. Each scenario then
+selects one page the way ``OffersViewSet.list`` does, without serializing
+it: the SQL path counts the filtered queryset and fetches the page IDs,
+the index path answers from the arrays. Both must return the same count.
+
+Usage:
+    python -m benchmarks.offer_index --offers 1000000 --database /tmp/offers-1m.sqlite3
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.json_render import best_of
+from benchmarks.loadgen import dump
+from benchmarks.server import setup_django
+
+SCENARIOS = {
+    'newest': {},
+    'creator': {'creator_id': None},
+    'min-price': {'min_price': 400},
+    'max-delivery': {'max_delivery_time': 5},
+    'cheapest-first': {'ordering': 'min_price'},
+    'filtered-by-price': {'min_price': 100, 'max_delivery_time': 10, 'ordering': '-min_price'},
+    'search': {'search': 'logo'},
+}
+OFFERS_PER_BUSINESS = 25
+PAGE_SIZE = 12
+
+
+def seed(offers, database):
+    """Generate about ``offers`` offers unless the database already has offers."""
+    from django.core.management import call_command
+
+    from offer_app.models import Offer
+
+    call_command('migrate', '--noinput', verbosity=0)
+    if Offer.objects.exists():
+        return
+    # half the users are businesses with OFFERS_PER_BUSINESS offers on average
+    users = max(2 * offers // OFFERS_PER_BUSINESS, 10)
+    call_command('generate_dataset', users=users, business_ratio=0.5,
+                 offers_per_business=OFFERS_PER_BUSINESS, reviews_per_customer=0,
+                 batch_size=5000, stdout=sys.stderr)
+
+
+def make_view(params):
+    """Build an OffersViewSet bound to a GET request with the given parameters."""
+    from rest_framework.test import APIRequestFactory
+
+    from offer_app.api.views import OffersViewSet
+
+    view = OffersViewSet(action_map={'get': 'list'}, args=(), kwargs={}, format_kwarg=None)
+    view.request = view.initialize_request(
+        APIRequestFactory().get('/api/offers/', {'page_size': PAGE_SIZE, **params}))
+    return view
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--offers', type=int, default=1_000_000, help='Approximate number of offers')
+    parser.add_argument('--database', help='SQLite file to seed or reuse')
+    parser.add_argument('--repeat', type=int, default=5, help='Calls per timing round')
+    parser.add_argument('--output', help='Write the JSON result to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Path(args.database or Path(tmp) / 'bench.sqlite3')
+        setup_django(SQLITE_PATH=database, ALLOWED_HOSTS='testserver', DEBUG='False', OFFER_INDEX='True')
+        from offer_app import offer_index
+        from offer_app.models import Offer
+
+        seed(args.offers, database)
+        creator_id = Offer.objects.order_by('pk').values_list('user_id', flat=True).first()
+
+        started = time.perf_counter()
+        index = offer_index.OfferIndex()
+        index.load()
+        result = {'offers': len(index), 'numpy': offer_index.numpy.__version__ if offer_index.numpy else None,
+                  'load_seconds': round(time.perf_counter() - started, 1), 'scenarios': {}}
+        offer_index._index = index
+
+        for name, params in SCENARIOS.items():
+            params = {key: creator_id if value is None else value for key, value in params.items()}
+            view = make_view(params)
+
+            def sql():
+                queryset = view.filter_queryset(view.get_queryset())
+                return queryset.count(), list(queryset.values_list('pk', flat=True)[:PAGE_SIZE])
+
+            def indexed():
+                ids = offer_index.lookup(view.request, view)
+                return len(ids), ids[:PAGE_SIZE]
+
+            sql_count, indexed_count = sql()[0], indexed()[0]
+            if sql_count != indexed_count:
+                raise SystemExit(f'{name}: SQL counts {sql_count}, index {indexed_count}')
+            sql_us = best_of(sql, args.repeat, rounds=3)
+            index_us = best_of(indexed, args.repeat, rounds=3)
+            result['scenarios'][name] = {'count': sql_count, 'sql_ms': round(sql_us / 1000, 2),
+                                         'index_ms': round(index_us / 1000, 3),
+                                         'speedup': round(sql_us / index_us, 1)}
+        # sort permutations exist now, so the report covers them
+        result['memory'] = index.memory_report()
+
+    dump(result, args.output)
+    speedups = [entry['speedup'] for entry in result['scenarios'].values()]
+    print(f"index speedup: median {statistics.median(speedups)}x, "
+          f"{result['memory']['total'] / 2 ** 20:.0f} MiB for {result['offers']} offers", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
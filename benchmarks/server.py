@@ -0,0 +1,103 @@
+"""
+Helpers to boot the application in a subprocess for benchmarking.
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def benchmark_env(database_path, **extra):
+    """
+    Build the environment for management commands and servers.
+
+    Args:
+        database_path: SQLite file used by the benchmark
+        **extra: Additional environment variables
+
+    Returns:
+        dict: Environment mapping
+    """
+    env = dict(os.environ)
+    env.setdefault('SECRET_KEY', 'benchmark-secret-key')
+    env.setdefault('ALLOWED_HOSTS', '127.0.0.1,localhost')
+    env['SQLITE_PATH'] = str(database_path)
+    env['DEBUG'] = 'False'
+    env.update({key: str(value) for key, value in extra.items()})
+    return env
+
+
+def setup_django(**extra):
+    """
+    Configure Django in the current process for in-process benchmarks.
+
+    Args:
+        **extra: Additional environment variables set before settings load
+    """
+    import django
+
+    os.environ.setdefault('SECRET_KEY', 'benchmark-secret-key')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    os.environ.update({key: str(value) for key, value in extra.items()})
+    if str(BASE_DIR) not in sys.path:
+        sys.path.insert(0, str(BASE_DIR))
+    django.setup()
+
+
+def manage(env, *args):
+    """
+    Run a manage.py command and fail loudly on errors.
+
+    Args:
+        env: Environment mapping
+        *args: manage.py arguments
+    """
+    subprocess.run([sys.executable, 'manage.py', *args], cwd=BASE_DIR, env=env, check=True)
+
+
+def _wait_for_port(port, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Server did not start listening on port {port}')
+
+
+@contextmanager
+def gunicorn(env, mode='wsgi', workers=3, port=8765, extra_args=()):
+    """
+    Run gunicorn with the project's gunicorn.conf.py for the duration of the block.
+
+    Args:
+        env: Environment mapping
+        mode: 'wsgi' or 'asgi' (SERVER_MODE)
+        workers: Number of worker processes
+        port: Port to bind on 127.0.0.1
+        extra_args: Additional gunicorn command line arguments
+
+    Yields:
+        str: Base URL of the running server
+    """
+    server_env = dict(env, SERVER_MODE=mode, GUNICORN_WORKERS=str(workers),
+                      GUNICORN_BIND=f'127.0.0.1:{port}')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py',
+         '--log-level', 'warning', *extra_args],
+        cwd=BASE_DIR, env=server_env)
+    try:
+        _wait_for_port(port, timeout=30)
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
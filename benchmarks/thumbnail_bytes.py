@@ -0,0 +1,101 @@
+"""
+Compare bytes transferred for offer images with and without variants.
+
+Generates synthetic photo-like uploads of typical camera sizes, runs them
+through the variant pipeline and reports how many image bytes a client
+downloads for one page of offer cards and for one offer detail page when it
+uses the original upload versus the generated variants.
+
+Usage:
+    python -m benchmarks.thumbnail_bytes --offers 12 --output thumbnails.json
+"""
+import argparse
+import io
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.loadgen import dump
+from benchmarks.server import setup_django
+
+SOURCE_SIZES = ((4032, 3024), (3000, 2000), (1920, 1080), (1600, 1200))
+
+
+def photo_like(size, seed):
+    """
+    Render a noisy gradient that compresses roughly like a photograph.
+
+    Args:
+        size: (width, height) of the image
+        seed: Seed selecting the colors
+
+    Returns:
+        bytes: JPEG data
+    """
+    from PIL import Image
+
+    rng = random.Random(seed)
+    base = Image.linear_gradient('L').resize(size).convert('RGB')
+    tint = Image.new('RGB', size, tuple(rng.randrange(256) for _ in range(3)))
+    # coarse noise survives downscaling like real image detail, fine noise
+    # models sensor grain that only inflates the original
+    coarse = Image.effect_noise((size[0] // 8, size[1] // 8), 90).resize(
+        size, Image.Resampling.BICUBIC).convert('RGB')
+    grain = Image.effect_noise(size, 30).convert('RGB')
+    image = Image.blend(Image.blend(Image.blend(base, tint, 0.5), coarse, 0.5), grain, 0.15)
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=88)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--offers', type=int, default=12, help='Offers per listing page')
+    parser.add_argument('--output', help='Write the JSON result to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as media_root:
+        setup_django(MEDIA_ROOT=media_root)
+        from django.conf import settings
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        from core import thumbnails
+
+        settings.MEDIA_ROOT = media_root
+        original_bytes = card_bytes = detail_bytes = 0
+        started = time.perf_counter()
+        for index in range(args.offers):
+            size = SOURCE_SIZES[index % len(SOURCE_SIZES)]
+            name = default_storage.save(f'offers/offer_{index}.jpg',
+                                        ContentFile(photo_like(size, index)))
+            variants = thumbnails.generate_variants(name, ('card', 'detail'))
+            original_bytes += default_storage.size(name)
+            card_bytes += default_storage.size(variants['card'])
+            if index == 0:
+                first_original = default_storage.size(name)
+                detail_bytes = default_storage.size(variants['detail'])
+        elapsed = time.perf_counter() - started
+
+    result = {
+        'offers': args.offers,
+        'generation_ms_per_image': round(elapsed * 1000 / args.offers, 1),
+        'listing_page': {
+            'original_bytes': original_bytes,
+            'card_bytes': card_bytes,
+            'reduction': round(1 - card_bytes / original_bytes, 4),
+        },
+        'detail_page': {
+            'original_bytes': first_original,
+            'detail_bytes': detail_bytes,
+            'reduction': round(1 - detail_bytes / first_original, 4),
+        },
+    }
+    dump(result, args.output)
+    print(f"listing: {original_bytes} -> {card_bytes} bytes, "
+          f"detail: {first_original} -> {detail_bytes} bytes", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+Measure worker memory while many large image uploads run concurrently.
+
+Boots gunicorn with sync workers, sends concurrent multipart PATCH requests
+with a 20 MB image to /api/offers/<id>/ and samples the resident set size of
+every worker from /proc while the uploads run. With the streaming upload
+handler the peak growth per worker stays in the range of a few chunks
+instead of growing with the upload size. Linux only (reads /proc).
+
+Usage:
+    python -m benchmarks.upload_memory --concurrency 8 --duration 20
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.loadgen import RequestSpec, dump, run_load, summarize
+from benchmarks.server import BASE_DIR, benchmark_env, gunicorn, manage
+
+UPLOAD_MB = 20
+BOUNDARY = 'benchmarkboundary7MA4YWxkTrZu0gW'
+
+SEED_SCRIPT = """
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from offer_app.models import Offer
+from profile_app.models import Profile
+
+business = User.objects.create_user(username='bench_business', password='bench')
+Profile.objects.create(user=business, type='business')
+token = Token.objects.create(user=business)
+offer = Offer.objects.create(user=business, title='Upload target', description='Benchmark offer')
+print(token.key, offer.id)
+"""
+
+
+def seed(env):
+    """
+    Create and seed a fresh benchmark database.
+
+    Args:
+        env: Environment mapping pointing at the benchmark database
+
+    Returns:
+        tuple: (auth token of the business user, offer id)
+    """
+    manage(env, 'migrate', '--noinput', '-v', '0')
+    output = subprocess.run(
+        [sys.executable, 'manage.py', 'shell', '-c', SEED_SCRIPT],
+        cwd=BASE_DIR, env=env, check=True, capture_output=True, text=True).stdout
+    token, offer_id = output.split()[-2:]
+    return token, int(offer_id)
+
+
+def multipart_body(size):
+    """
+    Build a multipart body with one JPEG-signed file part of the given size.
+
+    Args:
+        size: Size of the file part in bytes
+
+    Returns:
+        bytes: Encoded request body
+    """
+    content = b'\xff\xd8\xff\xe0' + os.urandom(size - 4)
+    return (
+        f'--{BOUNDARY}\r\n'
+        'Content-Disposition: form-data; name="image"; filename="large.jpg"\r\n'
+        'Content-Type: image/jpeg\r\n\r\n'
+    ).encode() + content + f'\r\n--{BOUNDARY}--\r\n'.encode()
+
+
+def rss_kb(pid, field='VmRSS'):
+    """
+    Read a memory field of a process from /proc.
+
+    Args:
+        pid: Process ID
+        field: Field of /proc/<pid>/status, e.g. VmRSS or VmHWM
+
+    Returns:
+        int: Value in KiB or 0 if the process is gone
+    """
+    try:
+        with open(f'/proc/{pid}/status', encoding='ascii') as handle:
+            for line in handle:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except FileNotFoundError:
+        pass
+    return 0
+
+
+def worker_pids(master_pid):
+    """
+    Return the PIDs of the gunicorn workers of a master process.
+
+    Args:
+        master_pid: PID of the gunicorn master
+
+    Returns:
+        list: Worker PIDs
+    """
+    with open(f'/proc/{master_pid}/task/{master_pid}/children', encoding='ascii') as handle:
+        return [int(pid) for pid in handle.read().split()]
+
+
+class MemorySampler(threading.Thread):
+    """Background thread recording the peak RSS of each worker."""
+
+    def __init__(self, pids, interval=0.02):
+        super().__init__(daemon=True)
+        self.pids = pids
+        self.interval = interval
+        self.peaks = dict.fromkeys(pids, 0)
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            for pid in self.pids:
+                self.peaks[pid] = max(self.peaks[pid], rss_kb(pid))
+            time.sleep(self.interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--output', help='Write the JSON result to this file')
+    args = parser.parse_args()
+
+    body = multipart_body(UPLOAD_MB * 1024 * 1024)
+    with tempfile.TemporaryDirectory() as tmp:
+        env = benchmark_env(Path(tmp) / 'bench.sqlite3', MEDIA_ROOT=Path(tmp) / 'media',
+                            UPLOAD_MAX_BYTES=(UPLOAD_MB + 1) * 1024 * 1024,
+                            GUNICORN_TIMEOUT=120)
+        token, offer_id = seed(env)
+        spec = RequestSpec('offers-detail-upload', 'PATCH', f'/api/offers/{offer_id}/', {
+            'Authorization': f'Token {token}',
+            'Content-Type': f'multipart/form-data; boundary={BOUNDARY}',
+        }, body)
+        pid_file = Path(tmp) / 'gunicorn.pid'
+
+        with gunicorn(env, mode='wsgi', workers=args.workers,
+                      extra_args=('--pid', str(pid_file))) as base_url:
+            time.sleep(2)
+            pids = worker_pids(int(pid_file.read_text()))
+            # warm every worker up so lazy imports do not count as upload memory
+            asyncio.run(run_load(base_url, lambda client, iteration: spec,
+                                 args.workers * 2, duration=3.0))
+            baseline = {pid: rss_kb(pid) for pid in pids}
+            sampler = MemorySampler(pids)
+            sampler.start()
+            samples, elapsed = asyncio.run(run_load(
+                base_url, lambda client, iteration: spec, args.concurrency, args.duration))
+            sampler.stopped.set()
+            sampler.join()
+
+    growth = [sampler.peaks[pid] - baseline[pid] for pid in pids]
+    result = {
+        'upload_mb': UPLOAD_MB,
+        'concurrency': args.concurrency,
+        'workers': args.workers,
+        'requests': summarize(samples, elapsed),
+        'worker_warm_rss_kb': sorted(baseline.values()),
+        'worker_peak_rss_growth_kb': sorted(growth),
+    }
+    dump(result, args.output)
+    print(f"peak RSS growth per worker: max {max(growth)} KiB "
+          f"for {UPLOAD_MB} MB uploads", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    os.chdir(BASE_DIR)
+    main()
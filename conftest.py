@@ -0,0 +1,15 @@
+import pytest
+from django.core.cache import cache, caches
+from django.core.cache.backends.db import DatabaseCache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(request):
+    """Start every test with an empty cache; rolled back test data never invalidates it."""
+    # tests without database access can neither use nor clear a database cache
+    enabled = not isinstance(caches['default'], DatabaseCache) or getattr(request.cls, 'databases', None)
+    if enabled:
+        cache.clear()
+    yield
+    if enabled:
+        cache.clear()
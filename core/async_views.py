@@ -0,0 +1,69 @@
+"""
+Async support for Django REST Framework views.
+
+DRF's APIView.dispatch is synchronous, so async handlers are never awaited.
+AsyncAPIViewMixin provides an async dispatch that runs authentication,
+permission and throttle checks in a worker thread and awaits async handlers
+directly, which lets read endpoints use Django's async ORM when the project
+is served through ASGI.
+"""
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+from rest_framework import views
+
+
+class AsyncAPIViewMixin:
+    """
+    Mixin turning a DRF view into an async Django view.
+
+    Async handlers (``async def get``) are awaited on the event loop.
+    Remaining sync handlers (e.g. ``patch`` from UpdateModelMixin) keep
+    working and are executed in a worker thread.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Async counterpart of APIView.dispatch.
+
+        Args:
+            request: Django HttpRequest
+            *args: Variable length argument list
+            **kwargs: Arbitrary keyword arguments
+
+        Returns:
+            Response: Finalized DRF response
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(),
+                                  self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncAPIView(AsyncAPIViewMixin, views.APIView):
+    """
+    APIView whose handlers may be declared with ``async def``.
+    """
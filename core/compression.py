@@ -0,0 +1,257 @@
+"""
+Response compression with gzip, Brotli and Zstandard.
+
+gzip is always available; ``br`` and ``zstd`` are used when the optional
+``brotli`` and ``zstandard`` packages are installed. The encoding is
+negotiated from ``Accept-Encoding`` (q-values first, then the server
+preference in ``COMPRESSION_ENCODINGS``).
+
+Responses built per request are compressed at a fast level. Responses
+served from a cache can carry ``precompressed`` bytes produced once at a
+higher level when the cache entry was built (see ``precompress``), so a
+cache hit costs no compression at all.
+"""
+import gzip
+import zlib
+from functools import lru_cache
+
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# per request: fast levels; cache entries are compressed once, so they can afford more
+LEVELS = {'gzip': 6, 'br': 4, 'zstd': 3}
+PRECOMPRESS_LEVELS = {'gzip': 9, 'br': 7, 'zstd': 9}
+SUPPORTED = {'gzip': True, 'br': brotli is not None, 'zstd': zstandard is not None}
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml')
+
+
+def available_encodings():
+    """
+    Return the configured encodings that can be produced, in preference order.
+
+    Returns:
+        tuple: Encoding names, e.g. ('br', 'zstd', 'gzip')
+    """
+    return tuple(name for name in settings.COMPRESSION_ENCODINGS if SUPPORTED.get(name))
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding, encodings):
+    """
+    Pick the response encoding for an ``Accept-Encoding`` header.
+
+    Args:
+        accept_encoding: Header value
+        encodings: Producible encodings in server preference order
+
+    Returns:
+        str: Chosen encoding or None for an uncompressed response
+    """
+    accepted = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted['gzip' if name == 'x-gzip' else name] = quality
+
+    chosen, best = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best:
+            chosen, best = encoding, quality
+    return chosen
+
+
+def compress(data, encoding, level=None):
+    """
+    Compress a complete body.
+
+    Args:
+        data: Body bytes
+        encoding: 'gzip', 'br' or 'zstd'
+        level: Compression level, defaults to LEVELS
+
+    Returns:
+        bytes: Compressed body
+    """
+    level = LEVELS[encoding] if level is None else level
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, level, mtime=0)
+
+
+def precompress(data):
+    """
+    Compress a body for storage in a cache with every available encoding.
+
+    Encodings that would not make the body smaller are left out, as is
+    everything for bodies below ``COMPRESSION_MIN_SIZE``.
+
+    Args:
+        data: Body bytes
+
+    Returns:
+        dict: Encoding -> compressed bytes
+    """
+    if len(data) < settings.COMPRESSION_MIN_SIZE:
+        return {}
+    encoded = {}
+    for encoding in available_encodings():
+        compressed = compress(data, encoding, PRECOMPRESS_LEVELS[encoding])
+        if len(compressed) < len(data):
+            encoded[encoding] = compressed
+    return encoded
+
+
+class StreamCompressor:
+    """
+    Incremental compressor for streaming responses.
+
+    Every chunk is flushed, so clients receive data as soon as the
+    application produces it.
+    """
+
+    def __init__(self, encoding, level=None):
+        level = LEVELS[encoding] if level is None else level
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=level)
+            self._compress, self._flush, self._finish = (
+                compressor.process, compressor.flush, compressor.finish)
+        elif encoding == 'zstd':
+            compressor = zstandard.ZstdCompressor(level=level).compressobj()
+            self._compress, self._finish = compressor.compress, compressor.flush
+            self._flush = lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        else:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress, self._finish = compressor.compress, compressor.flush
+            self._flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def compress(self, chunk):
+        """
+        Compress and flush one chunk.
+
+        Args:
+            chunk: Body bytes
+
+        Returns:
+            bytes: Compressed bytes (may be empty)
+        """
+        return self._compress(chunk) + self._flush()
+
+    def finish(self):
+        """
+        End the stream.
+
+        Returns:
+            bytes: Trailing compressed bytes
+        """
+        return self._finish()
+
+
+def compress_stream(chunks, encoding):
+    """
+    Compress a sync streaming body.
+
+    Args:
+        chunks: Iterable of body bytes
+        encoding: Chosen encoding
+
+    Yields:
+        bytes: Compressed chunks
+    """
+    compressor = StreamCompressor(encoding)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks, encoding):
+    """
+    Compress an async streaming body.
+
+    Args:
+        chunks: Async iterable of body bytes
+        encoding: Chosen encoding
+
+    Yields:
+        bytes: Compressed chunks
+    """
+    compressor = StreamCompressor(encoding)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def is_compressible(response):
+    """
+    Check the content type of a response against COMPRESSIBLE_TYPES.
+
+    Args:
+        response: HTTP response
+
+    Returns:
+        bool: True for text-like content
+    """
+    content_type = response.get('Content-Type', '').lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CachedResponse(Response):
+    """
+    Response with a cached JSON rendering and its precompressed variants.
+
+    When the negotiated renderer is plain JSON the cached body is sent
+    as is and the compression middleware picks the matching entry of
+    ``precompressed``; any other renderer (browsable API, ``indent``)
+    renders ``data`` as usual.
+    """
+
+    def __init__(self, data, body, precompressed, **kwargs):
+        """
+        Store the cached representations.
+
+        Args:
+            data: Response data
+            body: JSON rendering of data
+            precompressed: Encoding -> compressed body
+            **kwargs: Response arguments
+        """
+        super().__init__(data, **kwargs)
+        self.cached_body = body
+        self.precompressed = precompressed
+
+    @property
+    def rendered_content(self):
+        renderer = getattr(self, 'accepted_renderer', None)
+        if (isinstance(renderer, JSONRenderer) and self.content_type is None
+                and self.accepted_media_type == renderer.media_type):
+            self['Content-Type'] = renderer.media_type
+            return self.cached_body
+        self.precompressed = {}
+        return super().rendered_content
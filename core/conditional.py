@@ -0,0 +1,172 @@
+"""
+Conditional GET support based on ``updated_at`` timestamps.
+
+Validators are computed with a small aggregate or values query before any
+serialization happens, so a matching ``If-None-Match`` or
+``If-Modified-Since`` is answered with ``304 Not Modified`` without loading
+and serializing the objects.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """
+    Build a strong, quoted ETag from the given parts.
+
+    Args:
+        *parts: Values identifying the representation
+
+    Returns:
+        str: Quoted ETag
+    """
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(digest)
+
+
+def object_validators(values):
+    """
+    Build validators for a single object from its timestamp values.
+
+    Args:
+        values: Tuple of (pk, timestamp, ...) as returned by values_list
+
+    Returns:
+        tuple: (ETag, Last-Modified timestamp) or (None, None) if values is None
+    """
+    if values is None:
+        return None, None
+    timestamps = [value for value in values[1:] if value is not None]
+    last_modified = max(timestamps).timestamp() if timestamps else None
+    return make_etag(*values), last_modified
+
+
+def not_modified_response(request, etag, last_modified=None):
+    """
+    Return a 304 response if the request's validators match.
+
+    Args:
+        request: HTTP request
+        etag: Current ETag of the resource
+        last_modified: Current modification timestamp or None
+
+    Returns:
+        HttpResponse: 304 response carrying the validators, or None
+    """
+    if etag is None:
+        return None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified and int(last_modified))
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    """
+    Attach ETag and Last-Modified headers to a response.
+
+    Args:
+        response: HTTP response
+        etag: ETag to send or None
+        last_modified: Modification timestamp or None
+
+    Returns:
+        HttpResponse: The same response
+    """
+    if etag is not None:
+        response.headers.setdefault('ETag', etag)
+    if last_modified is not None:
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Conditional GET for list and retrieve actions of a ModelViewSet.
+
+    Single objects use the ``updated_at`` values listed in
+    ``conditional_object_fields`` as ETag and Last-Modified. Lists are
+    validated by an ETag over the result count and the maximum of
+    ``conditional_list_fields``; they send no Last-Modified header because
+    a deletion does not move the maximum timestamp.
+    """
+
+    conditional_object_fields = ('updated_at',)
+    conditional_list_fields = ('updated_at',)
+
+    def get_object_validators(self):
+        """
+        Compute validators for the object addressed by the URL.
+
+        Returns:
+            tuple: (ETag, Last-Modified timestamp) or (None, None) if not found
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        values = (self.get_queryset()
+                  .prefetch_related(None)
+                  .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+                  .values_list('pk', *self.conditional_object_fields)
+                  .first())
+        return object_validators(values)
+
+    def get_list_validators(self, queryset):
+        """
+        Compute the ETag of a filtered list.
+
+        Args:
+            queryset: Filtered queryset of the list
+
+        Returns:
+            str: Quoted ETag
+        """
+        aggregates = {
+            f'max_{index}': Max(field)
+            for index, field in enumerate(self.conditional_list_fields)
+        }
+        values = queryset.prefetch_related(None).aggregate(count=Count('pk'), **aggregates)
+        return make_etag(
+            self.request.user.pk,
+            self.request.get_full_path(),
+            *(values[key] for key in sorted(values)),
+        )
+
+    def list(self, request, *args, **kwargs):
+        """
+        List objects unless the client's ETag is still current.
+
+        Args:
+            request: HTTP request
+            *args: Variable length argument list
+            **kwargs: Arbitrary keyword arguments
+
+        Returns:
+            Response: 304 or the paginated list
+        """
+        etag = self.get_list_validators(self.filter_queryset(self.get_queryset()))
+        not_modified = not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(super().list(request, *args, **kwargs), etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve an object unless the client's validators are still current.
+
+        Args:
+            request: HTTP request
+            *args: Variable length argument list
+            **kwargs: Arbitrary keyword arguments
+
+        Returns:
+            Response: 304 or the serialized object
+        """
+        etag, last_modified = self.get_object_validators()
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
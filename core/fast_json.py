@@ -0,0 +1,143 @@
+"""
+orjson based JSON renderer and parser for DRF.
+
+Both classes are drop-in replacements for DRF's ``JSONRenderer`` and
+``JSONParser``. With ``orjson`` installed they encode and decode in Rust;
+without it they run DRF's stdlib implementation unchanged. The output is
+byte-for-byte what DRF produces with its default settings (compact, UTF-8,
+``\\u2028``/``\\u2029`` escaped), because every type orjson does not encode
+the same way is handed to DRF's own encoder:
+
+- datetimes, dates and times are passed through to DRF's encoder
+  (``Z`` suffix for UTC, ``isoformat`` otherwise)
+- Decimal, lazy strings, QuerySets and generators go to DRF's encoder
+- ``FieldFile`` values render as their URL (or null if empty)
+
+Anything orjson rejects (integers beyond 64 bit, lone surrogates, indented
+output for the browsable API) is rendered by the stdlib path, so errors
+and edge cases behave exactly as before. Two differences remain for
+floats: values that need an exponent are spelled without ``+`` and
+leading zeros (``1e16`` instead of ``1e+16``, the same number for every
+JSON parser), and NaN or infinity render as null where DRF raises.
+"""
+import codecs
+import io
+import re
+
+from django.conf import settings
+from django.db.models.fields.files import FieldFile
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pure-Python fallback
+    orjson = None
+
+LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+# orjson reads integers beyond 64 bit as floats; bodies with such digit runs go to the stdlib
+LONG_NUMBER = re.compile(rb'\d{19}')
+DIGITS = b'0123456789'
+
+
+class JSONEncoder(encoders.JSONEncoder):
+    """DRF's encoder plus ``FieldFile`` support."""
+
+    def default(self, obj):
+        """
+        Convert a value the json module cannot encode itself.
+
+        Args:
+            obj: Value to convert
+
+        Returns:
+            object: JSON-compatible value
+        """
+        if isinstance(obj, FieldFile):
+            return obj.url if obj else None
+        return super().default(obj)
+
+
+_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed.
+
+    Only the compact UTF-8 form DRF uses by default is produced by orjson;
+    indented or ASCII-only output falls back to the stdlib encoder.
+    """
+
+    encoder_class = JSONEncoder
+    options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render data into JSON bytes.
+
+        Args:
+            data: Serialized data
+            accepted_media_type: Negotiated media type, may carry ``indent``
+            renderer_context: View, request and response
+
+        Returns:
+            bytes: JSON document
+        """
+        if data is None:
+            return b''
+        if (orjson is None or not self.compact or self.ensure_ascii or not self.strict
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=self.options)
+        except (orjson.JSONEncodeError, TypeError):
+            return super().render(data, accepted_media_type, renderer_context)
+        for raw, escaped in LINE_SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser decoding with orjson when it is installed.
+
+    Documents orjson rejects or would read differently are parsed by DRF's
+    parser, which raises the usual ``ParseError`` or accepts what the stdlib
+    accepts (integers beyond 64 bit, ``NaN`` with ``STRICT_JSON`` off).
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Parse a JSON request body.
+
+        Args:
+            stream: Request body stream
+            media_type: Content type of the request
+            parser_context: View, request and encoding
+
+        Returns:
+            object: Parsed data
+
+        Raises:
+            ParseError: If the body is not valid JSON
+        """
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        # counting digits is much cheaper than the regex scan and rules most bodies out
+        if len(body) - len(body.translate(None, DIGITS)) >= 19 and LONG_NUMBER.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            if codecs.lookup(encoding).name != 'utf-8':
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except (orjson.JSONDecodeError, UnicodeDecodeError, LookupError):
+            if isinstance(body, str):
+                body = body.encode(encoding)
+            return super().parse(io.BytesIO(body), media_type, parser_context)
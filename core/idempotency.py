@@ -0,0 +1,170 @@
+"""
+Idempotency-Key support for POST endpoints.
+
+A client sends a unique ``Idempotency-Key`` header with a POST. The first
+request with a key runs normally and its status and response data are
+stored in an ``IdempotencyRecord`` row for ``IDEMPOTENCY_TTL`` seconds. A
+retry with the same key is answered from the stored record without
+running the serializer again, and marked with ``Idempotent-Replayed: true``.
+
+Keys are scoped to the authenticated user and the request path. The row is
+inserted before the first request runs and the unique (user, path, key)
+constraint rejects the inserts of duplicates, which wait for the stored
+response instead of running in parallel, in whichever gunicorn worker
+they arrive. Reusing a key with a different payload is rejected with 422.
+Expired records are deleted whenever a new key is stored.
+"""
+import hashlib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from ops_app.models import IdempotencyRecord
+
+HEADER = 'Idempotency-Key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+# a record still processing after this many seconds belongs to a request
+# that died without releasing it
+LOCK_TIMEOUT = 30
+LOCK_POLL_INTERVAL = 0.05
+
+
+def request_fingerprint(request):
+    """
+    Hash the payload of a request.
+
+    Uploaded files contribute their name, size and content hash (set by the
+    streaming upload handler) instead of their bytes.
+
+    Args:
+        request: DRF request
+
+    Returns:
+        str: Hex digest
+    """
+    items = []
+    for name in sorted(request.data.keys()):
+        values = request.data.getlist(name) if hasattr(request.data, 'getlist') else [request.data[name]]
+        for value in values:
+            if isinstance(value, UploadedFile):
+                value = (value.name, value.size, getattr(value, 'content_hash', None))
+            items.append((name, repr(value)))
+    raw = repr((request.method, request.path, items))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _replay(record, fingerprint):
+    if record.fingerprint != fingerprint:
+        return Response(
+            {'detail': f'{HEADER} was already used for a different request.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    response = Response(record.data, status=record.status_code, headers=record.headers)
+    response[REPLAY_HEADER] = 'true'
+    return response
+
+
+def _claim(request, key, fingerprint):
+    """Insert the processing record, or return None if the key is taken."""
+    try:
+        with transaction.atomic():
+            return IdempotencyRecord.objects.create(
+                user=request.user, path=request.path, key=key, fingerprint=fingerprint)
+    except IntegrityError:
+        return None
+
+
+def _store(record, response):
+    record.status_code = response.status_code
+    record.data = response.data
+    record.headers = {name: response[name] for name in ('Location',) if name in response}
+    record.save(update_fields=['status_code', 'data', 'headers'])
+
+
+def run_once(request, handler):
+    """
+    Run a POST handler at most once per Idempotency-Key.
+
+    Requests without the header run the handler directly. Responses with a
+    status below 500 are stored; server errors and exceptions release the
+    key so the client can retry.
+
+    Args:
+        request: DRF request of an authenticated user
+        handler: Callable returning the DRF response
+
+    Returns:
+        Response: New, replayed, 400 (invalid key), 409 (still processing)
+        or 422 (key reused with another payload) response
+    """
+    key = request.headers.get(HEADER)
+    if key is None:
+        return handler()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return Response(
+            {'detail': f'{HEADER} must be 1 to {MAX_KEY_LENGTH} characters long.'},
+            status=status.HTTP_400_BAD_REQUEST)
+
+    fingerprint = request_fingerprint(request)
+    records = IdempotencyRecord.objects.filter(user=request.user, path=request.path, key=key)
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT
+    while True:
+        record = _claim(request, key, fingerprint)
+        if record is not None:
+            break
+        existing = records.first()
+        if existing is not None:
+            age = (timezone.now() - existing.created_at).total_seconds()
+            if existing.status_code is not None and age < settings.IDEMPOTENCY_TTL:
+                return _replay(existing, fingerprint)
+            if existing.status_code is not None or age >= LOCK_TIMEOUT:
+                # expired, or its request died without releasing it
+                records.filter(pk=existing.pk).delete()
+                continue
+        if time.monotonic() >= deadline:
+            return Response(
+                {'detail': f'A request with this {HEADER} is still being processed.'},
+                status=status.HTTP_409_CONFLICT)
+        time.sleep(LOCK_POLL_INTERVAL)
+
+    IdempotencyRecord.objects.filter(
+        created_at__lt=timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_TTL)).delete()
+    try:
+        response = handler()
+    except BaseException:
+        record.delete()
+        raise
+    if response.status_code < 500:
+        _store(record, response)
+    else:
+        record.delete()
+    return response
+
+
+class IdempotentCreateMixin:
+    """
+    ViewSet mixin making ``create`` honour the Idempotency-Key header.
+
+    Permissions are checked before ``create`` runs, so only authenticated
+    and authorized requests reach the key store.
+    """
+
+    def create(self, request, *args, **kwargs):
+        """
+        Create an object once per Idempotency-Key.
+
+        Args:
+            request: HTTP request
+            *args: Variable length argument list
+            **kwargs: Arbitrary keyword arguments
+
+        Returns:
+            Response: Created object or replayed response
+        """
+        return run_once(request, lambda: super(IdempotentCreateMixin, self).create(request, *args, **kwargs))
@@ -0,0 +1,266 @@
+"""
+Admission control for expensive read requests.
+
+Requests are grouped into route classes: the resolved URL name plus the
+names of the query parameters the view knows (filterset filters, search,
+ordering and page size), so ``offers-list[page_size,search]`` is tracked
+separately from a plain ``offers-list``. Unknown parameters are ignored,
+so clients cannot invent new classes. Each process keeps an
+exponentially weighted moving average of the latency of every class; a
+class whose average reaches ``LOAD_SHED_EXPENSIVE_MS`` counts as
+expensive.
+
+In-flight requests are counted across all gunicorn workers: every process
+keeps a tiny counter file in ``LOAD_SHED_DIR`` that it rewrites on every
+request start and end, and reads the files of its siblings when it has to
+decide. An expensive GET is rejected with 503 and ``Retry-After`` when
+``LOAD_SHED_MAX_EXPENSIVE`` expensive requests are already running, so
+one worker always stays available for cheap requests, or when the server
+as a whole has ``LOAD_SHED_MAX_IN_FLIGHT`` requests in flight. Writes and
+cheap reads are never rejected. Shedding is off unless ``LOAD_SHEDDING``
+is set.
+"""
+import functools
+import math
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+COUNTER = struct.Struct('ii')
+FILE_PREFIX = 'inflight_'
+EWMA_ALPHA = 0.2
+MAX_CLASSES = 512
+SIBLING_REFRESH_SECONDS = 1.0
+SHEDDABLE_METHODS = ('GET', 'HEAD')
+
+
+@functools.lru_cache(maxsize=None)
+def known_params(view_class):
+    """
+    Collect the query parameters that change what a view computes.
+
+    Args:
+        view_class: DRF view class, or None for plain Django views
+
+    Returns:
+        frozenset: Filterset filter names, search and ordering parameters
+        of the filter backends and the page size parameter of the paginator
+    """
+    names = set()
+    filterset_class = getattr(view_class, 'filterset_class', None)
+    if filterset_class is not None:
+        names.update(filterset_class.base_filters)
+    sources = [(backend, ('search_param', 'ordering_param'))
+               for backend in getattr(view_class, 'filter_backends', ())]
+    sources.append((getattr(view_class, 'pagination_class', None), ('page_size_query_param',)))
+    for source, attributes in sources:
+        for attribute in attributes:
+            name = getattr(source, attribute, None)
+            if name:
+                names.add(name)
+    return frozenset(names)
+
+
+def route_class(request):
+    """
+    Return the route class of a resolved request.
+
+    Args:
+        request: HTTP request with resolver_match set
+
+    Returns:
+        str: URL name plus the sorted names of the known query parameters sent
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    known = known_params(getattr(match.func, 'cls', None))
+    params = sorted(name for name in request.GET if name in known)
+    return f"{match.view_name}[{','.join(params)}]" if params else match.view_name
+
+
+class LoadTracker:
+    """
+    In-flight counters and latency averages of one process.
+
+    Attributes:
+        in_flight: Requests currently processed by this process
+        expensive: Expensive requests currently processed by this process
+        latency: Route class -> moving average latency in seconds
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.expensive = 0
+        self.latency = {}
+        self.pid = None
+        self.fd = None
+        self.siblings = {}
+        self.siblings_checked = 0.0
+
+    def _directory(self):
+        path = getattr(settings, 'LOAD_SHED_DIR', None)
+        return Path(path) if path else None
+
+    def _publish(self):
+        """Write this process' counters to its file (caller holds the lock)."""
+        directory = self._directory()
+        if directory is None:
+            return
+        if self.pid != os.getpid():
+            # first use or forked child: open an own counter file
+            self.pid = os.getpid()
+            self.siblings = {}
+            directory.mkdir(parents=True, exist_ok=True)
+            self.fd = os.open(directory / f'{FILE_PREFIX}{self.pid}', os.O_RDWR | os.O_CREAT, 0o644)
+        os.pwrite(self.fd, COUNTER.pack(self.in_flight, self.expensive), 0)
+
+    def _sibling_counts(self):
+        """Sum the counters of the other live worker processes."""
+        directory = self._directory()
+        if directory is None:
+            return 0, 0
+        now = time.monotonic()
+        if now - self.siblings_checked > SIBLING_REFRESH_SECONDS:
+            self.siblings_checked = now
+            self._refresh_siblings(directory)
+        in_flight = expensive = 0
+        for fd in self.siblings.values():
+            data = os.pread(fd, COUNTER.size, 0)
+            if len(data) == COUNTER.size:
+                other_in_flight, other_expensive = COUNTER.unpack(data)
+                in_flight += other_in_flight
+                expensive += other_expensive
+        return in_flight, expensive
+
+    def _refresh_siblings(self, directory):
+        seen = set()
+        for path in directory.glob(f'{FILE_PREFIX}*'):
+            try:
+                pid = int(path.name[len(FILE_PREFIX):])
+            except ValueError:
+                continue
+            if pid == os.getpid():
+                continue
+            if not _pid_alive(pid):
+                path.unlink(missing_ok=True)
+                continue
+            seen.add(pid)
+            if pid not in self.siblings:
+                try:
+                    self.siblings[pid] = os.open(path, os.O_RDONLY)
+                except FileNotFoundError:
+                    seen.discard(pid)
+        for pid in set(self.siblings) - seen:
+            os.close(self.siblings.pop(pid))
+
+    def started(self):
+        """Count a request that entered this process."""
+        with self.lock:
+            self.in_flight += 1
+            self._publish()
+
+    def finished(self, expensive):
+        """
+        Count a request that left this process.
+
+        Args:
+            expensive: True if the request was admitted as expensive
+        """
+        with self.lock:
+            self.in_flight -= 1
+            if expensive:
+                self.expensive -= 1
+            self._publish()
+
+    def observe(self, klass, seconds):
+        """
+        Update the latency average of a route class.
+
+        Args:
+            klass: Route class
+            seconds: Request duration
+        """
+        with self.lock:
+            previous = self.latency.get(klass)
+            if previous is None:
+                if len(self.latency) >= MAX_CLASSES:
+                    return
+                self.latency[klass] = seconds
+            else:
+                self.latency[klass] = previous + EWMA_ALPHA * (seconds - previous)
+
+    def is_expensive(self, klass):
+        """
+        Check whether a route class is expensive.
+
+        Args:
+            klass: Route class
+
+        Returns:
+            bool: True if its average latency reaches LOAD_SHED_EXPENSIVE_MS
+        """
+        average = self.latency.get(klass)
+        return average is not None and average * 1000 >= settings.LOAD_SHED_EXPENSIVE_MS
+
+    def admit_expensive(self):
+        """
+        Decide about an expensive request and count it if admitted.
+
+        Returns:
+            bool: True if the request may run
+        """
+        with self.lock:
+            other_in_flight, other_expensive = self._sibling_counts()
+            # this request is already counted in self.in_flight
+            expensive = other_expensive + self.expensive
+            in_flight = other_in_flight + self.in_flight - 1
+            limit = settings.LOAD_SHED_MAX_IN_FLIGHT
+            if expensive >= settings.LOAD_SHED_MAX_EXPENSIVE or (limit and in_flight >= limit):
+                return False
+            self.expensive += 1
+            self._publish()
+            return True
+
+    def retry_after(self, klass):
+        """
+        Suggest a Retry-After value for a rejected request.
+
+        Args:
+            klass: Route class of the rejected request
+
+        Returns:
+            int: Seconds, at least 1
+        """
+        return max(1, math.ceil(self.latency.get(klass, 1.0)))
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def clear_directory(path):
+    """
+    Remove the counter files of a previous server run.
+
+    Args:
+        path: Counter directory
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    for file in path.glob(f'{FILE_PREFIX}*'):
+        file.unlink(missing_ok=True)
+
+
+tracker = LoadTracker()
@@ -0,0 +1,501 @@
+"""
+Prometheus metrics for requests, database queries and caches.
+
+Each process records into an in-memory registry. Gunicorn runs several
+worker processes, so when ``METRICS_DIR`` is set every process also dumps
+its registry to ``<METRICS_DIR>/metrics_<pid>_<start>.json`` in the
+background and the ``/metrics`` view sums the files of all workers. The
+start time of the process (a random token where ``/proc`` is missing) is
+part of the name, so a new worker reusing the pid of an exited one writes
+a file of its own. At scrape time the counters and histograms of exited
+workers are merged into ``retired.json`` and their files removed, so
+totals never go backwards when gunicorn replaces a worker; gauges only
+count for processes that are still alive.
+
+Metrics:
+    http_request_duration_seconds - latency by route, method and status
+    http_request_db_queries       - database queries per request by route
+    http_requests_shed_total      - requests rejected by load shedding by route
+    cache_requests_total          - cache lookups by cache and result (hit/miss)
+    http_requests_in_flight       - requests currently being processed
+"""
+import atexit
+import fcntl
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# name -> (type, help text, histogram buckets)
+METRICS = {
+    'http_request_duration_seconds': (
+        'histogram', 'Request latency in seconds by route.', DURATION_BUCKETS),
+    'http_request_db_queries': (
+        'histogram', 'Database queries per request by route.', QUERY_BUCKETS),
+    'http_requests_shed_total': (
+        'counter', 'Requests rejected with 503 by load shedding by route.', None),
+    'cache_requests_total': (
+        'counter', 'Cache lookups by cache and result.', None),
+    'http_requests_in_flight': (
+        'gauge', 'Requests currently being processed.', None),
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+FILE_PREFIX = 'metrics_'
+RETIRED_FILE = 'retired.json'
+LOCK_FILE = 'retired.lock'
+
+
+class Registry:
+    """
+    Thread-safe in-memory store of the metrics of one process.
+
+    Samples are keyed by (metric name, sorted label pairs).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.dirty = False
+
+    def inc(self, name, amount=1, labels=()):
+        with self.lock:
+            key = (name, labels)
+            self.counters[key] = self.counters.get(key, 0) + amount
+            self.dirty = True
+
+    def add_gauge(self, name, amount, labels=()):
+        with self.lock:
+            key = (name, labels)
+            self.gauges[key] = self.gauges.get(key, 0) + amount
+            self.dirty = True
+
+    def observe(self, name, value, labels=()):
+        buckets = METRICS[name][2]
+        with self.lock:
+            key = (name, labels)
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            histogram[0][bisect_left(buckets, value)] += 1
+            histogram[1] += value
+            histogram[2] += 1
+            self.dirty = True
+
+    def dump(self):
+        """
+        Return a JSON-serializable copy of all samples.
+
+        Returns:
+            dict: Counters, gauges and histograms as lists
+        """
+        with self.lock:
+            self.dirty = False
+            return {
+                'counters': [[name, list(labels), value]
+                             for (name, labels), value in self.counters.items()],
+                'gauges': [[name, list(labels), value]
+                           for (name, labels), value in self.gauges.items()],
+                'histograms': [[name, list(labels), list(buckets), total, count]
+                               for (name, labels), (buckets, total, count)
+                               in self.histograms.items()],
+            }
+
+
+registry = Registry()
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+_process_key = None
+_query_count = ContextVar('metrics_query_count', default=None)
+
+
+def _labels(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def inc(name, amount=1, **labels):
+    """
+    Increment a counter.
+
+    Args:
+        name: Metric name from METRICS
+        amount: Increment
+        **labels: Label values
+    """
+    registry.inc(name, amount, _labels(labels))
+    _ensure_flusher()
+
+
+def add_gauge(name, amount, **labels):
+    """
+    Add to (or with a negative amount subtract from) a gauge.
+
+    Args:
+        name: Metric name from METRICS
+        amount: Delta
+        **labels: Label values
+    """
+    registry.add_gauge(name, amount, _labels(labels))
+    _ensure_flusher()
+
+
+def observe(name, value, **labels):
+    """
+    Record a value in a histogram.
+
+    Args:
+        name: Metric name from METRICS
+        value: Observed value
+        **labels: Label values
+    """
+    registry.observe(name, value, _labels(labels))
+    _ensure_flusher()
+
+
+def reset():
+    """Discard all samples of this process (used by tests)."""
+    global registry
+    registry = Registry()
+
+
+def metrics_dir():
+    """Return the shared metrics directory or None in single-process mode."""
+    path = getattr(settings, 'METRICS_DIR', None)
+    return Path(path) if path else None
+
+
+def clear_directory(path):
+    """
+    Remove the files of a previous server run.
+
+    Called by the gunicorn master before workers are started.
+
+    Args:
+        path: Metrics directory
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    for file in path.glob(f'{FILE_PREFIX}*.json'):
+        file.unlink(missing_ok=True)
+    (path / RETIRED_FILE).unlink(missing_ok=True)
+
+
+def _start_time(pid):
+    """
+    Read the start time of a process from /proc.
+
+    Args:
+        pid: Process ID
+
+    Returns:
+        str: Clock ticks since boot, or None if the process or /proc is missing
+    """
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as stat:
+            data = stat.read()
+    except OSError:
+        return None
+    # the command name in parentheses may contain spaces; starttime is field 22
+    return data[data.rindex(b')') + 2:].split()[19].decode()
+
+
+def process_key():
+    """
+    Return the key naming this process' file, recomputed after a fork.
+
+    Returns:
+        str: ``<pid>_<start time>``
+    """
+    global _process_key
+    pid = os.getpid()
+    if _process_key is None or not _process_key.startswith(f'{pid}_'):
+        _process_key = f'{pid}_{_start_time(pid) or secrets.token_hex(8)}'
+    return _process_key
+
+
+def _key_alive(key):
+    pid, _, start = key.partition('_')
+    try:
+        pid = int(pid)
+    except ValueError:
+        return False
+    if not _pid_alive(pid):
+        return False
+    current = _start_time(pid)
+    # without /proc only the pid can be checked
+    return current is None or current == start
+
+
+def flush():
+    """Write the registry of this process to the shared directory."""
+    directory = metrics_dir()
+    if directory is None:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / f'{FILE_PREFIX}{process_key()}.json'
+    temporary = target.with_suffix('.tmp')
+    temporary.write_text(json.dumps(registry.dump()), encoding='utf-8')
+    os.replace(temporary, target)
+
+
+def _flush_loop():
+    while True:
+        time.sleep(settings.METRICS_FLUSH_INTERVAL)
+        if registry.dirty:
+            flush()
+
+
+def _ensure_flusher():
+    """Start the background flush thread once per process (also after a fork)."""
+    global _flusher_pid
+    if _flusher_pid == os.getpid() or metrics_dir() is None:
+        return
+    with _flusher_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+        threading.Thread(target=_flush_loop, name='metrics-flush', daemon=True).start()
+        atexit.register(flush)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_dump(path):
+    try:
+        return json.loads(path.read_text('utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def _add_dump(counters, histograms, dump, gauges=None):
+    """Add the samples of one dump to summed dicts; gauges only if a dict is given."""
+    for name, labels, value in dump['counters']:
+        key = (name, tuple(map(tuple, labels)))
+        counters[key] = counters.get(key, 0) + value
+    if gauges is not None:
+        for name, labels, value in dump['gauges']:
+            key = (name, tuple(map(tuple, labels)))
+            gauges[key] = gauges.get(key, 0) + value
+    for name, labels, buckets, total, count in dump['histograms']:
+        key = (name, tuple(map(tuple, labels)))
+        summed = histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+        summed[0] = [a + b for a, b in zip(summed[0], buckets)]
+        summed[1] += total
+        summed[2] += count
+
+
+def _retire(directory, files):
+    """
+    Merge the files of exited workers into the retired totals and remove them.
+
+    Runs under an exclusive lock, so concurrent scrapes in several workers
+    merge every file once. The retired file lists the files it already
+    contains until they are gone, so a crash between writing it and
+    removing them does not count them twice.
+
+    Args:
+        directory: Metrics directory
+        files: Paths of the files of exited workers
+
+    Returns:
+        dict: Retired samples in the format of Registry.dump
+    """
+    path = directory / RETIRED_FILE
+    if not files:
+        # replaced atomically, so it can be read without the lock
+        return _read_dump(path) or {'counters': [], 'gauges': [], 'histograms': []}
+    with open(directory / LOCK_FILE, 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        retired = _read_dump(path) or {'counters': [], 'gauges': [], 'histograms': [], 'merged': []}
+        merged = set(retired['merged'])
+        counters, histograms = {}, {}
+        _add_dump(counters, histograms, retired)
+        changed = False
+        for file in files:
+            dump = None if file.name in merged else _read_dump(file)
+            if dump is not None:
+                _add_dump(counters, histograms, dump)
+                merged.add(file.name)
+                changed = True
+        if changed:
+            retired = {
+                'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+                'gauges': [],
+                'histograms': [[name, list(labels), buckets, total, count]
+                               for (name, labels), (buckets, total, count) in histograms.items()],
+                'merged': sorted(name for name in merged if (directory / name).exists()),
+            }
+            temporary = path.with_suffix('.tmp')
+            temporary.write_text(json.dumps(retired), encoding='utf-8')
+            os.replace(temporary, path)
+        for file in files:
+            file.unlink(missing_ok=True)
+    return retired
+
+
+def collect():
+    """
+    Sum the samples of all worker processes.
+
+    Files of exited workers are folded into the retired totals first.
+
+    Returns:
+        tuple: (counters, gauges, histograms) dicts keyed by (name, labels)
+    """
+    counters, gauges, histograms = {}, {}, {}
+    directory = metrics_dir()
+    if directory is None:
+        _add_dump(counters, histograms, registry.dump(), gauges)
+        return counters, gauges, histograms
+
+    flush()
+    own = process_key()
+    exited = []
+    for file in directory.glob(f'{FILE_PREFIX}*.json'):
+        key = file.stem[len(FILE_PREFIX):]
+        if key != own and not _key_alive(key):
+            exited.append(file)
+            continue
+        dump = _read_dump(file)
+        if dump is not None:
+            _add_dump(counters, histograms, dump, gauges)
+    _add_dump(counters, histograms, _retire(directory, exited))
+    return counters, gauges, histograms
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _format_number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render():
+    """
+    Render all metrics in the Prometheus text exposition format.
+
+    Returns:
+        str: Exposition text
+    """
+    counters, gauges, histograms = collect()
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'histogram':
+            for (sample_name, labels), (counts, total, count) in sorted(histograms.items()):
+                if sample_name != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                    cumulative += bucket_count
+                    le = bound if bound == '+Inf' else _format_number(float(bound))
+                    lines.append(f'{name}_bucket{_format_labels(labels, [("le", str(le))])} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_number(total)}')
+                lines.append(f'{name}_count{_format_labels(labels)} {count}')
+        else:
+            samples = counters if kind == 'counter' else gauges
+            for (sample_name, labels), value in sorted(samples.items()):
+                if sample_name == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    Expose the metrics of all workers for Prometheus.
+
+    The scraper has to send ``METRICS_TOKEN`` as bearer token. Without a
+    configured token the endpoint does not exist, so route names, latencies
+    and in-flight counts are never public by default.
+
+    Args:
+        request: HTTP request
+
+    Returns:
+        HttpResponse: Exposition text, 403 (wrong token) or 404 (no token configured)
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        return HttpResponse('Not Found', status=404, content_type='text/plain')
+    sent = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(sent.encode(), f'Bearer {token}'.encode()):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
+
+
+def start_query_count():
+    """
+    Start counting database queries for the current request context.
+
+    Returns:
+        tuple: (counter, context token for stop_query_count)
+    """
+    counter = [0]
+    return counter, _query_count.set(counter)
+
+
+def stop_query_count(token):
+    """
+    Stop counting queries for the current request context.
+
+    Args:
+        token: Token returned by start_query_count
+    """
+    _query_count.reset(token)
+
+
+def _count_query(execute, sql, params, many, context):
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(connection, **kwargs):
+    """
+    Add the query counting wrapper to a database connection once.
+
+    Connected to ``connection_created`` so connections opened in worker
+    threads (ASGI mode) are counted as well.
+
+    Args:
+        connection: Database wrapper
+    """
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+connection_created.connect(install_query_counter)
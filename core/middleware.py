@@ -0,0 +1,446 @@
+"""
+Project-wide middleware.
+"""
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import APIException
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from core import compression, load_shedding, metrics, profiling
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise middleware usable in both WSGI and ASGI mode.
+
+    The upstream middleware is sync-only, which forces Django to run every
+    request under ASGI through a thread just to pass WhiteNoise. Here static
+    files are looked up in memory and only served from a thread; all other
+    requests go straight to the async handler chain.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None):
+        """
+        Initialize WhiteNoise and detect the handler mode.
+
+        Args:
+            get_response: Next handler in the middleware chain
+        """
+        super().__init__(get_response)
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Serve a static file or pass the request on.
+
+        Args:
+            request: HTTP request
+
+        Returns:
+            HttpResponse: Static file response or downstream response
+        """
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        """
+        Async variant of __call__.
+
+        Args:
+            request: HTTP request
+
+        Returns:
+            HttpResponse: Static file response or downstream response
+        """
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class MetricsMiddleware:
+    """
+    Record latency, query count and in-flight requests for every request.
+
+    Requests are labeled with the resolved URL name (``offers-list``,
+    ``offer-details``, ...) so parameterized paths share one series;
+    requests that match no URL pattern are labeled ``unmatched``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Store the next handler and detect the handler mode.
+
+        Args:
+            get_response: Next handler in the middleware chain
+        """
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Measure the downstream handler.
+
+        Args:
+            request: HTTP request
+
+        Returns:
+            HttpResponse: Downstream response
+        """
+        if self.async_mode:
+            return self.__acall__(request)
+        for connection in connections.all():
+            metrics.install_query_counter(connection)
+        started, counter, token = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.stop_query_count(token)
+            metrics.add_gauge('http_requests_in_flight', -1)
+        self._record(request, response, started, counter)
+        return response
+
+    async def __acall__(self, request):
+        """
+        Async variant of __call__.
+
+        Args:
+            request: HTTP request
+
+        Returns:
+            HttpResponse: Downstream response
+        """
+        started, counter, token = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.stop_query_count(token)
+            metrics.add_gauge('http_requests_in_flight', -1)
+        self._record(request, response, started, counter)
+        return response
+
+    def _start(self):
+        metrics.add_gauge('http_requests_in_flight', 1)
+        counter, token = metrics.start_query_count()
+        return time.perf_counter(), counter, token
+
+    def _record(self, request, response, started, counter):
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match else 'unmatched'
+        metrics.observe('http_request_duration_seconds', time.perf_counter() - started,
+                        route=route, method=request.method, status=response.status_code)
+        metrics.observe('http_request_db_queries', counter[0], route=route)
+
+
+class ProfilingMiddleware:
+    """
+    Run sampled requests under the sampling profiler.
+
+    A request is profiled if a random draw falls below
+    ``PROFILING_SAMPLE_RATE`` or if a staff user (session or token) sends
+    ``X-Profile: 1``. The profile ID is returned in the ``X-Profile-Id``
+    header. Under ASGI the event loop thread is sampled, so sync DRF views
+    running in the thread pool only show up in the SQL breakdown; use the
+    WSGI mode for call trees of those views.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Store the next handler and detect the handler mode.
+
+        Args:
+            get_response: Next handler in the middleware chain
+        """
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Profile the downstream handler if the request is selected.
+
+        Args:
+            request: HTTP request
+
+        Returns:
+            HttpResponse: Downstream response
+        """
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self._selected(request):
+            return self.get_response(request)
+        for connection in connections.all():
+            profiling.install_query_timer(connection)
+        with profiling.RequestProfile() as profile:
+            response = self.get_response(request)
+        return self._store(request, response, profile)
+
+    async def __acall__(self, request):
+        """
+        Async variant of __call__.
+
+        Args:
+            request: HTTP request
+
+        Returns:
+            HttpResponse: Downstream response
+        """
+        if not await sync_to_async(self._selected)(request):
+            return await self.get_response(request)
+        with profiling.RequestProfile() as profile:
+            response = await self.get_response(request)
+        return await sync_to_async(self._store)(request, response, profile)
+
+    def _selected(self, request):
+        if request.headers.get('X-Profile') == '1' and self._is_staff(request):
+            return True
+        rate = settings.PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    def _is_staff(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.is_staff
+        try:
+            result = TokenAuthentication().authenticate(request)
+        except APIException:
+            return False
+        return result is not None and result[0].is_staff
+
+    def _store(self, request, response, profile):
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match else 'unmatched'
+        response['X-Profile-Id'] = profiling.save(profile.as_dict(request, response, route))
+        return response
+
+
+class LoadSheddingMiddleware:
+    """
+    Reject expensive reads with 503 when the server is saturated.
+
+    Counts every request as in flight, classifies it once the URL is
+    resolved and asks the process' LoadTracker whether an expensive GET
+    may run (see core.load_shedding). Rejected requests get a
+    ``Retry-After`` header and are counted in ``http_requests_shed_total``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Store the next handler and detect the handler mode.
+
+        Args:
+            get_response: Next handler in the middleware chain
+        """
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Track the request while the downstream handler runs.
+
+        Args:
+            request: HTTP request
+
+        Returns:
+            HttpResponse: Downstream response or 503
+        """
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.LOAD_SHEDDING:
+            return self.get_response(request)
+        started = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            load_shedding.tracker.finished(request.load_shed_expensive)
+        self._observe(request, started)
+        return response
+
+    async def __acall__(self, request):
+        """
+        Async variant of __call__.
+
+        Args:
+            request: HTTP request
+
+        Returns:
+            HttpResponse: Downstream response or 503
+        """
+        if not settings.LOAD_SHEDDING:
+            return await self.get_response(request)
+        started = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            load_shedding.tracker.finished(request.load_shed_expensive)
+        self._observe(request, started)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Admit or reject the resolved request.
+
+        Args:
+            request: HTTP request with resolver_match set
+            view_func: View about to be called
+            view_args: Positional view arguments
+            view_kwargs: Keyword view arguments
+
+        Returns:
+            JsonResponse: 503 if the request is shed, otherwise None
+        """
+        if not settings.LOAD_SHEDDING:
+            return None
+        tracker = load_shedding.tracker
+        klass = request.load_shed_class = load_shedding.route_class(request)
+        if request.method not in load_shedding.SHEDDABLE_METHODS or not tracker.is_expensive(klass):
+            return None
+        if tracker.admit_expensive():
+            request.load_shed_expensive = True
+            return None
+        request.load_shed_rejected = True
+        metrics.inc('http_requests_shed_total', route=request.resolver_match.view_name)
+        response = JsonResponse({'detail': 'Server is busy, please retry later.'}, status=503)
+        response['Retry-After'] = str(tracker.retry_after(klass))
+        return response
+
+    def _start(self, request):
+        request.load_shed_class = None
+        request.load_shed_expensive = False
+        request.load_shed_rejected = False
+        load_shedding.tracker.started()
+        return time.perf_counter()
+
+    def _observe(self, request, started):
+        if request.load_shed_class and not request.load_shed_rejected:
+            load_shedding.tracker.observe(request.load_shed_class, time.perf_counter() - started)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses to safe requests with gzip, Brotli or Zstandard.
+
+    Only GET and HEAD responses are compressed: POST responses can carry
+    secrets such as auth tokens next to reflected input, which would make
+    their compressed size an oracle (BREACH), and they are small anyway.
+    Bodies below ``COMPRESSION_MIN_SIZE`` and non-text content types are
+    sent as is; streaming responses are compressed chunk by chunk.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Store the next handler and detect the handler mode.
+
+        Args:
+            get_response: Next handler in the middleware chain
+        """
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Compress the downstream response if the client accepts it.
+
+        Args:
+            request: HTTP request
+
+        Returns:
+            HttpResponse: Possibly compressed response
+        """
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        """
+        Async variant of __call__.
+
+        Args:
+            request: HTTP request
+
+        Returns:
+            HttpResponse: Possibly compressed response
+        """
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        """
+        Negotiate the encoding and compress the body.
+
+        Args:
+            request: HTTP request
+            response: Uncompressed response
+
+        Returns:
+            HttpResponse: The same response, compressed if worthwhile
+        """
+        if (request.method not in ('GET', 'HEAD') or response.has_header('Content-Encoding')
+                or not compression.is_compressible(response)):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = compression.negotiate(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''), compression.available_encodings())
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compression.acompress_stream(
+                    response.streaming_content, encoding)
+            else:
+                response.streaming_content = compression.compress_stream(
+                    response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            content = (getattr(response, 'precompressed', None) or {}).get(encoding)
+            if content is None:
+                content = compression.compress(response.content, encoding)
+                if len(content) >= len(response.content):
+                    return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # the compressed body is a different representation of the same resource
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
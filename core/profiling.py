@@ -0,0 +1,290 @@
+"""
+Sampling profiler for individual production requests.
+
+A profiled request is run while a background thread takes a snapshot of
+the request thread's stack every ``PROFILING_INTERVAL`` seconds, so the
+request itself is not slowed down by tracing every call. Executed SQL is
+timed through a database execute wrapper and grouped by statement.
+
+Profiles are written as JSON to ``PROFILING_DIR``. The directory is a ring
+buffer: after each write only the newest ``PROFILING_MAX_FILES`` profiles
+are kept. ``python manage.py profiles`` lists and exports them.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+_sql_log = ContextVar('profiling_sql_log', default=None)
+_ID_PATTERN = re.compile(r'^[\w.-]+$')
+_NUMBER = re.compile(r"\b\d+\b|'(?:[^']|'')*'")
+
+
+class StackSampler(threading.Thread):
+    """
+    Background thread counting the stacks of one thread.
+
+    Attributes:
+        stacks: Counter of stack tuples (outermost frame first)
+        samples: Number of snapshots taken
+    """
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='profiling-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename):
+    for prefix in sorted({str(settings.BASE_DIR), *sys.path}, key=len, reverse=True):
+        if prefix and filename.startswith(prefix + os.sep):
+            return filename[len(prefix) + 1:]
+    return filename
+
+
+def _frame_label(code):
+    return f'{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})'
+
+
+def call_tree(stacks):
+    """
+    Merge sampled stacks into a call tree.
+
+    Args:
+        stacks: Mapping of stack tuple -> sample count
+
+    Returns:
+        dict: Root node with ``name``, ``samples`` and ``children`` (sorted by samples)
+    """
+    root = {'name': 'request', 'samples': 0, 'children': {}}
+    for stack, count in stacks.items():
+        root['samples'] += count
+        node = root
+        for label in stack:
+            child = node['children'].get(label)
+            if child is None:
+                child = node['children'][label] = {'name': label, 'samples': 0, 'children': {}}
+            child['samples'] += count
+            node = child
+
+    def freeze(node):
+        children = sorted(node['children'].values(), key=lambda child: -child['samples'])
+        return {'name': node['name'], 'samples': node['samples'],
+                'children': [freeze(child) for child in children]}
+
+    return freeze(root)
+
+
+def normalize_sql(sql):
+    """
+    Replace literals in a statement so executions with different values group together.
+
+    Args:
+        sql: SQL with interpolated parameters
+
+    Returns:
+        str: Statement with numbers and strings replaced by ``?``
+    """
+    return _NUMBER.sub('?', sql)
+
+
+def sql_breakdown(log):
+    """
+    Group executed statements.
+
+    Args:
+        log: List of (sql, seconds) tuples
+
+    Returns:
+        list: Dicts with sql, count and total_ms, slowest first
+    """
+    groups = {}
+    for sql, seconds in log:
+        group = groups.setdefault(normalize_sql(sql), {'sql': normalize_sql(sql), 'count': 0, 'total_ms': 0.0})
+        group['count'] += 1
+        group['total_ms'] += seconds * 1000
+    for group in groups.values():
+        group['total_ms'] = round(group['total_ms'], 3)
+    return sorted(groups.values(), key=lambda group: -group['total_ms'])
+
+
+def _time_query(execute, sql, params, many, context):
+    log = _sql_log.get()
+    if log is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        log.append((sql, time.perf_counter() - started))
+
+
+def install_query_timer(connection, **kwargs):
+    """
+    Add the SQL timing wrapper to a database connection once.
+
+    Args:
+        connection: Database wrapper
+    """
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+connection_created.connect(install_query_timer)
+
+
+class RequestProfile:
+    """
+    Profile of one request, used as ``with RequestProfile() as profile``.
+
+    Samples the thread entering the block and records SQL of the current
+    context until the block exits.
+    """
+
+    def __enter__(self):
+        self.sql = []
+        self.token = _sql_log.set(self.sql)
+        self.sampler = StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL)
+        self.started = time.perf_counter()
+        self.sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.duration = time.perf_counter() - self.started
+        self.sampler.stop()
+        _sql_log.reset(self.token)
+        return False
+
+    def as_dict(self, request, response, route):
+        """
+        Build the stored representation.
+
+        Args:
+            request: HTTP request
+            response: HTTP response
+            route: Resolved URL name
+
+        Returns:
+            dict: JSON-serializable profile
+        """
+        return {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'route': route,
+            'status': response.status_code,
+            'duration_ms': round(self.duration * 1000, 3),
+            'interval_ms': settings.PROFILING_INTERVAL * 1000,
+            'samples': self.sampler.samples,
+            'call_tree': call_tree(self.sampler.stacks),
+            'sql_total_ms': round(sum(seconds for _, seconds in self.sql) * 1000, 3),
+            'sql': sql_breakdown(self.sql),
+        }
+
+
+def profile_dir():
+    """Return the ring buffer directory."""
+    return Path(settings.PROFILING_DIR)
+
+
+def save(data):
+    """
+    Write a profile and drop the oldest ones beyond PROFILING_MAX_FILES.
+
+    Args:
+        data: Output of RequestProfile.as_dict
+
+    Returns:
+        str: Profile ID
+    """
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r'[^\w-]+', '-', data['route']).strip('-') or 'request'
+    profile_id = f'{time.time_ns()}-{os.getpid()}-{slug}'
+    temporary = directory / f'.{profile_id}.tmp'
+    temporary.write_text(json.dumps(data), encoding='utf-8')
+    os.replace(temporary, directory / f'{profile_id}.json')
+    for old in list_profiles()[settings.PROFILING_MAX_FILES:]:
+        (directory / f'{old}.json').unlink(missing_ok=True)
+    return profile_id
+
+
+def list_profiles():
+    """
+    Return stored profile IDs, newest first.
+
+    Returns:
+        list: Profile IDs
+    """
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    ids = [path.stem for path in directory.glob('*.json') if path.stem.split('-', 1)[0].isdigit()]
+    return sorted(ids, key=lambda profile_id: int(profile_id.split('-', 1)[0]), reverse=True)
+
+
+def load(profile_id):
+    """
+    Read a stored profile.
+
+    Args:
+        profile_id: ID returned by save or list_profiles
+
+    Returns:
+        dict: Stored profile
+
+    Raises:
+        FileNotFoundError: If the profile does not exist (or was rotated out)
+    """
+    if not _ID_PATTERN.match(profile_id):
+        raise FileNotFoundError(profile_id)
+    return json.loads((profile_dir() / f'{profile_id}.json').read_text(encoding='utf-8'))
+
+
+def folded_stacks(tree):
+    """
+    Convert a call tree to the folded format read by flamegraph tools.
+
+    Args:
+        tree: Call tree as stored in a profile
+
+    Yields:
+        str: ``frame;frame;frame count`` lines
+    """
+    def walk(node, path):
+        own = node['samples'] - sum(child['samples'] for child in node['children'])
+        if own and path:
+            yield f"{';'.join(path)} {own}"
+        for child in node['children']:
+            yield from walk(child, path + [child['name']])
+
+    yield from walk(tree, [])
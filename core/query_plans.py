@@ -0,0 +1,138 @@
+"""
+Query plan inspection for regression tests.
+
+The SQL an endpoint emits is captured and explained with ``EXPLAIN QUERY
+PLAN`` on SQLite or ``EXPLAIN (FORMAT JSON)`` on PostgreSQL. A plan is
+reported when it reads one of the large tables with a full table scan, or
+sorts a full scan of one with a temporary B-tree (SQLite) or a Sort node
+(PostgreSQL). Sorting the rows found through an index lookup is bounded by
+the filter and therefore accepted.
+"""
+import json
+import re
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+LARGE_TABLES = frozenset({
+    'auth_user',
+    'profile_app_profile',
+    'offer_app_offer',
+    'offer_app_offerdetail',
+    'order_app_order',
+    'review_app_review',
+})
+
+_SQLITE_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?(?P<index> USING (?:COVERING )?INDEX .*)?$')
+_SQLITE_SORT = re.compile(r'^USE TEMP B-TREE FOR (?:.*ORDER BY|GROUP BY|DISTINCT)')
+
+
+@dataclass(frozen=True)
+class Violation:
+    """A problem found in the plan of one query."""
+
+    kind: str
+    table: str
+    sql: str
+    plan: str
+
+    def __str__(self):
+        return f'{self.kind} on {self.table}\n  SQL: {self.sql}\n  Plan: {self.plan}'
+
+
+def capture_selects(func):
+    """
+    Run a callable and return the distinct SELECT statements it executed.
+
+    Args:
+        func: Callable issuing queries, e.g. a test client request
+
+    Returns:
+        list: SQL strings with parameters interpolated, in execution order
+    """
+    with CaptureQueriesContext(connection) as queries:
+        func()
+    selects = []
+    for query in queries.captured_queries:
+        sql = query['sql']
+        if sql.lstrip().upper().startswith('SELECT') and sql not in selects:
+            selects.append(sql)
+    return selects
+
+
+def _sqlite_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[3] for row in cursor.fetchall()]
+
+
+def _sqlite_violations(sql, tables):
+    plan = _sqlite_plan(sql)
+    violations = []
+    full_scans = set()
+    for line in plan:
+        match = _SQLITE_SCAN.match(line)
+        if match and match.group(1) in tables:
+            full_scans.add(match.group(1))
+            if not match.group('index'):
+                violations.append(Violation('full table scan', match.group(1), sql, ' | '.join(plan)))
+    if any(_SQLITE_SORT.match(line) for line in plan):
+        for table in sorted(full_scans):
+            violations.append(Violation('sort', table, sql, ' | '.join(plan)))
+    return violations
+
+
+def _postgres_nodes(node, parents=()):
+    yield node, parents
+    for child in node.get('Plans', ()):
+        yield from _postgres_nodes(child, parents + (node,))
+
+
+def _postgres_violations(sql, tables):
+    # tiny test tables make sequential scans look cheap; only report them
+    # when no index could be used at all. SET LOCAL would last until the
+    # surrounding (test) transaction ends and a savepoint release keeps it,
+    # so the previous value is restored right after the EXPLAIN.
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT current_setting('enable_seqscan')")
+        previous = cursor.fetchone()[0]
+        cursor.execute("SELECT set_config('enable_seqscan', 'off', true)")
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+        plan = cursor.fetchone()[0]
+        cursor.execute("SELECT set_config('enable_seqscan', %s, true)", [previous])
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]['Plan']
+    text = json.dumps(root)
+    violations = []
+    for node, parents in _postgres_nodes(root):
+        table = node.get('Relation Name')
+        if node['Node Type'] != 'Seq Scan' or table not in tables:
+            continue
+        violations.append(Violation('full table scan', table, sql, text))
+        if any(parent['Node Type'] in ('Sort', 'Incremental Sort') for parent in parents):
+            violations.append(Violation('sort', table, sql, text))
+    return violations
+
+
+def find_violations(statements, tables=LARGE_TABLES, allowed=()):
+    """
+    Explain statements and report scans and sorts over large tables.
+
+    Args:
+        statements: SQL strings as returned by capture_selects
+        tables: Table names considered large
+        allowed: Iterable of (kind, table) pairs accepted for these statements
+
+    Returns:
+        list: Violation instances
+    """
+    check = _postgres_violations if connection.vendor == 'postgresql' else _sqlite_violations
+    allowed = set(allowed)
+    violations = []
+    for sql in statements:
+        for violation in check(sql, tables):
+            if (violation.kind, violation.table) not in allowed:
+                violations.append(violation)
+    return violations
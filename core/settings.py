@@ -9,8 +9,11 @@ https://docs.djangoproject.com/en/5.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
+import hashlib
 import os
+import tempfile
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -54,15 +57,20 @@ INSTALLED_APPS = [
     'order_app',
     'review_app',
     'baseinfo_app',
+    'ops_app',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.LoadSheddingMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -94,11 +102,61 @@ WSGI_APPLICATION = 'core.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'data' / 'db.sqlite3',  # Im data/ Verzeichnis für Docker Volume
+        # Im data/ Verzeichnis für Docker Volume, per SQLITE_PATH überschreibbar (z.B. für Benchmarks)
+        'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'data' / 'db.sqlite3'),
+        # Testdatenbank als Datei statt In-Memory mit Shared Cache: die Idempotency- und
+        # Bestell-Tests schreiben aus mehreren Threads, und SQLite meldet bei Shared Cache
+        # sofort "database table is locked", statt wie bei einer Datei auf die Sperre zu warten.
+        # Name je Checkout und Testlauf, damit parallele Läufe sich die Datei nicht gegenseitig löschen
+        'TEST': {'NAME': os.path.join(tempfile.gettempdir(), 'coderr-test-{}-{}.sqlite3'.format(
+            hashlib.sha256(str(BASE_DIR).encode()).hexdigest()[:12], os.getpid()))},
     }
 }
 
 
+# Cache
+# Mit REDIS_URL teilen sich alle Gunicorn Worker Redis, sonst die Tabelle cache_table in der Datenbank
+# (ebenfalls von allen Workern geteilt; wird von bootstrap bzw. createcachetable angelegt)
+
+redis_url = os.getenv('REDIS_URL')
+if redis_url:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': redis_url,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'cache_table',
+        }
+    }
+
+# Idempotency-Key: Sekunden, die eine gespeicherte Antwort wiederholt wird
+IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', str(24 * 60 * 60)))
+# Sekunden, die ein doppelter Request auf den noch laufenden ersten wartet
+IDEMPOTENCY_WAIT = float(os.getenv('IDEMPOTENCY_WAIT', '10'))
+
+# Sekunden, die anonyme Angebotslisten im Cache bleiben (Tags invalidieren vorher)
+OFFER_LIST_CACHE_TIMEOUT = int(os.getenv('OFFER_LIST_CACHE_TIMEOUT', '300'))
+
+# Spaltenindex der Angebote im Speicher jedes Workers (Filter/Sortierung ohne SQL)
+OFFER_INDEX = os.getenv('OFFER_INDEX', 'False') == 'True'
+# Sekunden zwischen zwei inkrementellen Aktualisierungen des Index
+OFFER_INDEX_REFRESH = float(os.getenv('OFFER_INDEX_REFRESH', '2.0'))
+
+# Anzahl vorberechneter ähnlicher Angebote pro Angebot (build_similar_offers)
+SIMILAR_OFFERS_TOP_K = int(os.getenv('SIMILAR_OFFERS_TOP_K', '6'))
+
+# Admin: größere Tabellen werden in der Änderungsliste geschätzt statt mit COUNT(*) gezählt
+ADMIN_EXACT_COUNT_LIMIT = int(os.getenv('ADMIN_EXACT_COUNT_LIMIT', '10000'))
+
+# Hintergrund-Threads pro Prozess, die Vorschaubilder (WebP) erzeugen
+THUMBNAIL_WORKERS = int(os.getenv('THUMBNAIL_WORKERS', '2'))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -148,7 +206,44 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # Media Files
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'mediafiles'
+MEDIA_ROOT = Path(os.getenv('MEDIA_ROOT', BASE_DIR / 'mediafiles'))
+
+# Maximale Größe einer hochgeladenen Datei in Bytes (Standard: 10 MB)
+UPLOAD_MAX_BYTES = int(os.getenv('UPLOAD_MAX_BYTES', str(10 * 1024 * 1024)))
+
+# Prometheus Metriken unter /metrics
+# Verzeichnis, in das jeder Gunicorn Worker seine Werte schreibt (leer = nur dieser Prozess)
+METRICS_DIR = os.getenv('METRICS_DIR') or None
+# Sekunden zwischen zwei Schreibvorgängen eines Workers
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '1.0'))
+# Bearer Token, das der Scraper mitsenden muss (ohne Token antwortet /metrics mit 404)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Kompression: bevorzugte Reihenfolge (br/zstd nur mit installiertem brotli/zstandard)
+COMPRESSION_ENCODINGS = os.getenv('COMPRESSION_ENCODINGS', 'br,zstd,gzip').split(',')
+# Kleinere Antworten werden unkomprimiert gesendet (Bytes)
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+
+# Load Shedding: teure GET Requests werden bei Überlast mit 503 + Retry-After abgewiesen (Standard: aus)
+LOAD_SHEDDING = os.getenv('LOAD_SHEDDING', 'False') == 'True'
+# Verzeichnis für die In-Flight Zähler aller Gunicorn Worker (leer = nur dieser Prozess)
+LOAD_SHED_DIR = os.getenv('LOAD_SHED_DIR') or None
+# Ab dieser durchschnittlichen Latenz (ms) gilt eine Route-Klasse als teuer
+LOAD_SHED_EXPENSIVE_MS = float(os.getenv('LOAD_SHED_EXPENSIVE_MS', '100'))
+# Maximal gleichzeitig laufende teure Requests (Standard: ein Worker bleibt für günstige frei)
+LOAD_SHED_MAX_EXPENSIVE = int(os.getenv(
+    'LOAD_SHED_MAX_EXPENSIVE', str(max(1, int(os.getenv('GUNICORN_WORKERS', '3')) - 1))))
+# Maximal gleichzeitig laufende Requests insgesamt, ab denen teure abgewiesen werden (0 = aus)
+LOAD_SHED_MAX_IN_FLIGHT = int(os.getenv('LOAD_SHED_MAX_IN_FLIGHT', '0'))
+
+# Sampling Profiler für einzelne Requests (Staff kann per Header "X-Profile: 1" anfordern)
+# Anteil der Requests, die zufällig profiliert werden (0 = aus)
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+# Abstand zwischen zwei Stack-Samples in Sekunden (bei CPU-Last durch das GIL-Umschaltintervall von 5 ms begrenzt)
+PROFILING_INTERVAL = float(os.getenv('PROFILING_INTERVAL', '0.005'))
+# Ringpuffer auf der Platte: nur die neuesten PROFILING_MAX_FILES Profile bleiben erhalten
+PROFILING_DIR = Path(os.getenv('PROFILING_DIR', BASE_DIR / 'data' / 'profiles'))
+PROFILING_MAX_FILES = int(os.getenv('PROFILING_MAX_FILES', '100'))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -161,6 +256,9 @@ if cors_origins:
     CORS_ALLOWED_ORIGINS = cors_origins.split(',')
 else:
     CORS_ALLOW_ALL_ORIGINS = True  # Nur für Development
+# Frontend darf Idempotency-Key senden und die Wiederholung erkennen
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
 
 REST_FRAMEWORK = {
     # 'DEFAULT_PERMISSION_CLASSES': [
@@ -172,6 +270,16 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
+    # JSON über orjson, falls installiert (sonst DRF Standard-Encoder), gleiche Ausgabe
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.fast_json.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.fast_json.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # Security Settings für Production
@@ -0,0 +1,67 @@
+"""
+Content-addressed file storage for user uploads.
+"""
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+
+class DeduplicatingFileSystemStorage(FileSystemStorage):
+    """
+    File system storage naming uploads after the SHA-256 of their content.
+
+    ``offers/photo.jpg`` is stored as ``offers/<sha256>.jpg``. Identical
+    uploads resolve to the same name, so the file is written only once and
+    shared by all rows referencing it. Stored files are never deleted or
+    overwritten by the application, which makes sharing safe.
+    """
+
+    def save(self, name, content, max_length=None):
+        """
+        Save content under its content hash unless it is already stored.
+
+        Args:
+            name: Name generated by the field's upload_to
+            content: File to store; uses ``content.content_hash`` if present
+            max_length: Maximum length of the returned name
+
+        Returns:
+            str: Stored name
+        """
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = getattr(content, 'content_hash', None) or self._hash(content)
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        name = os.path.join(directory, f'{digest}{extension}').replace('\\', '/')
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    @staticmethod
+    def _hash(content):
+        hasher = hashlib.sha256()
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        content.seek(0)
+        return hasher.hexdigest()
+
+
+upload_storage = DeduplicatingFileSystemStorage()
+
+
+def get_upload_storage():
+    """
+    Return the storage used for offer images and profile pictures.
+
+    Migrations reference the callable, so settings such as MEDIA_ROOT are
+    not frozen into them.
+
+    Returns:
+        DeduplicatingFileSystemStorage: Shared storage instance
+    """
+    return upload_storage
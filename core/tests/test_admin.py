@@ -0,0 +1,87 @@
+"""
+Tests for the admin changelists of the large tables.
+"""
+import io
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Max
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.query_plans import capture_selects, find_violations
+from offer_app.models import Offer, OfferDetail
+from order_app.models import Order
+from profile_app.models import Profile
+from review_app.models import Review
+
+MODELS = [Offer, OfferDetail, Order, Review, Profile]
+
+
+def changelist_url(model):
+    return reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+
+
+class LargeTableAdminTests(TestCase):
+    """Changelists join their relations, estimate counts and search indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('generate_dataset', users=40, seed=1, stdout=io.StringIO())
+        cls.admin_user = User.objects.create_superuser(username='admin', password='testpass123')
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_queries_do_not_grow_with_the_page(self):
+        """A page of 100 rows needs as many queries as a page of one row."""
+        for model in MODELS:
+            with self.subTest(model=model.__name__):
+                url = changelist_url(model)
+                full_page = self.count_queries(url)
+                with mock.patch.object(admin.site._registry[model], 'list_per_page', 1):
+                    self.assertEqual(self.count_queries(url), full_page)
+
+    def test_estimated_count(self):
+        """Large unfiltered tables are estimated, filtered results counted."""
+        url = changelist_url(Order)
+        Order.objects.order_by('pk').first().delete()
+        highest = Order.objects.aggregate(highest=Max('pk'))['highest']
+
+        with override_settings(ADMIN_EXACT_COUNT_LIMIT=0), CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.context['cl'].result_count, highest)
+        self.assertFalse([query for query in queries.captured_queries if 'COUNT(' in query['sql']])
+
+        response = self.client.get(url)
+        self.assertEqual(response.context['cl'].result_count, Order.objects.count())
+        with override_settings(ADMIN_EXACT_COUNT_LIMIT=0):
+            response = self.client.get(url, {'status__exact': 'completed'})
+        self.assertEqual(response.context['cl'].result_count, Order.objects.filter(status='completed').count())
+
+    def test_search(self):
+        """Search matches IDs and usernames exactly through indexes."""
+        order = Order.objects.select_related('customer_user').first()
+        response = self.client.get(changelist_url(Order), {'q': order.customer_user.username})
+        self.assertEqual(set(response.context['cl'].result_list),
+                         set(Order.objects.filter(customer_user=order.customer_user)))
+        response = self.client.get(changelist_url(Order), {'q': str(order.pk)})
+        self.assertIn(order, response.context['cl'].result_list)
+
+        username = order.customer_user.username
+        for model in MODELS:
+            for term in (username, '7'):
+                with self.subTest(model=model.__name__, term=term):
+                    statements = capture_selects(lambda: self.client.get(changelist_url(model), {'q': term}))
+                    violations = find_violations(statements)
+                    self.assertFalse(violations, '\n'.join(str(violation) for violation in violations))
@@ -0,0 +1,184 @@
+"""
+Tests for response compression and precompressed cache entries.
+"""
+import asyncio
+import gzip
+import unittest
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core import compression
+from core.middleware import CompressionMiddleware
+from offer_app.models import Offer, OfferDetail
+from profile_app.models import Profile
+
+
+def decompress(data, encoding):
+    if encoding == 'br':
+        return compression.brotli.decompress(data)
+    if encoding == 'zstd':
+        return compression.zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return gzip.decompress(data)
+
+
+ENCODINGS = [name for name in ('gzip', 'br', 'zstd') if compression.SUPPORTED[name]]
+
+
+class NegotiationTests(SimpleTestCase):
+    """Accept-Encoding parsing and server preference."""
+
+    def test_negotiate(self):
+        preference = ('br', 'zstd', 'gzip')
+        cases = [
+            ('gzip, deflate, br, zstd', 'br'),
+            ('gzip, deflate', 'gzip'),
+            ('br;q=0.5, gzip', 'gzip'),
+            ('gzip;q=0, br;q=0', None),
+            ('*', 'br'),
+            ('*;q=0.1, zstd', 'zstd'),
+            ('x-gzip', 'gzip'),
+            ('identity', None),
+            ('', None),
+            ('gzip;q=abc, br;q=0.2', 'br'),
+        ]
+        for header, expected in cases:
+            with self.subTest(header=header):
+                self.assertEqual(compression.negotiate(header, preference), expected)
+        self.assertEqual(compression.negotiate('br, gzip', ('gzip',)), 'gzip')
+
+    def test_missing_packages_are_skipped(self):
+        with mock.patch.dict(compression.SUPPORTED, {'br': False, 'zstd': False}):
+            self.assertEqual(compression.available_encodings(), ('gzip',))
+
+
+@override_settings(COMPRESSION_ENCODINGS=['br', 'zstd', 'gzip'], COMPRESSION_MIN_SIZE=1024)
+class CompressionMiddlewareTests(SimpleTestCase):
+    """The middleware on hand-made responses."""
+
+    body = b'{"results":[' + b','.join(b'{"title":"Logo %d","price":"50.00"}' % i for i in range(200)) + b']}'
+
+    def run_middleware(self, response, method='get', accept='gzip'):
+        request = getattr(RequestFactory(), method)('/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_each_encoding_round_trips(self):
+        for encoding in ENCODINGS:
+            with self.subTest(encoding=encoding):
+                response = HttpResponse(self.body, content_type='application/json')
+                response['ETag'] = '"abc"'
+                response = self.run_middleware(response, accept=encoding)
+                self.assertEqual(response['Content-Encoding'], encoding)
+                self.assertEqual(decompress(response.content, encoding), self.body)
+                self.assertEqual(response['Content-Length'], str(len(response.content)))
+                self.assertEqual(response['Vary'], 'Accept-Encoding')
+                self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_skipped_responses(self):
+        cases = [
+            (HttpResponse(b'{"a":1}', content_type='application/json'), 'get'),
+            (HttpResponse(self.body, content_type='image/png'), 'get'),
+            (HttpResponse(self.body, content_type='application/json'), 'post'),
+        ]
+        for response, method in cases:
+            with self.subTest(content_type=response['Content-Type'], method=method):
+                response = self.run_middleware(response, method=method)
+                self.assertFalse(response.has_header('Content-Encoding'))
+        response = self.run_middleware(HttpResponse(self.body, content_type='application/json'), accept='')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_precompressed_bytes_are_used(self):
+        response = HttpResponse(self.body, content_type='application/json')
+        response.precompressed = {'gzip': gzip.compress(self.body, 9)}
+        with mock.patch.object(compression, 'compress') as compress:
+            response = self.run_middleware(response)
+        compress.assert_not_called()
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+    def test_sync_stream(self):
+        chunks = [self.body[:100], self.body[100:2000], self.body[2000:]]
+        for encoding in ENCODINGS:
+            with self.subTest(encoding=encoding):
+                response = StreamingHttpResponse(iter(chunks), content_type='text/csv')
+                response = self.run_middleware(response, accept=encoding)
+                self.assertEqual(response['Content-Encoding'], encoding)
+                self.assertFalse(response.has_header('Content-Length'))
+                parts = list(response.streaming_content)
+                # every input chunk is flushed before the next one is read
+                self.assertGreaterEqual(len(parts), len(chunks))
+                self.assertEqual(decompress(b''.join(parts), encoding), self.body)
+
+    def test_async_stream(self):
+        async def chunks():
+            for start in range(0, len(self.body), 500):
+                yield self.body[start:start + 500]
+
+        async def get_response(request):
+            return StreamingHttpResponse(chunks(), content_type='application/json')
+
+        async def run():
+            request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+            response = await CompressionMiddleware(get_response)(request)
+            return response, b''.join([part async for part in response.streaming_content])
+
+        response, content = asyncio.run(run())
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(content), self.body)
+
+
+class CompressedEndpointTests(APITestCase):
+    """Compression of real API responses and cached offer pages."""
+
+    def setUp(self):
+        """Create enough offers for a page above the size threshold."""
+        business = User.objects.create_user(username='business', password='testpass123')
+        Profile.objects.create(user=business, type='business')
+        for index in range(20):
+            offer = Offer.objects.create(user=business, title=f'Logo {index}', description='Logo design')
+            for offer_type in ('basic', 'standard', 'premium'):
+                OfferDetail.objects.create(
+                    offer=offer, title=offer_type, revisions=1, delivery_time_in_days=3,
+                    price=50, features=['Logo', 'Flyer'], offer_type=offer_type)
+        self.url = reverse('offers-list')
+
+    def test_cached_offer_page_is_compressed_once(self):
+        plain = self.client.get(self.url, {'page_size': 20})
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            first = self.client.get(self.url, {'page_size': 20}, HTTP_ACCEPT_ENCODING='gzip')
+            second = self.client.get(self.url, {'page_size': 20}, HTTP_ACCEPT_ENCODING='gzip')
+
+        compress.assert_not_called()
+        for response in (first, second):
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertLess(len(first.content), len(plain.content) / 3)
+
+    def test_weak_etag_still_validates(self):
+        response = self.client.get(self.url, {'page_size': 20}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        response = self.client.get(self.url, {'page_size': 20}, HTTP_ACCEPT_ENCODING='gzip',
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cached_page_renders_other_formats(self):
+        self.client.get(self.url, {'page_size': 20})
+        response = self.client.get(self.url, {'page_size': 20}, HTTP_ACCEPT='application/json; indent=2')
+        self.assertIn(b'\n  "count"', response.content)
+        self.assertEqual(response.json()['count'], 20)
+
+    def test_authenticated_lists_are_compressed_per_request(self):
+        self.client.force_authenticate(user=User.objects.get(username='business'))
+        response = self.client.get(self.url, {'page_size': 20}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content)[:9], b'{"count":')
+
+    @unittest.skipUnless(compression.SUPPORTED['br'], 'brotli is not installed')
+    def test_brotli_preferred(self):
+        response = self.client.get(self.url, {'page_size': 20}, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
@@ -0,0 +1,229 @@
+"""
+Tests for conditional GET (ETag / Last-Modified) support.
+"""
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from offer_app.api.serializers import OfferDetailSerializer, OfferSerializer
+from offer_app.models import Offer, OfferDetail
+from order_app.models import Order
+from profile_app.api.serializers import ProfileSerializer
+from profile_app.models import Profile
+from review_app.models import Review
+
+
+class ConditionalGetTestData(APITestCase):
+    """Shared data: one offer with details, one order and one review."""
+
+    def setUp(self):
+        """Set up a business user, a customer, an offer, an order and a review."""
+        self.business_user = User.objects.create_user(
+            username='business', password='testpass123')
+        self.business_profile = Profile.objects.create(
+            user=self.business_user, type='business', first_name='Anna')
+        self.customer_user = User.objects.create_user(
+            username='customer', password='testpass123')
+        Profile.objects.create(user=self.customer_user, type='customer')
+
+        self.offer = Offer.objects.create(
+            user=self.business_user, title="Web Development",
+            description="Professional web development services")
+        self.details = [
+            OfferDetail.objects.create(
+                offer=self.offer, title=f"{offer_type} plan", revisions=1,
+                delivery_time_in_days=5, price=price,
+                features=["Feature 1", "Feature 2"], offer_type=offer_type)
+            for offer_type, price in (('basic', 100), ('standard', 200), ('premium', 300))
+        ]
+        self.order = Order.objects.create(
+            offer_detail=self.details[0], customer_user=self.customer_user,
+            business_user=self.business_user)
+        self.review = Review.objects.create(
+            reviewer=self.customer_user, business_user=self.business_user,
+            rating=5, description="Great work")
+
+        self.client.force_authenticate(user=self.customer_user)
+
+    def assert_revalidates(self, url, params=None):
+        """
+        Fetch a URL twice, the second time conditionally.
+
+        Returns:
+            int: Bytes saved by the 304 response
+        """
+        first = self.client.get(url, params)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', first)
+
+        second = self.client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.content, b'')
+
+        saved = len(first.content) - len(second.content)
+        self.assertGreater(saved, 0)
+        return saved
+
+
+class ObjectConditionalGetTests(ConditionalGetTestData):
+    """Conditional GET for single-object endpoints."""
+
+    def urls(self):
+        return [
+            reverse('offers-detail', kwargs={'pk': self.offer.id}),
+            reverse('offer-details', kwargs={'pk': self.details[0].id}),
+            reverse('orders-detail', kwargs={'pk': self.order.id}),
+            reverse('reviews-detail', kwargs={'pk': self.review.id}),
+            reverse('profile-detail', kwargs={'pk': self.business_user.id}),
+        ]
+
+    def test_every_object_endpoint_answers_304(self):
+        """All single-object endpoints return 304 for a current ETag and save the full body."""
+        total_saved = 0
+        total_full = 0
+        for url in self.urls():
+            with self.subTest(url=url):
+                total_full += len(self.client.get(url).content)
+                total_saved += self.assert_revalidates(url)
+        self.assertEqual(total_saved, total_full)
+
+    def test_every_object_endpoint_sends_last_modified(self):
+        """All single-object endpoints send Last-Modified and honor If-Modified-Since."""
+        for url in self.urls():
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                self.assertIn('Last-Modified', first)
+                second = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+                self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_304_skips_serializer(self):
+        """A matching ETag is answered without running the serializer."""
+        cases = [
+            (reverse('offers-detail', kwargs={'pk': self.offer.id}), OfferSerializer),
+            (reverse('offer-details', kwargs={'pk': self.details[0].id}), OfferDetailSerializer),
+            (reverse('profile-detail', kwargs={'pk': self.business_user.id}), ProfileSerializer),
+        ]
+        for url, serializer_class in cases:
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with mock.patch.object(serializer_class, 'to_representation') as to_representation:
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+                to_representation.assert_not_called()
+
+    def test_stale_etag_returns_full_response(self):
+        """An ETag from before an update no longer matches."""
+        url = reverse('reviews-detail', kwargs={'pk': self.review.id})
+        etag = self.client.get(url)['ETag']
+
+        self.review.rating = 3
+        self.review.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['rating'], 3)
+
+    def test_offer_update_changes_offer_detail_etag(self):
+        """Offer details are validated by the parent offer's updated_at."""
+        url = reverse('offer-details', kwargs={'pk': self.details[0].id})
+        etag = self.client.get(url)['ETag']
+
+        self.client.force_authenticate(user=self.business_user)
+        self.client.patch(
+            reverse('offers-detail', kwargs={'pk': self.offer.id}),
+            {'details': [{'offer_type': 'basic', 'price': 150}]}, format='json')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['price'], 150)
+
+    def test_profile_update_changes_etag(self):
+        """Profile changes are picked up through the new updated_at field."""
+        url = reverse('profile-detail', kwargs={'pk': self.business_user.id})
+        etag = self.client.get(url)['ETag']
+
+        self.client.force_authenticate(user=self.business_user)
+        self.client.patch(url, {'first_name': 'Berta'}, format='json')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['first_name'], 'Berta')
+
+    def test_nonexistent_object_still_returns_404(self):
+        """Conditional headers do not hide missing objects."""
+        response = self.client.get(
+            reverse('orders-detail', kwargs={'pk': 9999}), HTTP_IF_NONE_MATCH='"abc"')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_old_if_modified_since_returns_full_response(self):
+        """A date before the last update yields the full body."""
+        url = reverse('orders-detail', kwargs={'pk': self.order.id})
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(0))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+# cache hits are asserted to need no queries, which a database cache cannot offer
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ListConditionalGetTests(ConditionalGetTestData):
+    """Conditional GET for list endpoints."""
+
+    def test_every_list_endpoint_answers_304(self):
+        """Offer, order and review lists return 304 for a current ETag."""
+        for url, params in [
+            (reverse('offers-list'), {'page_size': 10}),
+            (reverse('orders-list'), None),
+            (reverse('reviews-list'), {'business_user': self.business_user.id}),
+        ]:
+            with self.subTest(url=url):
+                self.assert_revalidates(url, params)
+
+    def test_anonymous_offer_list_answers_304_from_cache(self):
+        """Cached anonymous listings are revalidated without a query."""
+        self.client.force_authenticate(user=None)
+        url = reverse('offers-list')
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_lists_send_no_last_modified(self):
+        """Lists only use ETags because deletions do not move max(updated_at)."""
+        response = self.client.get(reverse('reviews-list'))
+        self.assertNotIn('Last-Modified', response)
+
+    def test_deletion_changes_list_etag(self):
+        """Removing a row changes the list ETag through the count."""
+        url = reverse('orders-list')
+        etag = self.client.get(url)['ETag']
+
+        self.order.delete()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [])
+
+    def test_creator_profile_change_changes_offer_list_etag(self):
+        """Names in user_details are covered by the profile's updated_at."""
+        url = reverse('offers-list')
+        etag = self.client.get(url)['ETag']
+
+        self.business_profile.first_name = 'Clara'
+        self.business_profile.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_depends_on_query(self):
+        """Different filters produce different ETags."""
+        url = reverse('reviews-list')
+        all_reviews = self.client.get(url)['ETag']
+        filtered = self.client.get(url, {'reviewer_id': self.customer_user.id})['ETag']
+        self.assertNotEqual(all_reviews, filtered)
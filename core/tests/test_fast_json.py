@@ -0,0 +1,143 @@
+"""
+Tests for the orjson based renderer and parser.
+"""
+import datetime
+import decimal
+import io
+import uuid
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from core import fast_json
+from core.fast_json import FastJSONParser, FastJSONRenderer
+from offer_app.models import Offer, OfferDetail
+from order_app.models import Order
+from profile_app.models import Profile
+
+PAYLOADS = [
+    {'id': 1, 'title': 'Logo Design', 'features': ['Logo', 'Visitenkarte'], 'price': 50.0},
+    [{'created_at': timezone.now(), 'naive': datetime.datetime(2024, 5, 1, 12, 30, 0, 5)},
+     {'date': datetime.date(2024, 5, 1), 'time': datetime.time(8, 15)}],
+    {'price': decimal.Decimal('149.90'), 'id': uuid.UUID(int=7), 'lazy': gettext_lazy('Hello')},
+    {'text': 'Ümlaut €     "quoted" \\ \x01 \n', 'nested': {'a': (1, 2), 1: None}},
+    {'big': 2 ** 70, 'negative': -0.0, 'flag': True, 'empty': [], 'none': None},
+    {'generator': (value for value in range(3)), 'set': {1}},
+]
+
+
+def create_offer():
+    """Create a business user with one offer and three details."""
+    business = User.objects.create_user(username='business', password='testpass123')
+    Profile.objects.create(user=business, type='business')
+    offer = Offer.objects.create(user=business, title='Logo', description='Logo design  ')
+    for index, offer_type in enumerate(('basic', 'standard', 'premium')):
+        OfferDetail.objects.create(
+            offer=offer, title=offer_type, revisions=index, delivery_time_in_days=index + 1,
+            price=decimal.Decimal('49.90') * (index + 1), features=['Logo', 'Flyer'],
+            offer_type=offer_type)
+    return business, offer
+
+
+class FastJSONRendererTests(TestCase):
+    """The renderer produces the same bytes as DRF's JSONRenderer."""
+
+    def assertSameBytes(self, data, *args):
+        expected = JSONRenderer().render(data, *args)
+        self.assertEqual(FastJSONRenderer().render(data, *args), expected)
+
+    def test_payloads_match_drf(self):
+        for data in PAYLOADS:
+            with self.subTest(data=data):
+                # generators can only be consumed once
+                if isinstance(data, dict) and 'generator' in data:
+                    expected = JSONRenderer().render({**data, 'generator': iter(range(3))})
+                    self.assertEqual(FastJSONRenderer().render(data), expected)
+                else:
+                    self.assertSameBytes(data)
+
+    def test_indent_and_none(self):
+        self.assertSameBytes({'a': [1, 2]}, 'application/json; indent=4')
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_field_file_renders_as_url(self):
+        offer = Offer(image='offers/logo.png')
+        rendered = FastJSONRenderer().render({'image': offer.image, 'empty': Offer().image})
+        self.assertEqual(rendered, b'{"image":"%s","empty":null}' % offer.image.url.encode())
+
+    def test_fallback_without_orjson(self):
+        with mock.patch.object(fast_json, 'orjson', None):
+            self.assertSameBytes(PAYLOADS[0])
+            self.assertEqual(FastJSONParser().parse(io.BytesIO(b'{"a":1}')), {'a': 1})
+
+
+class FastJSONParserTests(TestCase):
+    """The parser accepts and rejects the same documents as DRF's JSONParser."""
+
+    def parse_both(self, body, **context):
+        results = []
+        for parser in (JSONParser(), FastJSONParser()):
+            try:
+                results.append(parser.parse(io.BytesIO(body), parser_context=context))
+            except ParseError as exc:
+                results.append(('error', str(exc.detail)))
+        return results
+
+    def test_documents_match_drf(self):
+        bodies = [
+            b'{"offer_detail_ids": [1, 2, 3], "note": "\\u00fc"}',
+            '{"title": "Café"}'.encode(),
+            b'[1.5, -0.0, 1e3, 123456789012345678901234567890]',
+            b'{"a": NaN}', b'{"a": 1,}', b'', b'\xff',
+        ]
+        for body in bodies:
+            with self.subTest(body=body):
+                expected, result = self.parse_both(body)
+                self.assertEqual(result, expected)
+
+    def test_declared_charset(self):
+        body = '{"title": "Café"}'.encode('latin-1')
+        expected, result = self.parse_both(body, encoding='latin-1')
+        self.assertEqual(result, expected)
+        self.assertEqual(result, {'title': 'Café'})
+
+
+class FastJSONEndpointTests(APITestCase):
+    """Real API responses are identical with both renderers."""
+
+    def setUp(self):
+        self.business, self.offer = create_offer()
+        customer = User.objects.create_user(username='customer', password='testpass123')
+        Profile.objects.create(user=customer, type='customer')
+        Order.objects.create(offer_detail=self.offer.details.first(), customer_user=customer,
+                             business_user=self.business)
+        self.customer = customer
+
+    def test_responses_match_drf(self):
+        self.client.force_authenticate(user=self.customer)
+        urls = [reverse('offers-list'), reverse('offers-detail', kwargs={'pk': self.offer.pk}),
+                reverse('orders-list'), reverse('base-info')]
+        for url in urls:
+            with self.subTest(url=url):
+                fast = self.client.get(url).content
+                with mock.patch('rest_framework.views.APIView.renderer_classes', [JSONRenderer]):
+                    stdlib = self.client.get(url).content
+                self.assertEqual(fast, stdlib)
+
+    def test_json_request_bodies_are_parsed(self):
+        self.client.force_authenticate(user=self.customer)
+        response = self.client.post(reverse('orders-list'),
+                                    {'offer_detail_id': self.offer.details.first().id}, format='json')
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post(reverse('orders-list'), b'{"offer_detail_id":',
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.json()['detail'].startswith('JSON parse error'))
@@ -0,0 +1,188 @@
+"""
+Tests for Idempotency-Key support on POST endpoints.
+"""
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from offer_app.models import Offer, OfferDetail
+from ops_app.models import IdempotencyRecord
+from order_app.api.serializers import OrderSerializer
+from order_app.models import Order
+from profile_app.models import Profile
+from review_app.models import Review
+
+
+def create_marketplace():
+    """Create a customer, a business user and one offer detail."""
+    customer = User.objects.create_user(username='customer', password='testpass123')
+    Profile.objects.create(user=customer, type='customer')
+    business = User.objects.create_user(username='business', password='testpass123')
+    Profile.objects.create(user=business, type='business')
+    offer = Offer.objects.create(user=business, title='Logo', description='Logo design')
+    detail = OfferDetail.objects.create(
+        offer=offer, title='Basic', revisions=1, delivery_time_in_days=3,
+        price=50, features=['Logo'], offer_type='basic')
+    return customer, business, detail
+
+
+class IdempotencyKeyTests(APITestCase):
+    """Retried POSTs with the same key are answered from the stored response."""
+
+    def setUp(self):
+        """Set up users and an offer detail; authenticate as the customer."""
+        self.customer, self.business, self.detail = create_marketplace()
+        self.client.force_authenticate(user=self.customer)
+
+    def post(self, url, data, key, **extra):
+        return self.client.post(url, data, format='json', HTTP_IDEMPOTENCY_KEY=key, **extra)
+
+    def test_retried_order_is_created_once(self):
+        url = reverse('orders-list')
+        first = self.post(url, {'offer_detail_id': self.detail.id}, 'order-1')
+        with mock.patch.object(OrderSerializer, 'create') as create:
+            second = self.post(url, {'offer_detail_id': self.detail.id}, 'order-1')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertNotIn('Idempotent-Replayed', first)
+        create.assert_not_called()
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        url = reverse('orders-list')
+        for _ in range(2):
+            self.client.post(url, {'offer_detail_id': self.detail.id}, format='json')
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_new_key_creates_a_new_order(self):
+        url = reverse('orders-list')
+        self.post(url, {'offer_detail_id': self.detail.id}, 'order-1')
+        self.post(url, {'offer_detail_id': self.detail.id}, 'order-2')
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_key_reused_with_another_payload_is_rejected(self):
+        other = OfferDetail.objects.create(
+            offer=self.detail.offer, title='Premium', revisions=3, delivery_time_in_days=7,
+            price=150, features=['Logo'], offer_type='premium')
+        url = reverse('orders-list')
+        self.post(url, {'offer_detail_id': self.detail.id}, 'order-1')
+        response = self.post(url, {'offer_detail_id': other.id}, 'order-1')
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_keys_are_scoped_to_the_user(self):
+        other_customer = User.objects.create_user(username='customer2', password='testpass123')
+        Profile.objects.create(user=other_customer, type='customer')
+        url = reverse('orders-list')
+        self.post(url, {'offer_detail_id': self.detail.id}, 'shared-key')
+        self.client.force_authenticate(user=other_customer)
+        response = self.post(url, {'offer_detail_id': self.detail.id}, 'shared-key')
+
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_failed_validation_is_not_stored(self):
+        url = reverse('orders-list')
+        invalid = self.post(url, {}, 'order-1')
+        valid = self.post(url, {'offer_detail_id': self.detail.id}, 'order-1')
+
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(valid.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', valid)
+
+    def test_expired_and_abandoned_records_are_replaced(self):
+        url = reverse('orders-list')
+        self.post(url, {'offer_detail_id': self.detail.id}, 'order-1')
+        IdempotencyRecord.objects.update(created_at=timezone.now() - timedelta(days=2))
+        expired = self.post(url, {'offer_detail_id': self.detail.id}, 'order-1')
+        # a request that died while processing its key
+        IdempotencyRecord.objects.update(status_code=None, created_at=timezone.now() - timedelta(minutes=1))
+        abandoned = self.post(url, {'offer_detail_id': self.detail.id}, 'order-1')
+
+        self.assertNotIn('Idempotent-Replayed', expired)
+        self.assertNotIn('Idempotent-Replayed', abandoned)
+        self.assertEqual(Order.objects.count(), 3)
+        self.assertEqual(IdempotencyRecord.objects.count(), 1)
+
+    def test_invalid_key_is_rejected(self):
+        response = self.post(reverse('orders-list'), {'offer_detail_id': self.detail.id}, 'x' * 256)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_checkout_review_and_offer_creation(self):
+        checkout = {'offer_detail_ids': [self.detail.id, self.detail.id]}
+        review = {'business_user': self.business.id, 'rating': 5, 'description': 'Great'}
+        offer = {
+            'title': 'Website', 'description': 'Website development',
+            'details': [
+                {'title': title, 'revisions': 1, 'delivery_time_in_days': 5, 'price': 100,
+                 'features': ['Page'], 'offer_type': title}
+                for title in ('basic', 'standard', 'premium')
+            ],
+        }
+        cases = (
+            (self.customer, reverse('orders-checkout'), checkout, Order.objects.all, 2),
+            (self.customer, reverse('reviews-list'), review, Review.objects.all, 1),
+            (self.business, reverse('offers-list'), offer, Offer.objects.filter(title='Website').all, 1),
+        )
+        for user, url, data, rows, expected in cases:
+            with self.subTest(url=url):
+                self.client.force_authenticate(user=user)
+                first = self.post(url, data, f'key-{url}')
+                second = self.post(url, data, f'key-{url}')
+                self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+                self.assertEqual(second.data, first.data)
+                self.assertEqual(second['Idempotent-Replayed'], 'true')
+                self.assertEqual(rows().count(), expected)
+
+
+class ConcurrentIdempotencyTests(TransactionTestCase):
+    """Duplicates sent while the first request is still running wait for its result."""
+
+    def setUp(self):
+        """Set up users and an offer detail."""
+        self.customer, _, self.detail = create_marketplace()
+
+    def test_parallel_duplicates_create_one_order(self):
+        create = OrderSerializer.create
+
+        def slow_create(serializer, validated_data):
+            time.sleep(0.3)
+            return create(serializer, validated_data)
+
+        responses = []
+
+        def send():
+            client = APIClient()
+            client.force_authenticate(user=self.customer)
+            try:
+                responses.append(client.post(
+                    reverse('orders-list'), {'offer_detail_id': self.detail.id},
+                    format='json', HTTP_IDEMPOTENCY_KEY='parallel'))
+            finally:
+                connection.close()
+
+        with mock.patch.object(OrderSerializer, 'create', slow_create):
+            threads = [threading.Thread(target=send) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual({response.status_code for response in responses}, {status.HTTP_201_CREATED})
+        self.assertEqual({response.data['id'] for response in responses}, {Order.objects.get().id})
+        self.assertEqual(sum('Idempotent-Replayed' in response for response in responses), 4)
@@ -0,0 +1,140 @@
+"""
+Tests for load shedding of expensive read requests.
+"""
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core import load_shedding, metrics
+from core.load_shedding import LoadTracker
+from profile_app.models import Profile
+
+
+@override_settings(LOAD_SHED_DIR=None, LOAD_SHED_EXPENSIVE_MS=100,
+                   LOAD_SHED_MAX_EXPENSIVE=1, LOAD_SHED_MAX_IN_FLIGHT=0)
+class LoadTrackerTests(APITestCase):
+    """Latency classification and admission decisions of one process."""
+
+    def setUp(self):
+        self.tracker = LoadTracker()
+
+    def test_route_class_is_expensive_after_slow_requests(self):
+        self.tracker.observe('offers-list[search]', 0.02)
+        self.assertFalse(self.tracker.is_expensive('offers-list[search]'))
+        for _ in range(10):
+            self.tracker.observe('offers-list[search]', 0.5)
+        self.assertTrue(self.tracker.is_expensive('offers-list[search]'))
+        self.assertFalse(self.tracker.is_expensive('offers-list'))
+
+    def test_expensive_limit_counts_running_requests(self):
+        self.tracker.started()
+        self.assertTrue(self.tracker.admit_expensive())
+        self.tracker.started()
+        self.assertFalse(self.tracker.admit_expensive())
+        self.tracker.finished(expensive=True)
+        self.assertTrue(self.tracker.admit_expensive())
+
+    @override_settings(LOAD_SHED_MAX_EXPENSIVE=10, LOAD_SHED_MAX_IN_FLIGHT=3)
+    def test_in_flight_limit(self):
+        for _ in range(3):
+            self.tracker.started()
+        self.assertTrue(self.tracker.admit_expensive())
+        self.tracker.started()
+        self.assertFalse(self.tracker.admit_expensive())
+
+    def test_siblings_are_counted_through_the_directory(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(LOAD_SHED_DIR=directory):
+            # a live sibling process (the parent) with one expensive request running
+            sibling = os.path.join(directory, f'{load_shedding.FILE_PREFIX}{os.getppid()}')
+            with open(sibling, 'wb') as file:
+                file.write(load_shedding.COUNTER.pack(1, 1))
+            # a dead one is ignored and removed
+            dead = os.path.join(directory, f'{load_shedding.FILE_PREFIX}999999999')
+            with open(dead, 'wb') as file:
+                file.write(load_shedding.COUNTER.pack(5, 5))
+
+            self.tracker.started()
+            self.assertFalse(self.tracker.admit_expensive())
+            self.assertFalse(os.path.exists(dead))
+            self.assertTrue(os.path.exists(os.path.join(
+                directory, f'{load_shedding.FILE_PREFIX}{os.getpid()}')))
+            for fd in self.tracker.siblings.values():
+                os.close(fd)
+            os.close(self.tracker.fd)
+
+    def test_retry_after_follows_latency(self):
+        self.assertEqual(self.tracker.retry_after('unknown'), 1)
+        self.tracker.observe('slow', 2.4)
+        self.assertEqual(self.tracker.retry_after('slow'), 3)
+
+
+@override_settings(LOAD_SHEDDING=True, LOAD_SHED_DIR=None, LOAD_SHED_EXPENSIVE_MS=100,
+                   LOAD_SHED_MAX_EXPENSIVE=1, LOAD_SHED_MAX_IN_FLIGHT=0)
+class LoadSheddingMiddlewareTests(APITestCase):
+    """Expensive GETs are rejected while the expensive slots are taken."""
+
+    def setUp(self):
+        """Use a fresh tracker and mark the search listing as expensive."""
+        self.tracker = LoadTracker()
+        patcher = mock.patch.object(load_shedding, 'tracker', self.tracker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.tracker.observe('offers-list[search]', 1.5)
+
+    def test_expensive_request_is_shed_when_slots_are_taken(self):
+        # another request holds the only expensive slot
+        self.tracker.started()
+        self.tracker.admit_expensive()
+
+        response = self.client.get(reverse('offers-list'), {'search': 'logo'})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '2')
+        self.assertIn('detail', response.json())
+        counters, _, _ = metrics.collect()
+        self.assertEqual(counters[('http_requests_shed_total', (('route', 'offers-list'),))], 1)
+
+        # cheap requests still run
+        self.assertEqual(self.client.get(reverse('offers-list')).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(reverse('base-info')).status_code, status.HTTP_200_OK)
+
+    def test_expensive_request_runs_when_a_slot_is_free(self):
+        response = self.client.get(reverse('offers-list'), {'search': 'logo'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((self.tracker.in_flight, self.tracker.expensive), (0, 0))
+
+    def test_writes_are_never_shed(self):
+        self.tracker.observe('offers-list', 1.5)
+        self.tracker.started()
+        self.tracker.admit_expensive()
+        business = User.objects.create_user(username='business', password='testpass123')
+        Profile.objects.create(user=business, type='business')
+        self.client.force_authenticate(user=business)
+
+        response = self.client.post(reverse('offers-list'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_latency_is_learned_from_requests(self):
+        self.client.get(reverse('offers-list'), {'page_size': 5, 'page': 2})
+        self.assertIn('offers-list[page_size]', self.tracker.latency)
+
+    def test_unknown_query_parameters_do_not_create_classes(self):
+        for name in ('a', 'b', 'c'):
+            self.client.get(reverse('offers-list'), {name: 1, 'min_price': 10})
+        self.client.get(reverse('base-info'), {'search': 'logo'})
+        self.assertEqual(set(self.tracker.latency),
+                         {'offers-list[search]', 'offers-list[min_price]', 'base-info'})
+
+    @override_settings(LOAD_SHEDDING=False)
+    def test_disabled(self):
+        self.tracker.started()
+        self.tracker.admit_expensive()
+        response = self.client.get(reverse('offers-list'), {'search': 'logo'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,183 @@
+"""
+Tests for the Prometheus metrics middleware and /metrics endpoint.
+"""
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core import metrics
+from offer_app.models import Offer, OfferDetail
+from profile_app.models import Profile
+
+
+@override_settings(METRICS_TOKEN='secret')
+class MetricsTestCase(APITestCase):
+    """Metrics recorded by real requests in a single process."""
+
+    def setUp(self):
+        """Start from an empty registry and create one offer."""
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        business = User.objects.create_user(username='business', password='testpass123')
+        Profile.objects.create(user=business, type='business')
+        offer = Offer.objects.create(user=business, title='Logo', description='Logo design')
+        self.detail = OfferDetail.objects.create(
+            offer=offer, title='Basic', revisions=1, delivery_time_in_days=3,
+            price=50, features=['Logo'], offer_type='basic')
+
+    def scrape(self):
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def sample(self, text, name, **labels):
+        """Return the value of one sample line or None."""
+        for line in text.splitlines():
+            match = re.match(r'^(\w+)(?:\{(.*)\})? (\S+)$', line)
+            if not match or match.group(1) != name:
+                continue
+            found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ''))
+            if found == {key: str(value) for key, value in labels.items()}:
+                return float(match.group(3))
+        return None
+
+    def test_latency_histogram_labeled_by_route_and_status(self):
+        self.client.get(reverse('offers-list'))
+        self.client.get(reverse('offer-details', kwargs={'pk': self.detail.pk}))
+        self.client.get('/api/does-not-exist/')
+        text = self.scrape()
+
+        self.assertEqual(self.sample(text, 'http_request_duration_seconds_count',
+                                     route='offers-list', method='GET', status=200), 1)
+        # offer details require authentication
+        self.assertEqual(self.sample(text, 'http_request_duration_seconds_count',
+                                     route='offer-details', method='GET', status=401), 1)
+        self.assertEqual(self.sample(text, 'http_request_duration_seconds_count',
+                                     route='unmatched', method='GET', status=404), 1)
+        self.assertEqual(self.sample(text, 'http_request_duration_seconds_bucket',
+                                     route='offers-list', method='GET', status=200, le='+Inf'), 1)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+
+    def test_database_queries_are_counted_per_route(self):
+        self.client.get(reverse('offers-list'))
+        text = self.scrape()
+        queries = self.sample(text, 'http_request_db_queries_sum', route='offers-list')
+        self.assertGreater(queries, 0)
+        self.assertEqual(self.sample(text, 'http_request_db_queries_count', route='offers-list'), 1)
+
+    def test_offer_list_cache_hits_and_misses(self):
+        self.client.get(reverse('offers-list'))
+        self.client.get(reverse('offers-list'))
+        text = self.scrape()
+        self.assertEqual(self.sample(text, 'cache_requests_total', cache='offers-list', result='miss'), 1)
+        self.assertEqual(self.sample(text, 'cache_requests_total', cache='offers-list', result='hit'), 1)
+
+    def test_in_flight_gauge_counts_the_scrape_itself(self):
+        self.client.get(reverse('offers-list'))
+        self.assertEqual(self.sample(self.scrape(), 'http_requests_in_flight'), 1)
+
+    def test_token_is_required(self):
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer other').status_code,
+                         status.HTTP_403_FORBIDDEN)
+        with override_settings(METRICS_TOKEN=''):
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code,
+                             status.HTTP_404_NOT_FOUND)
+
+    def test_label_values_are_escaped(self):
+        metrics.inc('cache_requests_total', cache='a"b\\c', result='hit')
+        self.assertIn('cache_requests_total{cache="a\\"b\\\\c",result="hit"} 1', self.scrape())
+
+
+class MultiProcessMetricsTestCase(APITestCase):
+    """Aggregation of the files written by several worker processes."""
+
+    def setUp(self):
+        """Use a temporary metrics directory."""
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        settings_override = override_settings(METRICS_DIR=str(self.directory))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def run_worker(self, hits):
+        """Record cache hits and in-flight requests in a separate process that exits."""
+        script = (
+            'import django; django.setup()\n'
+            'from core import metrics\n'
+            f'for _ in range({hits}): metrics.inc("cache_requests_total", cache="offers-list", result="hit")\n'
+            'metrics.add_gauge("http_requests_in_flight", 1)\n'
+            'metrics.observe("http_request_db_queries", 4, route="base-info")\n'
+            'metrics.flush()\n'
+        )
+        env = dict(os.environ, METRICS_DIR=str(self.directory),
+                   DJANGO_SETTINGS_MODULE='core.settings', SECRET_KEY='test')
+        subprocess.run([sys.executable, '-c', script], cwd=Path(__file__).resolve().parents[2],
+                       env=env, check=True)
+
+    def test_counters_and_histograms_are_summed_across_processes(self):
+        self.run_worker(2)
+        self.run_worker(3)
+        metrics.inc('cache_requests_total', cache='offers-list', result='hit')
+        metrics.observe('http_request_db_queries', 1, route='base-info')
+
+        counters, gauges, histograms = metrics.collect()
+
+        hits = ('cache_requests_total', (('cache', 'offers-list'), ('result', 'hit')))
+        self.assertEqual(counters[hits], 6)
+        counts, total, count = histograms[('http_request_db_queries', (('route', 'base-info'),))]
+        self.assertEqual((total, count), (9, 3))
+        self.assertEqual(sum(counts), 3)
+        # the gauges of exited workers no longer count
+        self.assertEqual(gauges.get(('http_requests_in_flight', ()), 0), 0)
+        # exited workers are folded into the retired totals
+        self.assertEqual([file.name for file in self.directory.glob('metrics_*.json')],
+                         [f'metrics_{metrics.process_key()}.json'])
+        self.assertTrue((self.directory / metrics.RETIRED_FILE).exists())
+        self.assertEqual(metrics.collect()[0][hits], 6)
+
+    def test_counters_never_drop_when_workers_exit(self):
+        hits = ('cache_requests_total', (('cache', 'offers-list'), ('result', 'hit')))
+        self.run_worker(2)
+        self.assertEqual(metrics.collect()[0][hits], 2)
+        self.run_worker(3)
+        self.assertEqual(metrics.collect()[0][hits], 5)
+        self.assertEqual(metrics.collect()[0][hits], 5)
+
+    def test_reused_pid_does_not_overwrite_the_exited_worker(self):
+        """A file of a live pid with another start time belongs to an exited worker."""
+        stale = {'counters': [['cache_requests_total', [['cache', 'offers-list'], ['result', 'hit']], 4]],
+                 'gauges': [['http_requests_in_flight', [], 1]], 'histograms': []}
+        (self.directory / f'metrics_{os.getpid()}_0.json').write_text(json.dumps(stale))
+        metrics.inc('cache_requests_total', cache='offers-list', result='hit')
+
+        counters, gauges, _ = metrics.collect()
+
+        self.assertEqual(counters[('cache_requests_total', (('cache', 'offers-list'), ('result', 'hit')))], 5)
+        self.assertEqual(gauges.get(('http_requests_in_flight', ()), 0), 0)
+        self.assertFalse((self.directory / f'metrics_{os.getpid()}_0.json').exists())
+
+    def test_flush_writes_the_registry_of_this_process(self):
+        metrics.add_gauge('http_requests_in_flight', 2)
+        metrics.flush()
+        dump = json.loads((self.directory / f'metrics_{metrics.process_key()}.json').read_text())
+        self.assertEqual(dump['gauges'], [['http_requests_in_flight', [], 2]])
+
+    def test_clear_directory_removes_previous_run(self):
+        self.run_worker(1)
+        metrics.clear_directory(self.directory)
+        self.assertEqual(list(self.directory.glob('metrics_*.json')), [])
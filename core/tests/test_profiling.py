@@ -0,0 +1,125 @@
+"""
+Tests for the sampling profiler middleware and the profiles command.
+"""
+import io
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from core import profiling
+from offer_app.models import Offer
+from profile_app.models import Profile
+
+
+class ProfilingTestCase(APITestCase):
+    """Profiles recorded by the middleware into a temporary ring buffer."""
+
+    def setUp(self):
+        """Use a temporary profile directory and create users and an offer."""
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        settings_override = override_settings(PROFILING_DIR=self.directory, PROFILING_INTERVAL=0.0005)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff = User.objects.create_user(username='staff', password='pass', is_staff=True)
+        self.staff_token = Token.objects.create(user=self.staff)
+        business = User.objects.create_user(username='business', password='pass')
+        Profile.objects.create(user=business, type='business')
+        self.business_token = Token.objects.create(user=business)
+        Offer.objects.create(user=business, title='Logo', description='Logo design')
+
+    def get_offers(self, token=None, **headers):
+        if token:
+            headers['HTTP_AUTHORIZATION'] = f'Token {token.key}'
+        return self.client.get(reverse('offers-list'), **headers)
+
+    def test_requests_are_not_profiled_by_default(self):
+        response = self.get_offers(self.staff_token, HTTP_X_PROFILE='1')
+        self.assertIn('X-Profile-Id', response)
+        response = self.get_offers(self.staff_token)
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(len(profiling.list_profiles()), 1)
+
+    def test_header_is_ignored_for_non_staff_users(self):
+        self.assertNotIn('X-Profile-Id', self.get_offers(HTTP_X_PROFILE='1'))
+        self.assertNotIn('X-Profile-Id', self.get_offers(self.business_token, HTTP_X_PROFILE='1'))
+        self.assertEqual(profiling.list_profiles(), [])
+
+    def test_staff_session_user_can_request_a_profile(self):
+        self.client.force_login(self.staff)
+        self.assertIn('X-Profile-Id', self.get_offers(HTTP_X_PROFILE='1'))
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sample_rate_profiles_anonymous_requests(self):
+        response = self.get_offers()
+        data = profiling.load(response['X-Profile-Id'])
+        self.assertEqual(data['route'], 'offers-list')
+        self.assertEqual(data['status'], 200)
+        self.assertGreater(data['duration_ms'], 0)
+        self.assertTrue(any('offer_app_offer' in query['sql'] for query in data['sql']))
+        self.assertEqual(data['call_tree']['samples'], data['samples'])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_MAX_FILES=3)
+    def test_ring_buffer_keeps_the_newest_profiles(self):
+        ids = [self.get_offers()['X-Profile-Id'] for _ in range(5)]
+        self.assertEqual(profiling.list_profiles(), ids[:-4:-1])
+        self.assertEqual(len(list(self.directory.glob('*.json'))), 3)
+
+    def test_sampler_captures_the_request_thread(self):
+        def busy_view():
+            deadline = time.perf_counter() + 0.1
+            while time.perf_counter() < deadline:
+                pass
+
+        with profiling.RequestProfile() as profile:
+            busy_view()
+        tree = profiling.call_tree(profile.sampler.stacks)
+        self.assertGreater(profile.sampler.samples, 5)
+        self.assertTrue(any('busy_view' in line for line in profiling.folded_stacks(tree)))
+
+    def test_call_tree_and_folded_stacks(self):
+        tree = profiling.call_tree({('a', 'b'): 3, ('a', 'c'): 1, ('a',): 2})
+        self.assertEqual(tree['samples'], 6)
+        self.assertEqual([child['name'] for child in tree['children'][0]['children']], ['b', 'c'])
+        self.assertEqual(sorted(profiling.folded_stacks(tree)), ['a 2', 'a;b 3', 'a;c 1'])
+
+    def test_sql_is_grouped_by_statement(self):
+        breakdown = profiling.sql_breakdown([
+            ('SELECT * FROM t WHERE id = 1', 0.002),
+            ('SELECT * FROM t WHERE id = 2', 0.001),
+            ("SELECT * FROM u WHERE name = 'x'", 0.0005),
+        ])
+        self.assertEqual(breakdown[0], {'sql': 'SELECT * FROM t WHERE id = ?', 'count': 2, 'total_ms': 3.0})
+        self.assertEqual(breakdown[1]['sql'], 'SELECT * FROM u WHERE name = ?')
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_command_lists_shows_and_exports_profiles(self):
+        profile_id = self.get_offers()['X-Profile-Id']
+
+        out = io.StringIO()
+        call_command('profiles', stdout=out)
+        self.assertIn(profile_id, out.getvalue())
+        self.assertIn('GET /api/offers/', out.getvalue())
+
+        out = io.StringIO()
+        call_command('profiles', profile_id, stdout=out)
+        self.assertIn('Call tree:', out.getvalue())
+        self.assertIn('offer_app_offer', out.getvalue())
+
+        target = self.directory / 'export.json'
+        call_command('profiles', profile_id, output=str(target), stdout=io.StringIO())
+        self.assertEqual(json.loads(target.read_text())['route'], 'offers-list')
+
+        with self.assertRaises(CommandError):
+            call_command('profiles', '../secret', stdout=io.StringIO())
@@ -0,0 +1,119 @@
+"""
+Query plan regression tests for list endpoints and their filters.
+
+Every combination of filter and ordering parameters is requested once, and
+the SELECT statements it emits are explained. A full table scan of a large
+table, or a sort over such a scan, fails the test unless the case lists it
+as unavoidable.
+"""
+import io
+from itertools import product
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.query_plans import capture_selects, find_violations
+
+SCAN_OFFERS = {('full table scan', 'offer_app_offer'), ('sort', 'offer_app_offer')}
+
+# Unavoidable plans, by query parameter:
+# - search uses LIKE '%term%', which no B-tree index can serve
+# - min_price / max_delivery_time filter and order on aggregates over all
+#   details of an offer, which have to be computed for every offer
+OFFER_PARAM_ALLOWANCES = {
+    'search': SCAN_OFFERS,
+    'min_price': SCAN_OFFERS,
+    'max_delivery_time': SCAN_OFFERS,
+    'ordering=min_price': SCAN_OFFERS,
+    'ordering=-min_price': SCAN_OFFERS,
+}
+
+
+class QueryPlanTestCase(APITestCase):
+    """Base class seeding a small dataset and checking plans."""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('generate_dataset', users=40, seed=1, stdout=io.StringIO())
+        cls.business_user = User.objects.filter(profile__type='business').first()
+        cls.customer_user = User.objects.filter(profile__type='customer').first()
+
+    def assertPlansUseIndexes(self, url, params, allowed=()):
+        """Request the URL and fail on unexpected scans or sorts."""
+        statements = capture_selects(lambda: self.assertEqual(
+            self.client.get(url, params).status_code, 200))
+        violations = find_violations(statements, allowed=allowed)
+        self.assertFalse(violations, '\n'.join(str(violation) for violation in violations))
+
+
+class OfferListQueryPlanTests(QueryPlanTestCase):
+    """Plans of /api/offers/ for all filter and ordering combinations."""
+
+    FILTERS = [
+        {},
+        {'creator_id': None},
+        {'min_price': 100},
+        {'max_delivery_time': 7},
+        {'search': 'logo'},
+        {'feature': 'Source files'},
+        {'creator_id': None, 'min_price': 100, 'max_delivery_time': 7},
+    ]
+    ORDERINGS = [None, 'updated_at', '-updated_at', 'min_price', '-min_price']
+
+    def test_offer_list_plans(self):
+        """Offer listing filters and orderings use indexes."""
+        self.client.force_authenticate(user=self.business_user)
+        for filters, ordering in product(self.FILTERS, self.ORDERINGS):
+            params = {'page_size': 12, **filters}
+            if 'creator_id' in params:
+                params['creator_id'] = self.business_user.id
+            if ordering:
+                params['ordering'] = ordering
+            allowed = set()
+            for name in filters:
+                allowed |= OFFER_PARAM_ALLOWANCES.get(name, set())
+            allowed |= OFFER_PARAM_ALLOWANCES.get(f'ordering={ordering}', set())
+            with self.subTest(params=params):
+                self.assertPlansUseIndexes(reverse('offers-list'), params, allowed)
+
+
+class ReviewListQueryPlanTests(QueryPlanTestCase):
+    """Plans of /api/reviews/ for all filter and ordering combinations."""
+
+    FILTERS = ['', 'business_user_id', 'reviewer_id']
+    ORDERINGS = [None, 'updated_at', '-updated_at', 'rating', '-rating']
+
+    def test_review_list_plans(self):
+        """Review filters and orderings use indexes."""
+        self.client.force_authenticate(user=self.customer_user)
+        values = {'business_user_id': self.business_user.id, 'reviewer_id': self.customer_user.id}
+        for name, ordering in product(self.FILTERS, self.ORDERINGS):
+            params = {name: values[name]} if name else {}
+            if ordering:
+                params['ordering'] = ordering
+            with self.subTest(params=params):
+                self.assertPlansUseIndexes(reverse('reviews-list'), params)
+
+
+class OrderListQueryPlanTests(QueryPlanTestCase):
+    """Plans of /api/orders/ for customers and business users."""
+
+    def test_order_list_plans(self):
+        """Orders are looked up through the customer and business indexes."""
+        for user in (self.customer_user, self.business_user):
+            self.client.force_authenticate(user=user)
+            with self.subTest(user=user.profile.type):
+                self.assertPlansUseIndexes(reverse('orders-list'), {})
+
+
+class ProfileListQueryPlanTests(QueryPlanTestCase):
+    """Plans of the business and customer profile lists."""
+
+    def test_profile_list_plans(self):
+        """Profile lists filter by type through an index."""
+        self.client.force_authenticate(user=self.customer_user)
+        for name in ('profile-business', 'profile-customer'):
+            with self.subTest(url=name):
+                self.assertPlansUseIndexes(reverse(name), {})
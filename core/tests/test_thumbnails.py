@@ -0,0 +1,153 @@
+"""
+Tests for the image variant pipeline of offers and profiles.
+"""
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from core import thumbnails
+from offer_app.models import Offer
+from profile_app.models import Profile
+
+
+def make_image(size=(2400, 1600), fmt='JPEG'):
+    """Return encoded image bytes with some detail so compression is realistic."""
+    image = Image.effect_noise(size, 60).convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, quality=90)
+    return buffer.getvalue()
+
+
+class ThumbnailTests(APITestCase):
+    """Tests for generating and exposing resized image variants."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+        cls.jpeg = make_image()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        """Set up a business user with a profile and an offer with an image."""
+        self.user = User.objects.create_user(username='business1', password='testpass123')
+        self.profile = Profile.objects.create(user=self.user, type='business')
+        self.offer = Offer.objects.create(user=self.user, title='Design', description='Logos')
+        self.offer.image.save('photo.jpg', ContentFile(self.jpeg))
+
+    def _process_offer(self):
+        thumbnails.process(Offer, self.offer.pk, 'image', 'image_variants', ('card', 'detail'))
+        self.offer.refresh_from_db()
+
+    def test_saving_an_image_schedules_generation_after_commit(self):
+        """A new upload registers one background job on commit."""
+        with mock.patch.object(thumbnails, '_get_executor') as executor, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.offer.image.save('other.jpg', ContentFile(self.jpeg))
+        executor.return_value.submit.assert_called_once()
+
+    def test_unchanged_image_is_not_rescheduled(self):
+        """Saving an offer whose variants are current does not redo the work."""
+        self._process_offer()
+        with mock.patch.object(thumbnails, '_get_executor') as executor, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.offer.save()
+        executor.return_value.submit.assert_not_called()
+
+    def test_variants_are_resized_webp(self):
+        """Card is cropped to its exact size, detail keeps the aspect ratio."""
+        self._process_offer()
+        variants = self.offer.image_variants
+        self.assertEqual(variants['source'], self.offer.image.name)
+
+        with default_storage.open(variants['card']) as handle:
+            card = Image.open(handle)
+            self.assertEqual((card.format, card.size), ('WEBP', (400, 300)))
+        with default_storage.open(variants['detail']) as handle:
+            detail = Image.open(handle)
+            self.assertEqual(detail.size, (1200, 800))
+
+    def test_card_variant_is_smaller_than_original(self):
+        """The card variant transfers a fraction of the original bytes."""
+        self._process_offer()
+        card_size = default_storage.size(self.offer.image_variants['card'])
+        self.assertLess(card_size * 5, self.offer.image.size)
+
+    def test_offer_response_exposes_variant_urls(self):
+        """Offer responses contain absolute URLs of the generated variants."""
+        self._process_offer()
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('offers-detail', kwargs={'pk': self.offer.pk}))
+
+        card_url = response.data['image_thumbnails']['card']
+        self.assertTrue(card_url.startswith('http://testserver/media/thumbnails/'))
+        self.assertTrue(card_url.endswith('_card.webp'))
+
+    def test_variants_of_replaced_image_are_hidden(self):
+        """Variants of a previous upload are not served for a new image."""
+        self._process_offer()
+        self.offer.image.save('replacement.jpg', ContentFile(make_image((800, 600))))
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('offers-detail', kwargs={'pk': self.offer.pk}))
+
+        self.assertEqual(response.data['image_thumbnails'], {'card': None, 'detail': None})
+
+    def test_non_image_upload_has_no_variants(self):
+        """Files that are not images are recorded without variants."""
+        self.offer.image.save('notes.pdf', ContentFile(b'%PDF-1.4 not an image'))
+        self._process_offer()
+        self.assertEqual(self.offer.image_variants, {'source': self.offer.image.name})
+
+    def test_profile_response_exposes_avatar_url(self):
+        """Profile responses contain the avatar variant."""
+        self.profile.file.save('me.png', ContentFile(make_image((300, 500), 'PNG')))
+        thumbnails.process(Profile, self.profile.pk, 'file', 'file_variants', ('avatar',))
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('profile-detail', kwargs={'pk': self.user.pk}))
+
+        self.assertTrue(response.data['file_thumbnails']['avatar'].endswith('_avatar.webp'))
+        with default_storage.open(Profile.objects.get().file_variants['avatar']) as handle:
+            self.assertEqual(Image.open(handle).size, (128, 128))
+
+    def test_existing_variants_are_reused(self):
+        """Regenerating keeps the shared variant files instead of rewriting them."""
+        self._process_offer()
+        card = self.offer.image_variants['card']
+        other = Offer.objects.create(user=self.user, title='Copy', description='Same image')
+        other.image.save('copy.jpg', ContentFile(self.jpeg))
+        self.assertEqual(other.image.name, self.offer.image.name)
+
+        with mock.patch.object(default_storage, 'delete') as delete, \
+                mock.patch.object(thumbnails, 'render_variant') as render:
+            thumbnails.process(Offer, other.pk, 'image', 'image_variants', ('card', 'detail'))
+        delete.assert_not_called()
+        render.assert_not_called()
+        other.refresh_from_db()
+        self.assertEqual(other.image_variants['card'], card)
+        self.assertTrue(default_storage.exists(card))
+
+    def test_backfill_command_generates_missing_variants(self):
+        """The management command processes rows without current variants."""
+        call_command('generate_image_variants', stdout=io.StringIO())
+        self.offer.refresh_from_db()
+        self.assertIn('card', self.offer.image_variants)
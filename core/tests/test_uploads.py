@@ -0,0 +1,168 @@
+"""
+Tests for streaming, size-limited and de-duplicated image uploads.
+"""
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from core.uploads import StreamingImageUploadHandler, UploadTooLarge
+from offer_app.models import Offer
+from profile_app.models import Profile
+
+
+def png_bytes(color='red'):
+    """Return a small PNG image."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(UPLOAD_MAX_BYTES=256 * 1024)
+class StreamingUploadTests(APITestCase):
+    """Tests for uploads of offer images and profile pictures."""
+
+    def setUp(self):
+        """Set up an empty media root and a business user with two offers."""
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+        self.user = User.objects.create_user(username='business1', password='testpass123')
+        Profile.objects.create(user=self.user, type='business')
+        self.offer = Offer.objects.create(user=self.user, title='Design', description='Logos')
+        self.other_offer = Offer.objects.create(user=self.user, title='Web', description='Sites')
+        self.client.force_authenticate(user=self.user)
+
+    def _upload(self, offer, content, name='photo.png', content_type='image/png'):
+        return self.client.patch(
+            reverse('offers-detail', kwargs={'pk': offer.pk}),
+            {'image': SimpleUploadedFile(name, content, content_type)},
+            format='multipart')
+
+    def test_image_upload_is_stored_under_its_content_hash(self):
+        """Uploads are named after the SHA-256 of their content."""
+        response = self._upload(self.offer, png_bytes())
+
+        self.assertEqual(response.status_code, 200)
+        self.offer.refresh_from_db()
+        stem = os.path.splitext(os.path.basename(self.offer.image.name))[0]
+        self.assertEqual(len(stem), 64)
+        self.assertTrue(self.offer.image.name.startswith('offers/'))
+
+    def test_identical_uploads_share_one_file(self):
+        """The same image uploaded twice is stored once."""
+        self._upload(self.offer, png_bytes(), name='first.png')
+        self._upload(self.other_offer, png_bytes(), name='second.png')
+
+        self.offer.refresh_from_db()
+        self.other_offer.refresh_from_db()
+        self.assertEqual(self.offer.image.name, self.other_offer.image.name)
+        self.assertEqual(len(os.listdir(os.path.join(self.media_root, 'offers'))), 1)
+
+    def test_different_uploads_are_stored_separately(self):
+        """Different content gets different names."""
+        self._upload(self.offer, png_bytes('red'))
+        self._upload(self.other_offer, png_bytes('blue'))
+
+        self.offer.refresh_from_db()
+        self.other_offer.refresh_from_db()
+        self.assertNotEqual(self.offer.image.name, self.other_offer.image.name)
+
+    def test_extension_follows_detected_type(self):
+        """A PNG uploaded with a misleading name and type is stored as .png."""
+        self._upload(self.offer, png_bytes(), name='photo.html', content_type='text/html')
+
+        self.offer.refresh_from_db()
+        self.assertTrue(self.offer.image.name.endswith('.png'))
+
+    def test_non_image_upload_is_rejected(self):
+        """Files without an image signature are rejected with 415."""
+        response = self._upload(self.offer, b'<html>not an image</html>', name='photo.png')
+
+        self.assertEqual(response.status_code, 415)
+        self.offer.refresh_from_db()
+        self.assertFalse(self.offer.image)
+
+    def test_oversized_upload_is_rejected(self):
+        """Uploads above UPLOAD_MAX_BYTES are rejected with 413."""
+        content = png_bytes() + b'\0' * (512 * 1024)
+
+        response = self._upload(self.offer, content)
+
+        self.assertEqual(response.status_code, 413)
+        self.offer.refresh_from_db()
+        self.assertFalse(self.offer.image)
+
+    def test_profile_picture_upload(self):
+        """Profile pictures use the same upload path."""
+        response = self.client.patch(
+            reverse('profile-detail', kwargs={'pk': self.user.pk}),
+            {'file': SimpleUploadedFile('me.png', png_bytes(), 'image/png')},
+            format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Profile.objects.get(user=self.user).file.name.endswith('.png'))
+
+    def test_other_endpoints_keep_the_default_handlers(self):
+        """Multipart bodies outside the image endpoints may carry any file."""
+        self.client.force_authenticate(user=None)
+        self.user.set_password('testpass123')
+        self.user.save()
+
+        response = self.client.post(
+            reverse('login'),
+            {'username': 'business1', 'password': 'testpass123',
+             'attachment': SimpleUploadedFile('notes.txt', b'not an image', 'text/plain')},
+            format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(UPLOAD_MAX_BYTES=1024)
+class StreamingUploadHandlerTests(APITestCase):
+    """Tests for the upload handler without a multipart request."""
+
+    def _handler(self):
+        handler = StreamingImageUploadHandler(RequestFactory().post('/'))
+        handler.new_file('file', 'photo.png', 'image/png', None)
+        return handler
+
+    def test_announced_size_is_rejected_before_reading(self):
+        """A Content-Length above the limit is rejected up front."""
+        handler = StreamingImageUploadHandler(RequestFactory().post('/'))
+
+        with self.assertRaises(UploadTooLarge):
+            handler.handle_raw_input(None, {}, 10 * 1024 * 1024, b'boundary')
+
+    def test_stream_without_length_is_cut_at_the_limit(self):
+        """Chunks beyond the limit abort the upload and remove the temporary file."""
+        handler = self._handler()
+        handler.receive_data_chunk(png_bytes()[:512], 0)
+        path = handler.file.temporary_file_path()
+
+        with self.assertRaises(UploadTooLarge):
+            handler.receive_data_chunk(b'\0' * 1024, 512)
+        self.assertFalse(os.path.exists(path))
+
+    def test_content_hash_is_computed_while_streaming(self):
+        """The finished file carries the SHA-256 of all chunks."""
+        content = png_bytes()[:600]
+        handler = self._handler()
+        handler.receive_data_chunk(content[:100], 0)
+        handler.receive_data_chunk(content[100:], 100)
+        uploaded = handler.file_complete(len(content))
+
+        self.assertEqual(uploaded.content_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(uploaded.content_type, 'image/png')
+        uploaded.close()
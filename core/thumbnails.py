@@ -0,0 +1,222 @@
+"""
+Resized image variants for uploaded offer images and profile pictures.
+
+After an upload is committed, the original is resized and recompressed to
+WebP in a background thread so the request does not wait for it. The names
+of the generated files are stored in a JSON field next to the original,
+together with the source name they were generated from. A new upload
+therefore never reuses variants of the previous image.
+
+Variant names derive from the content-addressed source name, so a variant
+file that already exists was rendered from the same content. It may be
+shared by several rows and is reused instead of being written again.
+"""
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# name -> (max width, max height, crop to exact size)
+VARIANTS = {
+    'card': (400, 300, True),
+    'detail': (1200, 900, False),
+    'avatar': (128, 128, True),
+}
+
+VARIANT_FORMAT = 'WEBP'
+VARIANT_EXTENSION = 'webp'
+VARIANT_QUALITY = 80
+VARIANT_DIR = 'thumbnails'
+
+_executor = None
+
+
+def variant_name(source_name, variant):
+    """
+    Return the storage name of a variant of the given source file.
+
+    Args:
+        source_name: Storage name of the original upload
+        variant: Variant name, e.g. 'card'
+
+    Returns:
+        str: Storage name of the variant
+    """
+    source = PurePosixPath(source_name)
+    return str(PurePosixPath(VARIANT_DIR) / source.parent / f'{source.stem}_{variant}.{VARIANT_EXTENSION}')
+
+
+def render_variant(image, variant):
+    """
+    Resize and encode one variant.
+
+    Args:
+        image: Opened PIL image in RGB or RGBA mode
+        variant: Variant name
+
+    Returns:
+        bytes: Encoded image data
+    """
+    width, height, crop = VARIANTS[variant]
+    if crop:
+        resized = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+    else:
+        resized = image.copy()
+        resized.thumbnail((width, height), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    resized.save(buffer, VARIANT_FORMAT, quality=VARIANT_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def generate_variants(source_name, variants):
+    """
+    Generate the requested variants for a stored image.
+
+    Variants already present in the storage are reused; the source is only
+    opened if at least one variant is missing.
+
+    Args:
+        source_name: Storage name of the original upload
+        variants: Iterable of variant names
+
+    Returns:
+        dict: {'source': source_name, <variant>: <storage name>, ...};
+            only the source for files that are not images
+    """
+    result = {'source': source_name}
+    missing = []
+    for variant in variants:
+        name = variant_name(source_name, variant)
+        if default_storage.exists(name):
+            result[variant] = name
+        else:
+            missing.append(variant)
+    if not missing:
+        return result
+
+    try:
+        with default_storage.open(source_name, 'rb') as handle:
+            image = Image.open(handle)
+            image = ImageOps.exif_transpose(image)
+            image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+    except (UnidentifiedImageError, OSError):
+        logger.info('Skipping variants for %s: not a readable image', source_name)
+        return {'source': source_name}
+
+    for variant in missing:
+        name = variant_name(source_name, variant)
+        data = render_variant(image, variant)
+        # another row sharing the source may have stored it in the meantime
+        if not default_storage.exists(name):
+            name = default_storage.save(name, ContentFile(data))
+        result[variant] = name
+    return result
+
+
+def needs_variants(field_file, stored_variants):
+    """
+    Check whether variants for the current file are missing.
+
+    Args:
+        field_file: FieldFile of the original upload
+        stored_variants: Current value of the variants JSON field
+
+    Returns:
+        bool: True if the file is set and its variants were not generated yet
+    """
+    return bool(field_file) and (stored_variants or {}).get('source') != field_file.name
+
+
+def process(model, pk, file_field, variants_field, variants, on_done=None):
+    """
+    Generate variants for one row and store their names.
+
+    The row is only updated if it still points at the same file, so a
+    newer upload processed concurrently is never overwritten.
+
+    Args:
+        model: Model class
+        pk: Primary key of the row
+        file_field: Name of the FileField holding the original
+        variants_field: Name of the JSONField receiving the variant names
+        variants: Iterable of variant names
+        on_done: Optional callable(pk) run after the row was updated
+    """
+    source_name = model.objects.filter(pk=pk).values_list(file_field, flat=True).first()
+    if not source_name:
+        return
+    result = generate_variants(source_name, variants)
+    updated = model.objects.filter(pk=pk, **{file_field: source_name}).update(
+        **{variants_field: result, 'updated_at': timezone.now()})
+    if updated and on_done is not None:
+        on_done(pk)
+
+
+def _run_in_background(*args):
+    try:
+        process(*args)
+    except Exception:
+        logger.exception('Generating image variants failed')
+    finally:
+        close_old_connections()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS, thread_name_prefix='thumbnails')
+    return _executor
+
+
+def schedule(model, pk, file_field, variants_field, variants, on_done=None):
+    """
+    Generate variants in the background once the current transaction commits.
+
+    Args:
+        model: Model class
+        pk: Primary key of the row
+        file_field: Name of the FileField holding the original
+        variants_field: Name of the JSONField receiving the variant names
+        variants: Iterable of variant names
+        on_done: Optional callable(pk) run after the row was updated
+    """
+    args = (model, pk, file_field, variants_field, tuple(variants), on_done)
+    transaction.on_commit(lambda: _get_executor().submit(_run_in_background, *args))
+
+
+def variant_urls(field_file, stored_variants, variants, request=None):
+    """
+    Map variant names to URLs for API responses.
+
+    Variants generated from a previous upload are not exposed.
+
+    Args:
+        field_file: FieldFile of the original upload
+        stored_variants: Value of the variants JSON field
+        variants: Iterable of variant names to expose
+        request: Optional request used to build absolute URLs
+
+    Returns:
+        dict: Variant name -> URL, or None while the variant is not ready
+    """
+    stored_variants = stored_variants or {}
+    if needs_variants(field_file, stored_variants):
+        stored_variants = {}
+    urls = {}
+    for variant in variants:
+        name = stored_variants.get(variant)
+        url = default_storage.url(name) if name else None
+        if url and request is not None:
+            url = request.build_absolute_uri(url)
+        urls[variant] = url
+    return urls
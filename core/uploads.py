@@ -0,0 +1,179 @@
+"""
+Streaming upload handling for offer images and profile pictures.
+
+Multipart file parts are written to a temporary file chunk by chunk while
+a SHA-256 hash of the content is computed, so the worker never holds more
+than one chunk of an upload in memory. Requests that announce a body larger
+than ``UPLOAD_MAX_BYTES`` are rejected before the body is read, and uploads
+without a Content-Length are rejected as soon as they cross the limit. The
+first chunk is sniffed for a known image signature; the client-supplied
+content type and file extension are replaced by the detected ones.
+
+The handler is installed per view through ImageUploadMixin; every other
+endpoint keeps Django's default upload handlers.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+# Room for multipart boundaries and the non-file form fields of one upload
+MULTIPART_OVERHEAD = 64 * 1024
+
+# (signature check, content type, extension)
+IMAGE_SIGNATURES = (
+    (lambda head: head.startswith(b'\xff\xd8\xff'), 'image/jpeg', '.jpg'),
+    (lambda head: head.startswith(b'\x89PNG\r\n\x1a\n'), 'image/png', '.png'),
+    (lambda head: head[:6] in (b'GIF87a', b'GIF89a'), 'image/gif', '.gif'),
+    (lambda head: head[:4] == b'RIFF' and head[8:12] == b'WEBP', 'image/webp', '.webp'),
+)
+SNIFF_BYTES = 12
+
+
+class UploadTooLarge(APIException):
+    """Raised when an upload exceeds UPLOAD_MAX_BYTES."""
+
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Uploaded file is too large.'
+    default_code = 'upload_too_large'
+
+
+class UnsupportedUpload(APIException):
+    """Raised when an upload is not a supported image."""
+
+    status_code = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+    default_detail = 'Uploaded file must be a JPEG, PNG, GIF or WebP image.'
+    default_code = 'unsupported_upload'
+
+
+def sniff_image(head):
+    """
+    Detect the image type from the first bytes of a file.
+
+    Args:
+        head: Leading bytes of the file
+
+    Returns:
+        tuple: (content type, extension) or None if no known signature matches
+    """
+    for matches, content_type, extension in IMAGE_SIGNATURES:
+        if matches(head):
+            return content_type, extension
+    return None
+
+
+class StreamingImageUploadHandler(FileUploadHandler):
+    """
+    Upload handler streaming image uploads to disk with a size limit.
+
+    The returned TemporaryUploadedFile carries the hex digest of its content
+    in ``content_hash``, which DeduplicatingFileSystemStorage uses as the
+    stored name.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_bytes = settings.UPLOAD_MAX_BYTES
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        """
+        Reject requests announcing a body above the limit before reading it.
+
+        Raises:
+            UploadTooLarge: If Content-Length exceeds the limit
+        """
+        if content_length and content_length > self.max_bytes + MULTIPART_OVERHEAD:
+            raise UploadTooLarge()
+
+    def new_file(self, *args, **kwargs):
+        """Open the temporary file and reset the per-file state."""
+        super().new_file(*args, **kwargs)
+        self.file = TemporaryUploadedFile(
+            self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self.hasher = hashlib.sha256()
+        self.received = 0
+        self.head = b''
+        self.detected = None
+
+    def receive_data_chunk(self, raw_data, start):
+        """
+        Write one chunk to disk, hash it and enforce limit and file type.
+
+        Raises:
+            UploadTooLarge: If the file grows beyond the limit
+            UnsupportedUpload: If the file does not start with an image signature
+        """
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            self.upload_interrupted()
+            raise UploadTooLarge()
+        if self.detected is None:
+            self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+            if len(self.head) >= SNIFF_BYTES:
+                self._detect()
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+
+    def _detect(self):
+        self.detected = sniff_image(self.head)
+        if self.detected is None:
+            self.upload_interrupted()
+            raise UnsupportedUpload()
+
+    def file_complete(self, file_size):
+        """
+        Finish the file and attach detected type and content hash.
+
+        Returns:
+            TemporaryUploadedFile: The uploaded file
+        """
+        if self.detected is None:
+            self._detect()
+        content_type, extension = self.detected
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.content_type = content_type
+        self.file.name = os.path.splitext(self.file_name)[0] + extension
+        self.file.content_hash = self.hasher.hexdigest()
+        return self.file
+
+    def upload_interrupted(self):
+        """Remove the temporary file of an aborted upload."""
+        if hasattr(self, 'file'):
+            temp_location = self.file.temporary_file_path()
+            try:
+                self.file.close()
+                os.remove(temp_location)
+            except FileNotFoundError:
+                pass
+
+
+class ImageUploadMixin:
+    """
+    View mixin that parses multipart bodies with StreamingImageUploadHandler.
+
+    Replaces the upload handlers of the Django request before DRF wraps it,
+    so only the views that accept images reject other files and their
+    APIExceptions are rendered by DRF's exception handler.
+    """
+
+    def initialize_request(self, request, *args, **kwargs):
+        """
+        Install the streaming image upload handler on the request.
+
+        Args:
+            request: Django HTTP request, body not read yet
+            *args: Variable length argument list
+            **kwargs: Arbitrary keyword arguments
+
+        Returns:
+            Request: DRF request
+        """
+        request.upload_handlers = [StreamingImageUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
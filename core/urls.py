@@ -19,9 +19,11 @@ from django.conf.urls.static import static
 from django.conf import settings
 from django.urls import path, include
 
+from core.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('api/', include('auth_app.api.urls')),
     path('api/', include('profile_app.api.urls')),
     path('api/', include('offer_app.api.urls')),
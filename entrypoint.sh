@@ -6,33 +6,12 @@ set -e
 
 echo "Starting da-coder backend..."
 
-# Führe Datenbankmigrationen aus
-echo "Running database migrations..."
-python manage.py migrate --noinput
-
-# Sammle static files
-echo "Collecting static files..."
-python manage.py collectstatic --noinput --clear
-
-# Erstelle Superuser falls nicht vorhanden
-if [ "$DJANGO_SUPERUSER_USERNAME" ] && [ "$DJANGO_SUPERUSER_EMAIL" ] && [ "$DJANGO_SUPERUSER_PASSWORD" ]; then
-    echo "Creating superuser if not exists..."
-    python manage.py shell <<EOF
-from django.contrib.auth import get_user_model
-User = get_user_model()
-if not User.objects.filter(username='$DJANGO_SUPERUSER_USERNAME').exists():
-    User.objects.create_superuser(
-        username='$DJANGO_SUPERUSER_USERNAME',
-        email='$DJANGO_SUPERUSER_EMAIL',
-        password='$DJANGO_SUPERUSER_PASSWORD'
-    )
-    print("Superuser created successfully.")
-else:
-    print("Superuser already exists.")
-EOF
-else
-    echo "Skipping superuser creation (environment variables not set)."
-fi
+# Migrationen, static files und Superuser in einem Prozess:
+# - migrate läuft nur, wenn eine Migration noch nicht angewendet ist
+# - collectstatic läuft nur, wenn sich die static files geändert haben (Fingerprint in STATIC_ROOT)
+# - Superuser wird angelegt, wenn DJANGO_SUPERUSER_USERNAME, _EMAIL und _PASSWORD gesetzt sind
+echo "Bootstrapping..."
+python manage.py bootstrap
 
 echo "Starting application..."
-exec "$@"
\ No newline at end of file
+exec "$@"
@@ -0,0 +1,40 @@
+# Gunicorn Konfiguration für den Django Container
+#
+# SERVER_MODE=wsgi  -> klassische sync Worker mit core.wsgi:application
+# SERVER_MODE=asgi  -> Uvicorn Worker mit core.asgi:application (async Views)
+import os
+import tempfile
+
+server_mode = os.getenv('SERVER_MODE', 'wsgi').lower()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', '3'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+
+if server_mode == 'asgi':
+    wsgi_app = 'core.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'core.wsgi:application'
+    worker_class = 'sync'
+
+# Prometheus Metriken: jeder Worker schreibt seine Werte in dieses Verzeichnis,
+# /metrics summiert über alle Worker
+metrics_dir = os.environ.setdefault(
+    'METRICS_DIR', os.path.join(tempfile.gettempdir(), 'coderr-metrics'))
+# Load Shedding: In-Flight Zähler der Worker liegen in diesem Verzeichnis
+load_shed_dir = os.environ.setdefault(
+    'LOAD_SHED_DIR', os.path.join(tempfile.gettempdir(), 'coderr-load'))
+
+
+def on_starting(server):
+    # Werte eines früheren Laufs verwerfen
+    from core import load_shedding, metrics
+    metrics.clear_directory(metrics_dir)
+    load_shedding.clear_directory(load_shed_dir)
+
+
+def post_worker_init(worker):
+    # Angebotsindex vor dem ersten Request laden (nur mit OFFER_INDEX=True)
+    from offer_app import offer_index
+    offer_index.warm()
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
+from core.admin import LargeTableAdmin
+
 from .models import Offer, OfferDetail
 
 
@@ -12,22 +14,29 @@ class OfferDetailInline(admin.TabularInline):
 
 
 @admin.register(Offer)
-class OfferAdmin(admin.ModelAdmin):
+class OfferAdmin(LargeTableAdmin):
     """Admin configuration for Offer model."""
     
     list_display = ['title', 'user', 'created_at', 'updated_at']
     list_filter = ['created_at', 'updated_at']
-    search_fields = ['title', 'description', 'user__username']
+    list_select_related = ['user']
+    search_fields = ['id', 'user__username']
+    search_help_text = 'Offer ID or exact username of the creator'
+    raw_id_fields = ['user']
     readonly_fields = ['created_at', 'updated_at']
     inlines = [OfferDetailInline]
 
 
 @admin.register(OfferDetail)
-class OfferDetailAdmin(admin.ModelAdmin):
+class OfferDetailAdmin(LargeTableAdmin):
     """Admin configuration for OfferDetail model."""
     
     list_display = ['title', 'offer', 'offer_type', 'price', 'delivery_time_in_days']
     list_filter = ['offer_type']
-    search_fields = ['title', 'offer__title']
+    # offer is also read by OfferDetail.__str__
+    list_select_related = ['offer']
+    search_fields = ['id', 'offer_id']
+    search_help_text = 'Offer detail ID or offer ID'
+    raw_id_fields = ['offer']
 
 
@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from rest_framework.reverse import reverse
 
-from offer_app.models import Offer, OfferDetail
+from core.thumbnails import variant_urls
+from offer_app.models import Offer, OfferDetail, SimilarOffer
+from offer_app.signals import batched_offer_touch
 
 
 class OfferDetailSerializer(serializers.ModelSerializer):
@@ -40,6 +42,7 @@ class OfferSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(read_only=True)
 
     user_details = serializers.SerializerMethodField(read_only=True)
+    image_thumbnails = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Offer
@@ -48,6 +51,7 @@ class OfferSerializer(serializers.ModelSerializer):
             'user',
             'title',
             'image',
+            'image_thumbnails',
             'description',
             'created_at',
             'updated_at',
@@ -56,8 +60,8 @@ class OfferSerializer(serializers.ModelSerializer):
             'min_delivery_time',
             'user_details'
         ]
-        read_only_fields = ['id', 'created_at',
-                            'updated_at', 'min_delivery_time', 'user_details']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'min_delivery_time',
+                            'user_details', 'image_thumbnails']
 
     def validate_details(self, value):
         """
@@ -86,6 +90,8 @@ class OfferSerializer(serializers.ModelSerializer):
         """
         Create offer with nested offer details.
 
+        The offer's updated_at is bumped once after all details, not per detail.
+
         Args:
             validated_data: Dictionary of validated offer and details data
 
@@ -94,8 +100,9 @@ class OfferSerializer(serializers.ModelSerializer):
         """
         details_data = validated_data.pop('details')
         offer = Offer.objects.create(**validated_data)
-        for detail_data in details_data:
-            OfferDetail.objects.create(offer=offer, **detail_data)
+        with batched_offer_touch(offer):
+            for detail_data in details_data:
+                OfferDetail.objects.create(offer=offer, **detail_data)
         return offer
 
     def _update_offer_detail(self, instance, detail_data):
@@ -142,6 +149,8 @@ class OfferSerializer(serializers.ModelSerializer):
         """
         Update offer and its nested offer details.
 
+        Changed details bump the offer's updated_at once, not per detail.
+
         Args:
             instance: Offer instance to update
             validated_data: Dictionary of validated offer and details data
@@ -155,9 +164,10 @@ class OfferSerializer(serializers.ModelSerializer):
         instance.save()
 
         if details_data:
-            for detail_data in details_data:
-                detail_instance = self._update_offer_detail(instance, detail_data)
-                self._apply_detail_updates(detail_instance, detail_data)
+            with batched_offer_touch(instance):
+                for detail_data in details_data:
+                    detail_instance = self._update_offer_detail(instance, detail_data)
+                    self._apply_detail_updates(detail_instance, detail_data)
 
         return instance
 
@@ -178,6 +188,19 @@ class OfferSerializer(serializers.ModelSerializer):
             'username': user.username,
         }
 
+    def get_image_thumbnails(self, obj):
+        """
+        Get URLs of the resized offer image variants.
+
+        Args:
+            obj: Offer instance
+
+        Returns:
+            dict: 'card' and 'detail' URLs, None while not generated yet
+        """
+        return variant_urls(obj.image, obj.image_variants, ('card', 'detail'),
+                            self.context.get('request'))
+
     def to_representation(self, instance):
         """
         Convert offer to dictionary representation.
@@ -226,3 +249,35 @@ class OfferSerializer(serializers.ModelSerializer):
         data.pop('user_details', None)
 
         return data
+
+
+class SimilarOfferSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a precomputed similar offer.
+
+    Represents the neighbor offer as a compact card with its similarity
+    score; the row itself only links the two offers.
+    """
+
+    id = serializers.IntegerField(source='similar_offer_id', read_only=True)
+    user = serializers.IntegerField(source='similar_offer.user_id', read_only=True)
+    title = serializers.CharField(source='similar_offer.title', read_only=True)
+    image = serializers.FileField(source='similar_offer.image', read_only=True)
+    image_thumbnails = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = SimilarOffer
+        fields = ['id', 'user', 'title', 'image', 'image_thumbnails', 'score']
+
+    def get_image_thumbnails(self, obj):
+        """
+        Get URLs of the resized image variants of the similar offer.
+
+        Args:
+            obj: SimilarOffer instance
+
+        Returns:
+            dict: 'card' URL, None while not generated yet
+        """
+        offer = obj.similar_offer
+        return variant_urls(offer.image, offer.image_variants, ('card',), self.context.get('request'))
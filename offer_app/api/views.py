@@ -1,16 +1,32 @@
-from django.db.models import Min
-from django.shortcuts import get_object_or_404
+from django.db.models import F
+from django.http import Http404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters as drf_filters
-from rest_framework import status, views, viewsets
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from ..filters.offer_filter import OfferFilter
-from ..models import Offer, OfferDetail
+from core import compression
+from core.async_views import AsyncAPIView
+from core.conditional import (
+    ConditionalGetMixin,
+    make_etag,
+    not_modified_response,
+    object_validators,
+    set_validators
+)
+from core.fast_json import FastJSONRenderer
+from core.idempotency import IdempotentCreateMixin
+from core.uploads import ImageUploadMixin
+from .. import cache as offer_list_cache
+from .. import offer_index
+from ..facets import facet_counts
+from ..filters.offer_filter import OfferFilter, OfferOrderingFilter
+from ..models import Offer, OfferDetail, SimilarOffer
 from .permissions import IsBusinessUser, IsOfferOwner
-from .serializers import OfferDetailSerializer, OfferSerializer
+from .serializers import OfferDetailSerializer, OfferSerializer, SimilarOfferSerializer
 
 
 class OfferPagination(PageNumberPagination):
@@ -26,21 +42,27 @@ class OfferPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class OffersViewSet(viewsets.ModelViewSet):
+class OffersViewSet(ImageUploadMixin, IdempotentCreateMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing offers.
 
     Provides CRUD operations for offers with filtering, searching, and ordering.
     Permissions vary by action: creation requires business user, updates require ownership.
+    List and retrieve support conditional GET via ETag / Last-Modified.
+    The facets action returns bucket counts for the current filters, the
+    similar action the precomputed neighbors of an offer.
+    Create honours the Idempotency-Key header; image uploads are streamed
+    and checked by ImageUploadMixin.
     """
 
     serializer_class = OfferSerializer
     pagination_class = OfferPagination
     filter_backends = [DjangoFilterBackend,
-                       drf_filters.SearchFilter, drf_filters.OrderingFilter]
+                       drf_filters.SearchFilter, OfferOrderingFilter]
     filterset_class = OfferFilter
     search_fields = ['title', 'description']
     ordering_fields = ['updated_at', 'min_price']
+    conditional_list_fields = ('updated_at', 'user__profile__updated_at')
 
     def get_queryset(self):
         """
@@ -64,7 +86,7 @@ class OffersViewSet(viewsets.ModelViewSet):
         """
         if self.action == 'create':
             self.permission_classes = [IsAuthenticated, IsBusinessUser]
-        elif self.action == 'retrieve':
+        elif self.action in ['retrieve', 'similar']:
             self.permission_classes = [IsAuthenticated]
         elif self.action in ['update', 'partial_update', 'destroy']:
             self.permission_classes = [IsAuthenticated, IsOfferOwner]
@@ -72,6 +94,152 @@ class OffersViewSet(viewsets.ModelViewSet):
             self.permission_classes = [AllowAny]
         return super().get_permissions()
 
+    def list(self, request, *args, **kwargs):
+        """
+        List offers, serving anonymous requests from the response cache.
+
+        Anonymous visitors all receive the same response for the same query
+        parameters, so their pages are cached and invalidated through tags
+        when offers, offer details or creator profiles change. The cached
+        entry carries its ETag, so conditional requests need no query, and
+        its JSON body with precompressed variants, so a hit is neither
+        rendered nor compressed again.
+
+        Args:
+            request: HTTP request
+            *args: Variable length argument list
+            **kwargs: Arbitrary keyword arguments
+
+        Returns:
+            Response: Paginated offer list
+        """
+        if request.user and request.user.is_authenticated:
+            indexed = self._indexed_list(request)
+            if indexed is None:
+                return super().list(request, *args, **kwargs)
+            page, etag = indexed
+            not_modified = not_modified_response(request, etag)
+            if not_modified is not None:
+                return not_modified
+            return set_validators(self._paginated_response(page), etag)
+
+        payload, _ = offer_list_cache.get_or_build(
+            request, lambda: self._build_list_payload(request, *args, **kwargs))
+        not_modified = not_modified_response(request, payload['etag'])
+        if not_modified is not None:
+            return not_modified
+        response = compression.CachedResponse(payload['data'], payload['body'], payload['encoded'])
+        return set_validators(response, payload['etag'])
+
+    def _build_list_payload(self, request, *args, **kwargs):
+        """
+        Build the cacheable list data, its JSON body and ETag.
+
+        Args:
+            request: HTTP request
+            *args: Variable length argument list
+            **kwargs: Arbitrary keyword arguments
+
+        Returns:
+            dict: Response data, rendered and compressed body and ETag
+        """
+        indexed = self._indexed_list(request)
+        if indexed is not None:
+            page, etag = indexed
+            response = self._paginated_response(page)
+        else:
+            etag = self.get_list_validators(self.filter_queryset(self.get_queryset()))
+            response = mixins.ListModelMixin.list(self, request, *args, **kwargs)
+        body = FastJSONRenderer().render(response.data)
+        return {'data': response.data, 'body': body,
+                'encoded': compression.precompress(body), 'etag': etag}
+
+    def _indexed_list(self, request):
+        """
+        Select the requested page with the in-memory offer index.
+
+        The index returns the ordered IDs of all matching offers; only the
+        page is loaded from the database. The ETag covers the count and
+        the timestamps of the offers and creator profiles on the page.
+
+        Args:
+            request: HTTP request
+
+        Returns:
+            tuple: (page of offers, ETag), or None if the index is off or
+            cannot answer the request
+        """
+        ids = offer_index.lookup(request, self)
+        if ids is None:
+            return None
+        page_ids = self.paginate_queryset(ids)
+        offers = self.get_queryset().select_related('user__profile').in_bulk(page_ids)
+        if len(offers) < len(page_ids):
+            offer_index.get_index().discard(set(page_ids) - offers.keys())
+        page = [offers[pk] for pk in page_ids if pk in offers]
+        etag = make_etag(
+            request.user.pk, request.get_full_path(), len(ids),
+            [(offer.pk, offer.updated_at, offer.user.profile.updated_at) for offer in page])
+        return page, etag
+
+    def _paginated_response(self, page):
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """
+        Count the offers matching the current search and filters per facet.
+
+        Pagination and ordering parameters are ignored. The counts do not
+        depend on the user, so they are cached for everyone and invalidated
+        like the listing.
+
+        Args:
+            request: HTTP request with list search/filter parameters
+
+        Returns:
+            Response: Price, delivery time and creator bucket counts
+        """
+        data, _ = offer_list_cache.get_or_build(
+            request, lambda: facet_counts(self._filter_without_ordering()), kind='facets')
+        return Response(data)
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """
+        List the offers most similar to an offer, best first.
+
+        The neighbors are precomputed by the ``build_similar_offers``
+        command; reading them is one query on the (offer, rank) index.
+        Offers without stored neighbors return an empty list.
+
+        Args:
+            request: HTTP request
+            pk: Offer ID
+
+        Returns:
+            Response: Similar offers with their scores
+
+        Raises:
+            Http404: If the offer does not exist
+        """
+        try:
+            offer_id = int(pk)
+        except ValueError:
+            raise Http404
+        rows = list(SimilarOffer.objects.filter(offer_id=offer_id)
+                    .select_related('similar_offer').order_by('rank'))
+        if not rows and not Offer.objects.filter(pk=offer_id).exists():
+            raise Http404
+        return Response(SimilarOfferSerializer(rows, many=True, context=self.get_serializer_context()).data)
+
+    def _filter_without_ordering(self):
+        queryset = Offer.objects.all()
+        for backend in self.filter_backends:
+            if not issubclass(backend, OfferOrderingFilter):
+                queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
     def perform_create(self, serializer):
         """
         Save offer with current user as owner.
@@ -82,16 +250,18 @@ class OffersViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class OfferDetailView(views.APIView):
+class OfferDetailView(AsyncAPIView):
     """
     API view for retrieving a single offer detail.
 
     Requires authentication. Returns detailed information about a specific offer tier.
+    The lookup uses the async ORM so the view does not block a worker under ASGI.
+    Supports conditional GET based on the parent offer's updated_at.
     """
 
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, pk):
+    async def get(self, request, pk):
         """
         Retrieve a specific offer detail by ID.
 
@@ -100,11 +270,24 @@ class OfferDetailView(views.APIView):
             pk: Primary key of the offer detail
 
         Returns:
-            Response: Serialized offer detail data
+            Response: Serialized offer detail data or 304 Not Modified
 
         Raises:
             Http404: If offer detail doesn't exist
         """
-        offer_detail = get_object_or_404(OfferDetail, pk=pk)
+        try:
+            offer_detail = await (OfferDetail.objects
+                                  .annotate(offer_updated_at=F('offer__updated_at'))
+                                  .aget(pk=pk))
+        except OfferDetail.DoesNotExist:
+            raise Http404('No OfferDetail matches the given query.')
+
+        etag, last_modified = object_validators(
+            (offer_detail.pk, offer_detail.offer_updated_at))
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
         serializer = OfferDetailSerializer(offer_detail)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        response = Response(serializer.data, status=status.HTTP_200_OK)
+        return set_validators(response, etag, last_modified)
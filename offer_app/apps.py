@@ -5,3 +5,7 @@ class OfferAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'offer_app'
     verbose_name = 'Offers'
+
+    def ready(self):
+        """Connect signal handlers keeping the offer list cache fresh."""
+        from . import signals  # noqa: F401
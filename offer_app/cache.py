@@ -0,0 +1,220 @@
+"""
+Response cache for the anonymous offer listing and the offer facets.
+
+Entries are keyed on the normalized query parameters of their kind (the
+facets ignore pagination and ordering) and carry the
+versions of the tags they depend on. Writing an offer bumps the version of
+its tags, which makes every entry built before the write invalid without
+having to know the individual cache keys.
+
+Tags:
+    offers         - any change to any offer (unfiltered listings)
+    creator:<id>   - changes to offers or the profile of one creator
+                     (listings filtered by creator_id)
+
+A miss is rebuilt by a single request: the first request takes a short
+lock and builds the entry while concurrent requests for the same key wait
+for it instead of all hitting the database.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core import metrics
+
+LIST_CACHE_PARAMS = (
+    'page',
+    'page_size',
+    'search',
+    'creator_id',
+    'min_price',
+    'max_delivery_time',
+    'feature',
+    'ordering',
+)
+FACET_CACHE_PARAMS = (
+    'search',
+    'creator_id',
+    'min_price',
+    'max_delivery_time',
+    'feature',
+)
+CACHE_PARAMS = {'list': LIST_CACHE_PARAMS, 'facets': FACET_CACHE_PARAMS}
+
+KEY_PREFIX = 'offers'
+TAG_PREFIX = 'offers:tag'
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 5.0
+LOCK_POLL_INTERVAL = 0.05
+
+
+def normalize_query_params(query_params, params=LIST_CACHE_PARAMS):
+    """
+    Reduce query parameters to the ones that affect the response.
+
+    Unknown and empty parameters are dropped, values are stripped,
+    ``page=1`` is treated like a missing page parameter and numeric creator
+    IDs are canonicalized so they match the creator tag.
+
+    Args:
+        query_params: QueryDict of the request
+        params: Parameter names that affect the response
+
+    Returns:
+        tuple: Sorted (name, value) pairs
+    """
+    normalized = []
+    for name in params:
+        value = (query_params.get(name) or '').strip()
+        if not value or (name == 'page' and value == '1'):
+            continue
+        if name == 'creator_id' and value.isdigit():
+            value = str(int(value))
+        normalized.append((name, value))
+    return tuple(normalized)
+
+
+def tags_for(normalized):
+    """
+    Return the tags a listing with the given parameters depends on.
+
+    Args:
+        normalized: Output of normalize_query_params
+
+    Returns:
+        list: Tag names
+    """
+    creator_id = dict(normalized).get('creator_id')
+    if creator_id:
+        return [f'creator:{creator_id}']
+    return ['offers']
+
+
+def _tag_key(tag):
+    return f'{TAG_PREFIX}:{tag}'
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def _current_versions(tags):
+    """
+    Read tag versions, creating missing ones.
+
+    A missing version (never set or evicted) gets a fresh value so entries
+    recorded against an evicted version can never validate again.
+
+    Args:
+        tags: Iterable of tag names
+
+    Returns:
+        dict: Tag name -> version
+    """
+    keys = {_tag_key(tag): tag for tag in tags}
+    stored = cache.get_many(keys.keys())
+    versions = {}
+    for key, tag in keys.items():
+        if key not in stored:
+            cache.add(key, _new_version(), None)
+            stored[key] = cache.get(key)
+        versions[tag] = stored[key]
+    return versions
+
+
+def _is_valid(entry):
+    if entry is None:
+        return False
+    stored = cache.get_many(_tag_key(tag) for tag in entry['tags'])
+    return all(stored.get(_tag_key(tag)) == version for tag, version in entry['tags'].items())
+
+
+def list_cache_key(request, kind='list'):
+    """
+    Build the cache key for an offer list or facets request.
+
+    The absolute path is part of the key because pagination links in the
+    response contain scheme and host.
+
+    Args:
+        request: DRF request
+        kind: 'list' or 'facets'
+
+    Returns:
+        tuple: (cache key, normalized parameters)
+    """
+    normalized = normalize_query_params(request.query_params, CACHE_PARAMS[kind])
+    raw = repr((request.build_absolute_uri(request.path), normalized))
+    return f'{KEY_PREFIX}:{kind}:{hashlib.sha256(raw.encode()).hexdigest()}', normalized
+
+
+def get_or_build(request, build, kind='list'):
+    """
+    Return the cached payload for the request or build and cache it.
+
+    Args:
+        request: DRF request
+        build: Callable returning the payload (response data and validators) on a miss
+        kind: 'list' or 'facets'
+
+    Returns:
+        tuple: (payload, True if served from cache)
+    """
+    key, normalized = list_cache_key(request, kind)
+    entry = cache.get(key)
+    if _is_valid(entry):
+        metrics.inc('cache_requests_total', cache=f'offers-{kind}', result='hit')
+        return entry['data'], True
+    metrics.inc('cache_requests_total', cache=f'offers-{kind}', result='miss')
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = cache.get(key)
+            if _is_valid(entry):
+                return entry['data'], True
+            if cache.get(lock_key) is None:
+                break
+        return build(), False
+
+    try:
+        versions = _current_versions(tags_for(normalized))
+        data = build()
+        cache.set(key, {'data': data, 'tags': versions}, settings.OFFER_LIST_CACHE_TIMEOUT)
+    finally:
+        cache.delete(lock_key)
+    return data, False
+
+
+def _bump(tags):
+    cache.set_many({_tag_key(tag): _new_version() for tag in tags}, None)
+
+
+def invalidate_tags(*tags):
+    """
+    Invalidate all entries depending on the given tags.
+
+    Versions are bumped immediately and once more after the surrounding
+    transaction commits, so a listing rebuilt from pre-commit data in
+    between is discarded as well.
+
+    Args:
+        *tags: Tag names
+    """
+    _bump(tags)
+    transaction.on_commit(lambda: _bump(tags))
+
+
+def invalidate_creator(creator_id):
+    """
+    Invalidate listings affected by a change to one creator's offers or profile.
+
+    Args:
+        creator_id: User ID of the offer creator
+    """
+    invalidate_tags('offers', f'creator:{creator_id}')
@@ -0,0 +1,91 @@
+"""
+Facet counts for the offer browse page.
+
+All counts for a filtered offer queryset come from a single statement:
+the inner query computes the minimum price and delivery time per offer
+(the values the ``min_price`` and ``max_delivery_time`` filters look at),
+the outer query groups those rows by creator and counts every bucket with
+conditional sums. The per-creator rows are added up in Python for the
+price and delivery time totals.
+
+Price buckets are ranges of the cheapest detail price. Delivery time
+buckets are cumulative and match the ``max_delivery_time`` filter, so each
+count is the ``count`` the listing would return with that filter added.
+Offers without details only appear in ``count`` and ``creators``.
+"""
+from django.db import connections, router
+from django.db.models import Min
+
+from .models import Offer
+
+PRICE_BOUNDARIES = (50, 100, 250, 500)
+DELIVERY_TIME_VALUES = (1, 3, 7, 14)
+CREATOR_LIMIT = 20
+
+
+def price_buckets():
+    """
+    Return the price ranges.
+
+    Returns:
+        list: (min, max) tuples, None for an open end
+    """
+    edges = (None, *PRICE_BOUNDARIES, None)
+    return list(zip(edges, edges[1:]))
+
+
+def _price_condition(low, high):
+    conditions = ['facet_min_price IS NOT NULL']
+    params = []
+    if low is not None:
+        conditions.append('facet_min_price >= %s')
+        params.append(low)
+    if high is not None:
+        conditions.append('facet_min_price < %s')
+        params.append(high)
+    return ' AND '.join(conditions), params
+
+
+def facet_counts(queryset, creator_limit=CREATOR_LIMIT):
+    """
+    Count the offers of a filtered queryset per facet value.
+
+    Args:
+        queryset: Filtered Offer queryset (ordering is ignored)
+        creator_limit: Number of creators with the most offers to return
+
+    Returns:
+        dict: ``count``, ``price``, ``max_delivery_time`` and ``creators``
+    """
+    inner = (queryset.order_by().values('pk', 'user_id')
+             .annotate(facet_min_price=Min('details__price'),
+                       facet_min_days=Min('details__delivery_time_in_days'))
+             .values('user_id', 'facet_min_price', 'facet_min_days'))
+    inner_sql, inner_params = inner.query.sql_with_params()
+
+    columns, params = ['COUNT(*)'], []
+    for low, high in price_buckets():
+        condition, condition_params = _price_condition(low, high)
+        columns.append(f'SUM(CASE WHEN {condition} THEN 1 ELSE 0 END)')
+        params.extend(condition_params)
+    for days in DELIVERY_TIME_VALUES:
+        columns.append('SUM(CASE WHEN facet_min_days <= %s THEN 1 ELSE 0 END)')
+        params.append(days)
+
+    sql = (f"SELECT user_id, {', '.join(columns)} "
+           f'FROM ({inner_sql}) offer_facets GROUP BY user_id')
+    with connections[router.db_for_read(Offer)].cursor() as cursor:
+        cursor.execute(sql, (*params, *inner_params))
+        rows = cursor.fetchall()
+
+    price_count = len(PRICE_BOUNDARIES) + 1
+    totals = [sum(row[index] or 0 for row in rows) for index in range(1, len(columns) + 1)]
+    creators = sorted(rows, key=lambda row: (-row[1], row[0]))[:creator_limit]
+    return {
+        'count': totals[0],
+        'price': [{'min': low, 'max': high, 'count': count}
+                  for (low, high), count in zip(price_buckets(), totals[1:1 + price_count])],
+        'max_delivery_time': [{'value': days, 'count': count}
+                              for days, count in zip(DELIVERY_TIME_VALUES, totals[1 + price_count:])],
+        'creators': [{'creator_id': row[0], 'count': row[1]} for row in creators],
+    }
@@ -0,0 +1,93 @@
+"""
+Indexed lookup of offers by detail feature.
+
+``OfferDetail.features`` is a JSON list. PostgreSQL answers
+``features @> '["Logo"]'`` from a GIN ``jsonb_path_ops`` index (created
+by migration 0008). SQLite has no index type for values inside JSON
+arrays, so there every feature is mirrored into ``OfferDetailFeature``,
+one row per (feature, offer detail), and looked up through its unique
+index. The mirror is rewritten whenever a detail is saved with changed
+features; deleting a detail removes its rows by cascade.
+"""
+from django.db import connections, router
+
+from .models import OfferDetail, OfferDetailFeature
+
+
+def uses_feature_table(using=None):
+    """
+    Check whether features are looked up in the OfferDetailFeature table.
+
+    Args:
+        using: Database alias, defaults to the one OfferDetail is read from
+
+    Returns:
+        bool: False on PostgreSQL (GIN index), True otherwise
+    """
+    using = using or router.db_for_read(OfferDetail)
+    return connections[using].vendor != 'postgresql'
+
+
+def normalize_features(features):
+    """
+    Turn a features value into the distinct rows of the side table.
+
+    Args:
+        features: Value of OfferDetail.features
+
+    Returns:
+        set: Stripped, non-empty feature strings
+    """
+    if not isinstance(features, list):
+        return set()
+    return {str(feature).strip() for feature in features if str(feature).strip()}
+
+
+def feature_rows(offer_detail_id, features):
+    """
+    Build unsaved side table rows for one offer detail.
+
+    Args:
+        offer_detail_id: ID of the offer detail
+        features: Value of OfferDetail.features
+
+    Returns:
+        list: OfferDetailFeature instances
+    """
+    return [OfferDetailFeature(offer_detail_id=offer_detail_id, feature=feature)
+            for feature in sorted(normalize_features(features))]
+
+
+def sync_features(offer_detail, using=None):
+    """
+    Rewrite the side table rows of an offer detail.
+
+    Does nothing on PostgreSQL, where the GIN index covers the JSON column.
+
+    Args:
+        offer_detail: Saved OfferDetail
+        using: Database alias the detail was saved to
+    """
+    using = using or router.db_for_write(OfferDetail, instance=offer_detail)
+    if not uses_feature_table(using):
+        return
+    rows = OfferDetailFeature.objects.using(using)
+    rows.filter(offer_detail_id=offer_detail.pk).delete()
+    rows.bulk_create(feature_rows(offer_detail.pk, offer_detail.features))
+
+
+def offer_ids_with_feature(feature):
+    """
+    Build a subquery of offers with a detail listing a feature.
+
+    Args:
+        feature: Feature name, matched exactly after stripping whitespace
+
+    Returns:
+        QuerySet: Offer IDs, usable in an ``id__in`` filter
+    """
+    feature = str(feature).strip()
+    if uses_feature_table():
+        return (OfferDetailFeature.objects.filter(feature=feature)
+                .values('offer_detail__offer_id'))
+    return OfferDetail.objects.filter(features__contains=[feature]).values('offer_id')
@@ -1,6 +1,8 @@
 from django.db.models import Min
 from django_filters import rest_framework as filters
+from rest_framework.filters import OrderingFilter
 
+from offer_app.features import offer_ids_with_feature
 from offer_app.models import Offer
 
 
@@ -8,7 +10,8 @@ class OfferFilter(filters.FilterSet):
     """
     Filter set for Offer model.
 
-    Provides filtering by creator ID, minimum price, and maximum delivery time.
+    Provides filtering by creator ID, minimum price, maximum delivery time
+    and detail feature.
     """
 
     creator_id = filters.NumberFilter(field_name='user__id')
@@ -16,10 +19,11 @@ class OfferFilter(filters.FilterSet):
         method='min_price_value', lookup_expr='gte')
     max_delivery_time = filters.NumberFilter(
         method='max_delivery_time_value', lookup_expr='lte')
+    feature = filters.CharFilter(method='feature_value')
 
     class Meta:
         model = Offer
-        fields = ['creator_id', 'min_price', 'max_delivery_time']
+        fields = ['creator_id', 'min_price', 'max_delivery_time', 'feature']
 
     def min_price_value(self, queryset, name, value):
         """
@@ -52,3 +56,61 @@ class OfferFilter(filters.FilterSet):
         return queryset.annotate(
             min_delivery_time_val=Min('details__delivery_time_in_days')
         ).filter(min_delivery_time_val__lte=value)
+
+    def feature_value(self, queryset, name, value):
+        """
+        Filter offers by a feature of any of their details.
+
+        Uses a subquery instead of a join, so offers are not duplicated and
+        the min_price/min_delivery_time annotations still see every detail.
+
+        Args:
+            queryset: Offer queryset to filter
+            name: Field name (unused)
+            value: Feature name, matched exactly
+
+        Returns:
+            QuerySet: Offers with a detail listing the feature
+        """
+        return queryset.filter(id__in=offer_ids_with_feature(value))
+
+
+class OfferOrderingFilter(OrderingFilter):
+    """
+    Ordering filter supporting the aggregated minimum price.
+
+    ``min_price`` is not a column of Offer, so ordering by it annotates the
+    minimum detail price first and sorts by the annotation.
+    """
+
+    annotations = {
+        'min_price': ('min_price_val', Min('details__price')),
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        """
+        Order the queryset, annotating aggregated ordering fields.
+
+        Args:
+            request: HTTP request
+            queryset: Offer queryset to order
+            view: View using the filter
+
+        Returns:
+            QuerySet: Ordered offers
+        """
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+
+        resolved = []
+        for field in ordering:
+            descending = field.startswith('-')
+            name = field.lstrip('-')
+            if name in self.annotations:
+                alias, expression = self.annotations[name]
+                if alias not in queryset.query.annotations:
+                    queryset = queryset.annotate(**{alias: expression})
+                name = alias
+            resolved.append(f'-{name}' if descending else name)
+        return queryset.order_by(*resolved)
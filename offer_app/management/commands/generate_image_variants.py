@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from core import thumbnails
+from offer_app.models import Offer
+from offer_app.signals import OFFER_IMAGE_VARIANTS, invalidate_offer_creator
+from profile_app.models import Profile
+from profile_app.signals import PROFILE_IMAGE_VARIANTS
+
+
+class Command(BaseCommand):
+    """
+    Generate missing image variants for existing offers and profiles.
+
+    Uploads are processed in the background when they are saved; this
+    command backfills rows uploaded before variants existed or whose
+    background job did not finish.
+    """
+
+    help = 'Generate missing resized variants of offer images and profile pictures.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Process rows even if their variants are up to date; '
+                 'only missing variant files are rendered.')
+
+    def handle(self, *args, **options):
+        targets = (
+            (Offer, 'image', 'image_variants', OFFER_IMAGE_VARIANTS, invalidate_offer_creator),
+            (Profile, 'file', 'file_variants', PROFILE_IMAGE_VARIANTS, None),
+        )
+        for model, file_field, variants_field, variants, on_done in targets:
+            rows = (model.objects.exclude(**{f'{file_field}__isnull': True})
+                    .exclude(**{file_field: ''})
+                    .values_list('pk', file_field, variants_field))
+            processed = 0
+            for pk, name, stored in rows.iterator():
+                if not options['force'] and (stored or {}).get('source') == name:
+                    continue
+                thumbnails.process(model, pk, file_field, variants_field, variants, on_done)
+                processed += 1
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {processed} processed')
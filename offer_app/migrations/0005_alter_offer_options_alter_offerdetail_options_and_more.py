@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0004_alter_offerdetail_delivery_time_in_days_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='offer',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Offer', 'verbose_name_plural': 'Offers'},
+        ),
+        migrations.AlterModelOptions(
+            name='offerdetail',
+            options={'ordering': ['offer', 'offer_type'], 'verbose_name': 'Offer Detail', 'verbose_name_plural': 'Offer Details'},
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='offer',
+            name='image',
+            field=models.FileField(blank=True, null=True, upload_to='offers/'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:32
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0005_alter_offer_options_alter_offerdetail_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='offer',
+            name='image',
+            field=models.FileField(blank=True, null=True, storage=core.storage.get_upload_storage, upload_to='offers/'),
+        ),
+    ]
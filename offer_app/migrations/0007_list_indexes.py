@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0006_upload_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['updated_at'], name='offer_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['user', 'updated_at'], name='offer_user_updated_at_idx'),
+        ),
+    ]
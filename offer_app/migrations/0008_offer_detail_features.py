@@ -0,0 +1,58 @@
+# Generated by Django 5.2.7 on 2026-10-19 02:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+GIN_INDEX = 'offerdetail_features_gin'
+
+
+def backfill_features(apps, schema_editor):
+    """Mirror the features of existing offer details into the feature table."""
+    if schema_editor.connection.vendor == 'postgresql':
+        return
+    OfferDetail = apps.get_model('offer_app', 'OfferDetail')
+    OfferDetailFeature = apps.get_model('offer_app', 'OfferDetailFeature')
+    rows = []
+    for detail_id, features in OfferDetail.objects.values_list('id', 'features').iterator():
+        if isinstance(features, list):
+            rows.extend(OfferDetailFeature(offer_detail_id=detail_id, feature=feature)
+                        for feature in sorted({str(f).strip() for f in features} - {''}))
+    OfferDetailFeature.objects.bulk_create(rows, batch_size=2000)
+
+
+def create_gin_index(apps, schema_editor):
+    """Index the features JSON for containment lookups on PostgreSQL."""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {GIN_INDEX} ON offer_app_offerdetail '
+            'USING gin (features jsonb_path_ops)')
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {GIN_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0007_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferDetailFeature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('feature', models.CharField(max_length=255)),
+                ('offer_detail', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feature_rows', to='offer_app.offerdetail')),
+            ],
+            options={
+                'verbose_name': 'Offer Detail Feature',
+                'verbose_name_plural': 'Offer Detail Features',
+                'constraints': [models.UniqueConstraint(fields=('feature', 'offer_detail'), name='offerdetailfeature_feature_detail_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_features, migrations.RunPython.noop),
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
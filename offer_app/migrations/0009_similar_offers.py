@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0008_offer_detail_features'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarOffer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('computed_at', models.DateTimeField()),
+                ('offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_offers', to='offer_app.offer')),
+                ('similar_offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='offer_app.offer')),
+            ],
+            options={
+                'verbose_name': 'Similar Offer',
+                'verbose_name_plural': 'Similar Offers',
+                'ordering': ['offer', 'rank'],
+                'indexes': [models.Index(fields=['computed_at'], name='similaroffer_computed_at_idx')],
+                'constraints': [models.UniqueConstraint(fields=('offer', 'rank'), name='similaroffer_offer_rank_uniq')],
+            },
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.db.models import Min
 
+from core.storage import get_upload_storage
+
 
 class Offer(models.Model):
     """
@@ -14,7 +16,9 @@ class Offer(models.Model):
     user = models.ForeignKey(
         User, related_name='offers', on_delete=models.CASCADE)
     title = models.CharField(max_length=255)
-    image = models.FileField(upload_to='offers/', null=True, blank=True)
+    image = models.FileField(
+        upload_to='offers/', storage=get_upload_storage, null=True, blank=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -41,6 +45,10 @@ class Offer(models.Model):
         verbose_name = 'Offer'
         verbose_name_plural = 'Offers'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['updated_at'], name='offer_updated_at_idx'),
+            models.Index(fields=['user', 'updated_at'], name='offer_user_updated_at_idx'),
+        ]
 
     def __str__(self):
         """
@@ -89,3 +97,74 @@ class OfferDetail(models.Model):
             str: Offer title with type in parentheses
         """
         return f"{self.offer.title} - ({self.offer_type})"
+
+
+class OfferDetailFeature(models.Model):
+    """
+    One feature of an offer detail as its own row.
+
+    SQLite cannot index inside JSON arrays, so the ``feature`` filter looks
+    features up in this table through the unique (feature, offer_detail)
+    index. Rows are kept in sync with ``OfferDetail.features`` on save (see
+    offer_app.features). On PostgreSQL the filter uses a GIN index on the
+    JSON column instead and this table stays empty.
+    """
+
+    offer_detail = models.ForeignKey(
+        OfferDetail, related_name='feature_rows', on_delete=models.CASCADE)
+    feature = models.CharField(max_length=255)
+
+    class Meta:
+        verbose_name = 'Offer Detail Feature'
+        verbose_name_plural = 'Offer Detail Features'
+        constraints = [
+            models.UniqueConstraint(fields=['feature', 'offer_detail'],
+                                    name='offerdetailfeature_feature_detail_uniq'),
+        ]
+
+    def __str__(self):
+        """
+        Return string representation of the feature row.
+
+        Returns:
+            str: Feature name
+        """
+        return self.feature
+
+
+class SimilarOffer(models.Model):
+    """
+    One precomputed neighbor of an offer, ranked by text similarity.
+
+    Rows are written offline by offer_app.similarity (``build_similar_offers``
+    command); the ``similar`` endpoint reads an offer's rows in rank order
+    through the unique (offer, rank) index.
+    """
+
+    offer = models.ForeignKey(
+        Offer, related_name='similar_offers', on_delete=models.CASCADE)
+    similar_offer = models.ForeignKey(
+        Offer, related_name='similar_to', on_delete=models.CASCADE)
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Similar Offer'
+        verbose_name_plural = 'Similar Offers'
+        ordering = ['offer', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['offer', 'rank'], name='similaroffer_offer_rank_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['computed_at'], name='similaroffer_computed_at_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Return string representation of the neighbor row.
+
+        Returns:
+            str: Offer and neighbor IDs with rank
+        """
+        return f"{self.offer_id} -> {self.similar_offer_id} (#{self.rank})"
@@ -0,0 +1,502 @@
+"""
+Optional per-process columnar index of offers for the offer listing.
+
+With ``OFFER_INDEX`` enabled every worker keeps the columns the listing
+filters and sorts on in compact typed arrays (``array.array``, 8 bytes per
+offer and column):
+
+    ids, creators            - offer and creator IDs (int64)
+    prices, days             - cheapest detail price and delivery time
+                               (float64, NaN for offers without details)
+    updated                  - ``updated_at`` as a Unix timestamp (float64)
+    alive                    - 1 per offer, 0 once it was deleted (uint8)
+    texts                    - lower-cased "title\\ndescription" for search,
+                               joined into one string when searched
+
+A list request whose parameters the index understands (``creator_id``,
+``min_price``, ``max_delivery_time``, ``search`` and a single ``ordering``
+field) is answered by combining per-column masks and walking a presorted
+permutation, which yields the matching IDs in order; only the IDs of the
+requested page are fetched from the database with ``in_bulk``. Anything
+else (``feature``, several ordering fields, invalid values) falls back to
+the SQL path.
+
+When NumPy is installed the masks are computed on zero-copy NumPy views of
+the arrays; without it the same work is done in pure Python.
+
+The index is loaded once per process (at worker start under gunicorn, see
+``warm``) and refreshed at most every ``OFFER_INDEX_REFRESH`` seconds by
+re-reading the offers whose ``updated_at`` is past the watermark of the
+last refresh. Saving an offer detail bumps its offer's ``updated_at``
+(offer_app.signals), so price and delivery time changes are picked up as
+well. Deletions do not move the watermark: a changed offer count triggers a
+full reload, and IDs that no longer exist when a page is fetched are
+dropped from the index.
+"""
+import bisect
+import math
+import sys
+import threading
+import time
+from array import array
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Min
+from rest_framework.filters import SearchFilter
+
+from .filters.offer_filter import OfferFilter, OfferOrderingFilter
+from .models import Offer, OfferDetail
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Seconds re-read before the watermark, for transactions that commit late
+REFRESH_OVERLAP = 5.0
+LOAD_CHUNK_SIZE = 1000
+ORDERINGS = ('-updated_at', 'updated_at', 'min_price', '-min_price')
+DEFAULT_ORDERING = '-updated_at'
+NAN = float('nan')
+
+
+class OfferIds:
+    """
+    Ordered IDs of the offers matching a list request.
+
+    Behaves like the sliceable object list the paginator expects.
+    """
+
+    def __init__(self, ids):
+        self._ids = ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            ids = self._ids[index]
+            return ids.tolist() if numpy is not None and isinstance(ids, numpy.ndarray) else list(ids)
+        return int(self._ids[index])
+
+
+class MaskedOfferIds(OfferIds):
+    """
+    Ordered IDs of many matching offers, resolved one page at a time.
+
+    Holds the match mask and the sort permutation of the rows instead of
+    the IDs, so a page near the start costs a few thousand lookups
+    however many offers match.
+    """
+
+    chunk_size = 4096
+
+    def __init__(self, index, mask, order):
+        self._index = index
+        self._mask = mask
+        self._order = order
+        self._count = int(numpy.count_nonzero(mask))
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop, _ = index.indices(self._count)
+        rows, seen = [], 0
+        for begin in range(0, len(self._order), self.chunk_size):
+            if seen >= stop:
+                break
+            chunk = self._order[begin:begin + self.chunk_size]
+            chunk = chunk[self._mask[chunk]]
+            if seen + len(chunk) > start:
+                rows.extend(chunk[max(start - seen, 0):stop - seen].tolist())
+            seen += len(chunk)
+        # rows never move, so positions taken under the lock stay valid
+        ids = self._index.ids
+        return [ids[row] for row in rows]
+
+
+class OfferIndex:
+    """
+    Columnar offer index of one process.
+
+    Attributes:
+        ids: Offer IDs in ascending order; the position of an ID is its row
+        watermark: Latest ``updated_at`` read from the database
+        refreshed: ``time.monotonic()`` of the last refresh
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.watermark = None
+        self.refreshed = 0.0
+        self._clear()
+
+    def _clear(self):
+        self.ids = array('q')
+        self.creators = array('q')
+        self.prices = array('d')
+        self.days = array('d')
+        self.updated = array('d')
+        self.alive = bytearray()
+        self.texts = []
+        self.live = 0
+        self._orders = {}
+        self._corpus = None
+
+    def __len__(self):
+        return self.live
+
+    def load(self):
+        """Read all offers from the database, replacing the current contents."""
+        with self.lock:
+            self._clear()
+            self.watermark = None
+            self._read(Offer.objects.all())
+            self.refreshed = time.monotonic()
+
+    def refresh(self, force=False):
+        """
+        Apply offers changed since the watermark.
+
+        Args:
+            force: Refresh even if ``OFFER_INDEX_REFRESH`` has not passed yet
+        """
+        with self.lock:
+            if not force and time.monotonic() - self.refreshed < settings.OFFER_INDEX_REFRESH:
+                return
+            if self.watermark is None:
+                self.load()
+                return
+            since = self.watermark - timedelta(seconds=REFRESH_OVERLAP)
+            if not self._read(Offer.objects.filter(updated_at__gte=since)) or (
+                    Offer.objects.count() != self.live):
+                self.load()
+                return
+            self.refreshed = time.monotonic()
+
+    def _read(self, queryset):
+        """
+        Insert or update the offers of a queryset.
+
+        Args:
+            queryset: Offers to read
+
+        Returns:
+            bool: False if a new offer would not go to the end of ``ids``
+        """
+        rows = (queryset.order_by('pk')
+                .values_list('pk', 'user_id', 'updated_at', 'title', 'description')
+                .iterator(chunk_size=LOAD_CHUNK_SIZE))
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == LOAD_CHUNK_SIZE:
+                if not self._apply(chunk):
+                    return False
+                chunk = []
+        return self._apply(chunk) if chunk else True
+
+    def _apply(self, rows):
+        minimums = {
+            offer_id: (price, days) for offer_id, price, days in (
+                OfferDetail.objects.filter(offer_id__in=[row[0] for row in rows])
+                .order_by().values('offer_id')
+                .annotate(price=Min('price'), days=Min('delivery_time_in_days'))
+                .values_list('offer_id', 'price', 'days'))
+        }
+        changed = False
+        for pk, user_id, updated_at, title, description in rows:
+            price, days = minimums.get(pk, (None, None))
+            price = NAN if price is None else float(price)
+            days = NAN if days is None else float(days)
+            text = f'{title}\n{description}'.lower()
+            position = self._position(pk)
+            if position is None:
+                if self.ids and pk < self.ids[-1]:
+                    return False
+                changed = True
+                self.ids.append(pk)
+                self.creators.append(user_id)
+                self.prices.append(price)
+                self.days.append(days)
+                self.updated.append(updated_at.timestamp())
+                self.alive.append(1)
+                self.texts.append(text)
+                self.live += 1
+            elif not self.alive[position] or self.updated[position] != updated_at.timestamp():
+                # rows re-read because of REFRESH_OVERLAP are skipped while unchanged
+                changed = True
+                self.creators[position] = user_id
+                self.prices[position] = price
+                self.days[position] = days
+                self.updated[position] = updated_at.timestamp()
+                self.texts[position] = text
+                if not self.alive[position]:
+                    self.alive[position] = 1
+                    self.live += 1
+            if self.watermark is None or updated_at > self.watermark:
+                self.watermark = updated_at
+        if changed:
+            self._orders = {}
+            self._corpus = None
+        return True
+
+    def _position(self, pk):
+        position = bisect.bisect_left(self.ids, pk)
+        if position < len(self.ids) and self.ids[position] == pk:
+            return position
+        return None
+
+    def discard(self, pks):
+        """
+        Mark offers as deleted.
+
+        Args:
+            pks: IDs of offers that no longer exist
+        """
+        with self.lock:
+            for pk in pks:
+                position = self._position(pk)
+                if position is not None and self.alive[position]:
+                    self.alive[position] = 0
+                    self.live -= 1
+
+    def _rank(self, ordering):
+        """Return the place of every row in an ordering (NumPy only)."""
+        key = f'rank:{ordering}'
+        rank = self._orders.get(key)
+        if rank is None:
+            order = self._order(ordering)
+            rank = numpy.empty(len(order), dtype=numpy.int64)
+            rank[order] = numpy.arange(len(order))
+            self._orders[key] = rank
+        return rank
+
+    def _creator_rows(self, creator_id):
+        """Return the rows of one creator's offers (NumPy only)."""
+        groups = self._orders.get('creators')
+        if groups is None:
+            creators = numpy.frombuffer(self.creators, dtype=numpy.int64)
+            by_creator = numpy.argsort(creators, kind='stable')
+            groups = self._orders['creators'] = (by_creator, creators[by_creator])
+        by_creator, keys = groups
+        return by_creator[numpy.searchsorted(keys, creator_id, 'left'):
+                          numpy.searchsorted(keys, creator_id, 'right')]
+
+    def _order(self, ordering):
+        """Return the row positions sorted by an ordering (cached until the next change)."""
+        order = self._orders.get(ordering)
+        if order is not None:
+            return order
+        descending = ordering.startswith('-')
+        column = self.updated if ordering.lstrip('-') == 'updated_at' else self.prices
+        if numpy is not None:
+            # NULL prices sort first ascending and last descending, as in SQLite
+            keys = numpy.nan_to_num(numpy.frombuffer(column, dtype=numpy.float64), nan=-numpy.inf)
+            order = numpy.argsort(-keys if descending else keys, kind='stable')
+        else:
+            keys = [-math.inf if math.isnan(value) else value for value in column]
+            # reverse=True keeps ties in row order, like the stable argsort of -keys
+            order = sorted(range(len(keys)), key=keys.__getitem__, reverse=descending)
+        self._orders[ordering] = order
+        return order
+
+    def _search_rows(self, term):
+        """
+        Find the rows whose text contains a term.
+
+        All texts are joined into one string (rebuilt after changes), so
+        the scan runs in ``str.find`` and costs one step per matching row.
+
+        Args:
+            term: Lower-cased search term
+
+        Returns:
+            list: Row positions in ascending order
+        """
+        if self._corpus is None:
+            starts, offset = array('q'), 0
+            for text in self.texts:
+                starts.append(offset)
+                offset += len(text) + 1
+            self._corpus = ('\x00'.join(self.texts), starts)
+        corpus, starts = self._corpus
+        rows = []
+        position = corpus.find(term)
+        while position != -1:
+            row = bisect.bisect_right(starts, position) - 1
+            rows.append(row)
+            # continue with the next text, so every row is reported once
+            position = corpus.find(term, starts[row + 1]) if row + 1 < len(starts) else -1
+        return rows
+
+    def query(self, creator_id=None, min_price=None, max_delivery_time=None, terms=(),
+              ordering=DEFAULT_ORDERING):
+        """
+        Find the offers matching list filters.
+
+        Args:
+            creator_id: Offer creator ID
+            min_price: Lower bound of the cheapest detail price
+            max_delivery_time: Upper bound of the fastest detail delivery time
+            terms: Lower-cased search terms, all must occur in title or description
+            ordering: One of ORDERINGS
+
+        Returns:
+            OfferIds: Matching offer IDs in list order
+        """
+        with self.lock:
+            if numpy is not None:
+                return self._query_numpy(creator_id, min_price, max_delivery_time, terms, ordering)
+            return OfferIds(self._query_python(
+                creator_id, min_price, max_delivery_time, terms, ordering))
+
+    def _query_numpy(self, creator_id, min_price, max_delivery_time, terms, ordering):
+        if not self.ids:
+            return OfferIds([])
+        alive = numpy.frombuffer(self.alive, dtype=numpy.bool_)
+        prices = numpy.frombuffer(self.prices, dtype=numpy.float64)
+        days = numpy.frombuffer(self.days, dtype=numpy.float64)
+        if creator_id is not None:
+            # one creator has few offers: filter their rows instead of whole columns
+            rows = self._creator_rows(creator_id)
+            rows = rows[alive[rows]]
+            if min_price is not None:
+                rows = rows[prices[rows] >= min_price]
+            if max_delivery_time is not None:
+                rows = rows[days[rows] <= max_delivery_time]
+            for term in terms:
+                rows = rows[numpy.isin(rows, self._search_rows(term))]
+        else:
+            mask = alive.copy()
+            if min_price is not None:
+                mask &= prices >= min_price
+            if max_delivery_time is not None:
+                mask &= days <= max_delivery_time
+            for term in terms:
+                matches = numpy.zeros(len(mask), dtype=numpy.bool_)
+                matches[self._search_rows(term)] = True
+                mask &= matches
+            if numpy.count_nonzero(mask) * 64 > len(mask):
+                return MaskedOfferIds(self, mask, self._order(ordering))
+            rows = numpy.flatnonzero(mask)
+        rows = rows[numpy.argsort(self._rank(ordering)[rows], kind='stable')]
+        return OfferIds(numpy.frombuffer(self.ids, dtype=numpy.int64)[rows])
+
+    def _query_python(self, creator_id, min_price, max_delivery_time, terms, ordering):
+        alive, creators, prices, days = self.alive, self.creators, self.prices, self.days
+        found = set.intersection(*(set(self._search_rows(term)) for term in terms)) if terms else None
+
+        def matches(position):
+            return (alive[position]
+                    and (creator_id is None or creators[position] == creator_id)
+                    and (min_price is None or prices[position] >= min_price)
+                    and (max_delivery_time is None or days[position] <= max_delivery_time)
+                    and (found is None or position in found))
+
+        ids = self.ids
+        return array('q', (ids[position] for position in self._order(ordering) if matches(position)))
+
+    def memory_report(self):
+        """
+        Report the memory used by each column.
+
+        Returns:
+            dict: Column -> bytes, plus ``total``, ``offers`` and ``bytes_per_offer``
+        """
+        with self.lock:
+            report = {name: len(column) * column.itemsize for name, column in (
+                ('ids', self.ids), ('creators', self.creators), ('prices', self.prices),
+                ('days', self.days), ('updated', self.updated))}
+            report['alive'] = len(self.alive)
+            # str objects plus the list's pointers
+            report['texts'] = sys.getsizeof(self.texts) + sum(map(sys.getsizeof, self.texts))
+            report['search'] = (sys.getsizeof(self._corpus[0]) + len(self._corpus[1]) * 8
+                                if self._corpus else 0)
+            report['orderings'] = sum(
+                sum(part.nbytes for part in order) if isinstance(order, tuple)
+                else order.nbytes if numpy is not None else len(order) * 8
+                for order in self._orders.values())
+            report['total'] = sum(report.values())
+            report['offers'] = self.live
+            report['bytes_per_offer'] = round(report['total'] / max(len(self.ids), 1), 1)
+            return report
+
+
+_index = None
+_index_lock = threading.Lock()
+_filter_form_class = None
+
+
+def get_index():
+    """
+    Return the refreshed index of this process.
+
+    Returns:
+        OfferIndex: The index, or None if ``OFFER_INDEX`` is off
+    """
+    global _index
+    if not settings.OFFER_INDEX:
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = OfferIndex()
+                index.load()
+                _index = index
+    _index.refresh()
+    return _index
+
+
+def warm():
+    """Load the index ahead of the first request (gunicorn ``post_worker_init``)."""
+    get_index()
+
+
+def reset():
+    """Drop the index of this process; the next request loads it again."""
+    global _index
+    _index = None
+
+
+def lookup(request, view):
+    """
+    Answer a list request from the index.
+
+    Args:
+        request: DRF request
+        view: OffersViewSet handling the request
+
+    Returns:
+        OfferIds: Matching offer IDs in list order, or None if the request
+        needs the SQL path
+    """
+    index = get_index()
+    if index is None:
+        return None
+    global _filter_form_class
+    if _filter_form_class is None:
+        # building the form class deep-copies every filter field, so do it once
+        _filter_form_class = OfferFilter(queryset=Offer.objects.none()).get_form_class()
+    form = _filter_form_class(request.query_params)
+    if not form.is_valid() or form.cleaned_data.get('feature'):
+        return None
+    ordering = OfferOrderingFilter().get_ordering(request, Offer.objects.none(), view)
+    if ordering and (len(ordering) != 1 or ordering[0] not in ORDERINGS):
+        return None
+    data = form.cleaned_data
+    creator_id = data.get('creator_id')
+    if creator_id is not None and creator_id != int(creator_id):
+        return None
+    return index.query(
+        creator_id=None if creator_id is None else int(creator_id),
+        min_price=None if data.get('min_price') is None else float(data['min_price']),
+        max_delivery_time=(None if data.get('max_delivery_time') is None
+                           else float(data['max_delivery_time'])),
+        terms=tuple(term.lower() for term in SearchFilter().get_search_terms(request)),
+        ordering=ordering[0] if ordering else DEFAULT_ORDERING,
+    )
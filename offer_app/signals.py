@@ -0,0 +1,180 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core import thumbnails
+from profile_app.models import Profile
+
+from .cache import invalidate_creator
+from .features import sync_features
+from .models import Offer, OfferDetail
+
+OFFER_IMAGE_VARIANTS = ('card', 'detail')
+
+# offers whose updated_at the running code bumps itself after writing several details
+_batched_touches = threading.local()
+
+
+def touch_offer(offer_id):
+    """
+    Move an offer's updated_at forward.
+
+    Args:
+        offer_id: ID of the offer
+
+    Returns:
+        datetime: The new timestamp
+    """
+    now = timezone.now()
+    Offer.objects.filter(pk=offer_id).update(updated_at=now)
+    return now
+
+
+@contextmanager
+def batched_offer_touch(offer):
+    """
+    Bump the offer's updated_at once for all detail writes in the block.
+
+    The per-detail touch of touch_offer_on_detail_change is skipped for
+    this offer inside the block; one UPDATE follows, also when the block
+    fails after some details were written, unless the transaction is
+    already marked for rollback.
+
+    Args:
+        offer: Offer whose details are written
+    """
+    batched = getattr(_batched_touches, 'offer_ids', None)
+    if batched is None:
+        batched = _batched_touches.offer_ids = set()
+    nested = offer.pk in batched
+    batched.add(offer.pk)
+    try:
+        yield
+    finally:
+        if not nested:
+            batched.discard(offer.pk)
+            if not transaction.get_connection().needs_rollback:
+                offer.updated_at = touch_offer(offer.pk)
+
+
+def invalidate_offer_creator(offer_id):
+    """
+    Invalidate cached listings of the creator of an offer.
+
+    Args:
+        offer_id: ID of the offer
+    """
+    creator_id = Offer.objects.filter(pk=offer_id).values_list('user_id', flat=True).first()
+    if creator_id is not None:
+        invalidate_creator(creator_id)
+
+
+@receiver([post_save, post_delete], sender=Offer)
+def invalidate_offer_list_on_offer_change(sender, instance, **kwargs):
+    """
+    Invalidate cached offer listings when an offer is saved or deleted.
+
+    Args:
+        sender: Offer model class
+        instance: Saved or deleted offer
+        **kwargs: Signal arguments
+    """
+    invalidate_creator(instance.user_id)
+
+
+@receiver(post_save, sender=Offer)
+def generate_offer_image_variants(sender, instance, **kwargs):
+    """
+    Schedule card and detail variants for a new or replaced offer image.
+
+    Args:
+        sender: Offer model class
+        instance: Saved offer
+        **kwargs: Signal arguments
+    """
+    if kwargs.get('raw'):
+        return
+    if thumbnails.needs_variants(instance.image, instance.image_variants):
+        thumbnails.schedule(Offer, instance.pk, 'image', 'image_variants',
+                            OFFER_IMAGE_VARIANTS, on_done=invalidate_offer_creator)
+
+
+@receiver([post_save, post_delete], sender=OfferDetail)
+def invalidate_offer_list_on_detail_change(sender, instance, **kwargs):
+    """
+    Invalidate cached offer listings when an offer detail changes.
+
+    Details are rendered into listings through min_price, min_delivery_time
+    and the detail links.
+
+    Args:
+        sender: OfferDetail model class
+        instance: Saved or deleted offer detail
+        **kwargs: Signal arguments
+    """
+    if OfferDetail.offer.is_cached(instance):
+        creator_id = instance.offer.user_id
+    else:
+        creator_id = (Offer.objects.filter(pk=instance.offer_id)
+                      .values_list('user_id', flat=True).first())
+    if creator_id is not None:
+        invalidate_creator(creator_id)
+
+
+@receiver([post_save, post_delete], sender=OfferDetail)
+def touch_offer_on_detail_change(sender, instance, **kwargs):
+    """
+    Move the offer's updated_at forward when one of its details changes.
+
+    Price and delivery time of the listing come from the details, so list
+    ETags and the offer index (offer_app.offer_index) watch the offer's
+    timestamp for them as well. Skipped inside batched_offer_touch, which
+    bumps the offer once, and for details deleted along with their offer.
+
+    Args:
+        sender: OfferDetail model class
+        instance: Saved or deleted offer detail
+        **kwargs: Signal arguments
+    """
+    if kwargs.get('raw') or instance.offer_id in getattr(_batched_touches, 'offer_ids', ()):
+        return
+    origin = kwargs.get('origin')
+    if origin is not None and getattr(origin, 'model', type(origin)) is not OfferDetail:
+        # cascade from deleting the offer (or its user)
+        return
+    touch_offer(instance.offer_id)
+
+
+@receiver(post_save, sender=OfferDetail)
+def sync_offer_detail_features(sender, instance, **kwargs):
+    """
+    Mirror the features of a saved offer detail into the feature table.
+
+    Saves limited to other fields leave the rows alone.
+
+    Args:
+        sender: OfferDetail model class
+        instance: Saved offer detail
+        **kwargs: Signal arguments
+    """
+    update_fields = kwargs.get('update_fields')
+    if kwargs.get('raw') or (update_fields is not None and 'features' not in update_fields):
+        return
+    sync_features(instance, using=kwargs.get('using'))
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_offer_list_on_profile_change(sender, instance, **kwargs):
+    """
+    Invalidate cached offer listings showing the profile's name.
+
+    Args:
+        sender: Profile model class
+        instance: Saved profile
+        **kwargs: Signal arguments
+    """
+    invalidate_creator(instance.user_id)
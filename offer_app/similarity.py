@@ -0,0 +1,359 @@
+"""
+Precomputed "similar offers" recommendations.
+
+``refresh`` builds TF-IDF vectors over the title and description of every
+offer and stores the ``SIMILAR_OFFERS_TOP_K`` offers with the highest
+cosine similarity to each offer as ``SimilarOffer`` rows, so the
+``similar`` endpoint is a single lookup on the (offer, rank) index. It runs
+offline through the ``build_similar_offers`` management command and needs
+NumPy.
+
+The vectors form a sparse matrix kept twice in NumPy arrays: per offer
+(CSR) and per term (CSC). The scores of one offer against all others come
+from the postings of its terms: all (offer, weight) entries of those terms
+are gathered with one fancy-indexing step and summed per offer with
+``bincount``, so only offers sharing at least one term are looked at.
+Terms that occur in a single offer or in more than
+``MAX_DOCUMENT_FREQUENCY`` of all offers are dropped; they cannot link two
+offers or link almost all of them.
+
+Incremental runs (the default once rows exist) recompute the neighbors of
+
+    - offers changed since the last run (``updated_at`` past the newest
+      ``computed_at``), which includes new offers,
+    - offers listing a changed offer, or a gap left by a deleted one,
+    - offers for which a changed offer now scores above their K-th neighbor.
+
+The other rows keep the IDF weights of the run that wrote them; a full run
+recomputes everything and is needed after changing the number of neighbors.
+"""
+import re
+from array import array
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from .models import Offer, SimilarOffer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+TOKEN_PATTERN = re.compile(r'[^\W\d_]{2,}')
+# Function words of the languages offers are written in (English, German)
+STOP_WORDS = frozenset("""
+    a an and are as at be by for from in is it of on or our the to with you your
+    am auf aus bei das dem den der des die ein eine einen einer für ihr ihre im ist
+    mit oder sie und von vom wir zu zum zur
+""".split())
+# Title terms count this often, a title match says more than a description match
+TITLE_WEIGHT = 2
+MAX_DOCUMENT_FREQUENCY = 0.5
+MIN_SCORE = 0.05
+# Postings per offer above which scores are summed into a dense array
+DENSE_FACTOR = 8
+# Seconds re-read before the watermark, for transactions that commit late
+REFRESH_OVERLAP = timedelta(seconds=5)
+READ_CHUNK_SIZE = 2000
+WRITE_BATCH_SIZE = 500
+
+
+def tokenize(title, description):
+    """
+    Count the terms of an offer's text.
+
+    Args:
+        title: Offer title, its terms count ``TITLE_WEIGHT`` times
+        description: Offer description
+
+    Returns:
+        Counter: Lower-cased terms of at least two letters, except stop
+        words, with their counts
+    """
+    counts = Counter(TOKEN_PATTERN.findall(description.lower()))
+    for term in TOKEN_PATTERN.findall(title.lower()):
+        counts[term] += TITLE_WEIGHT
+    for term in STOP_WORDS.intersection(counts):
+        del counts[term]
+    return counts
+
+
+class TfidfMatrix:
+    """
+    L2-normalized TF-IDF vectors of a set of offers.
+
+    Rows are the offers in ascending ID order; term frequencies are damped
+    to ``1 + log(tf)`` and weighted with the smoothed IDF
+    ``log((1 + n) / (1 + df)) + 1``.
+    """
+
+    def __init__(self, ids, documents):
+        """
+        Build the matrix.
+
+        Args:
+            ids: Offer IDs in ascending order
+            documents: Term counts (see ``tokenize``) in the same order
+        """
+        self.ids = numpy.asarray(ids, dtype=numpy.int64)
+        vocabulary = {}
+        offsets, terms, counts = array('q', [0]), array('i'), array('f')
+        for document in documents:
+            for term, count in document.items():
+                terms.append(vocabulary.setdefault(term, len(vocabulary)))
+                counts.append(count)
+            offsets.append(len(terms))
+
+        size = len(self.ids)
+        terms = numpy.frombuffer(terms, dtype=numpy.intc).astype(numpy.int32)
+        counts = numpy.frombuffer(counts, dtype=numpy.float32)
+        rows = numpy.repeat(numpy.arange(size, dtype=numpy.int32), numpy.diff(offsets))
+
+        frequencies = numpy.bincount(terms, minlength=len(vocabulary))
+        useful = (frequencies > 1) & (frequencies <= max(MAX_DOCUMENT_FREQUENCY * size, 2))
+        keep = useful[terms]
+        terms, counts, rows = terms[keep], counts[keep], rows[keep]
+        self.term_count = int(useful.sum())
+
+        idf = numpy.log((1 + size) / (1 + frequencies)) + 1
+        weights = (1 + numpy.log(counts)) * idf[terms]
+        norms = numpy.sqrt(numpy.bincount(rows, weights ** 2, minlength=size))
+        weights /= norms[rows]
+
+        # CSR: the entries are already grouped by row
+        self.row_indptr = numpy.concatenate(([0], numpy.cumsum(numpy.bincount(rows, minlength=size))))
+        self.row_terms = terms
+        self.row_weights = weights
+        # CSC: the same entries grouped by term, rows ascending within a term
+        order = numpy.argsort(terms, kind='stable')
+        self.term_indptr = numpy.concatenate(
+            ([0], numpy.cumsum(numpy.bincount(terms, minlength=len(vocabulary)))))
+        self.term_rows = rows[order]
+        self.term_weights = weights[order]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def locate(self, ids):
+        """
+        Map offer IDs to row numbers.
+
+        Args:
+            ids: Iterable of offer IDs
+
+        Returns:
+            tuple: (row numbers of the known IDs, mask of the known IDs)
+        """
+        ids = numpy.fromiter(ids, dtype=numpy.int64)
+        rows = numpy.searchsorted(self.ids, ids)
+        found = rows < len(self.ids)
+        found[found] = self.ids[rows[found]] == ids[found]
+        return rows[found], found
+
+    def rows_of(self, ids):
+        """
+        Map offer IDs to row numbers, skipping unknown IDs.
+
+        Args:
+            ids: Iterable of offer IDs
+
+        Returns:
+            numpy.ndarray: Row numbers
+        """
+        return self.locate(ids)[0]
+
+    def _sums(self, row):
+        """
+        Sum the products of one offer's weights with the postings of its terms.
+
+        Args:
+            row: Row number of the offer
+
+        Returns:
+            tuple: (row numbers, scores), or (None, scores of every row)
+            when the postings cover a large part of all offers
+        """
+        start, end = self.row_indptr[row], self.row_indptr[row + 1]
+        terms, weights = self.row_terms[start:end], self.row_weights[start:end]
+        starts = self.term_indptr[terms]
+        lengths = self.term_indptr[terms + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return numpy.empty(0, dtype=numpy.int32), numpy.empty(0)
+        # positions of all postings of the offer's terms, one posting list after another
+        positions = numpy.repeat(starts - numpy.cumsum(lengths) + lengths, lengths) + numpy.arange(total)
+        products = self.term_weights[positions] * numpy.repeat(weights, lengths)
+        rows = self.term_rows[positions]
+        if total * DENSE_FACTOR > len(self.ids):
+            # many postings: one slot per offer is cheaper than sorting them
+            return None, numpy.bincount(rows, products, minlength=len(self.ids))
+        rows, inverse = numpy.unique(rows, return_inverse=True)
+        return rows, numpy.bincount(inverse, products)
+
+    def scores(self, row):
+        """
+        Compute the cosine similarity of one offer to all offers sharing a term.
+
+        Args:
+            row: Row number of the offer
+
+        Returns:
+            tuple: (row numbers, scores) as arrays, without the offer itself
+        """
+        rows, sums = self._sums(row)
+        if rows is None:
+            sums[row] = 0
+            rows = numpy.flatnonzero(sums > 0)
+            return rows, sums[rows]
+        other = rows != row
+        return rows[other], sums[other]
+
+    def neighbors(self, row, count):
+        """
+        Find the offers most similar to one offer.
+
+        Args:
+            row: Row number of the offer
+            count: Maximum number of neighbors
+
+        Returns:
+            tuple: (row numbers, scores), best first, ties by lower offer ID
+        """
+        rows, scores = self._sums(row)
+        if rows is None:
+            scores[row] = 0
+        else:
+            other = rows != row
+            rows, scores = rows[other], scores[other]
+        threshold = MIN_SCORE
+        if len(scores) > count:
+            threshold = max(threshold, numpy.partition(scores, -count)[-count])
+        keep = numpy.flatnonzero(scores >= threshold)
+        rows, scores = keep if rows is None else rows[keep], scores[keep]
+        order = numpy.lexsort((rows, -scores))[:count]
+        return rows[order], scores[order]
+
+
+def load_matrix():
+    """
+    Build the TF-IDF matrix of all offers.
+
+    Returns:
+        TfidfMatrix: Vectors of every offer
+    """
+    ids, documents = array('q'), []
+    offers = Offer.objects.order_by('pk').values_list('pk', 'title', 'description')
+    for pk, title, description in offers.iterator(chunk_size=READ_CHUNK_SIZE):
+        ids.append(pk)
+        documents.append(tokenize(title, description))
+    return TfidfMatrix(ids, documents)
+
+
+def stale_rows(matrix, since, top_k):
+    """
+    Select the offers whose stored neighbors may be out of date.
+
+    Args:
+        matrix: TfidfMatrix of all offers
+        since: Offers updated at or after this time count as changed
+        top_k: Number of neighbors stored per offer
+
+    Returns:
+        numpy.ndarray: Sorted row numbers
+    """
+    changed = matrix.rows_of(
+        Offer.objects.filter(updated_at__gte=since).values_list('pk', flat=True).iterator())
+    listing_changed = SimilarOffer.objects.filter(
+        similar_offer__updated_at__gte=since).values_list('offer_id', flat=True)
+    # deleting an offer deletes the rows pointing to it and leaves a gap in the ranks
+    with_gaps = (SimilarOffer.objects.values('offer_id')
+                 .annotate(rows=Count('pk'), last_rank=Max('rank'))
+                 .filter(last_rank__gt=F('rows')).values_list('offer_id', flat=True))
+    stale = numpy.zeros(len(matrix), dtype=bool)
+    stale[changed] = True
+    stale[matrix.rows_of(listing_changed.iterator())] = True
+    stale[matrix.rows_of(with_gaps.iterator())] = True
+
+    # a changed offer enters a list if it beats the current K-th neighbor
+    offer_ids, scores = array('q'), array('d')
+    last = SimilarOffer.objects.filter(rank=top_k).values_list('offer_id', 'score')
+    for offer_id, score in last.iterator(chunk_size=READ_CHUNK_SIZE):
+        offer_ids.append(offer_id)
+        scores.append(score)
+    threshold = numpy.full(len(matrix), MIN_SCORE)
+    rows, found = matrix.locate(offer_ids)
+    threshold[rows] = numpy.maximum(numpy.frombuffer(scores)[found], MIN_SCORE)
+    for row in changed:
+        rows, scores = matrix.scores(row)
+        stale[rows[scores > threshold[rows]]] = True
+    return numpy.flatnonzero(stale)
+
+
+def write_neighbors(matrix, rows, top_k, computed_at):
+    """
+    Replace the stored neighbors of some offers.
+
+    Each batch is written in its own transaction. Offers deleted since the
+    matrix was built are skipped.
+
+    Args:
+        matrix: TfidfMatrix of all offers
+        rows: Row numbers of the offers to recompute
+        top_k: Number of neighbors per offer
+        computed_at: Timestamp stored with the rows
+
+    Returns:
+        int: Number of rows written
+    """
+    written = 0
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        batch = rows[start:start + WRITE_BATCH_SIZE]
+        neighbors = {int(matrix.ids[row]): matrix.neighbors(row, top_k) for row in batch}
+        referenced = set(neighbors)
+        for neighbor_rows, _ in neighbors.values():
+            referenced.update(matrix.ids[neighbor_rows].tolist())
+        with transaction.atomic():
+            existing = set(Offer.objects.filter(pk__in=referenced).values_list('pk', flat=True))
+            objects = []
+            for offer_id, (neighbor_rows, scores) in neighbors.items():
+                if offer_id not in existing:
+                    continue
+                # IDs and scores are filtered together so the scores stay with their offers
+                pairs = [(pk, score) for pk, score in zip(matrix.ids[neighbor_rows].tolist(), scores)
+                         if pk in existing]
+                objects.extend(
+                    SimilarOffer(offer_id=offer_id, similar_offer_id=neighbor_id, rank=rank,
+                                 score=round(min(float(score), 1.0), 4), computed_at=computed_at)
+                    for rank, (neighbor_id, score) in enumerate(pairs, 1))
+            SimilarOffer.objects.filter(offer_id__in=list(neighbors)).delete()
+            SimilarOffer.objects.bulk_create(objects)
+        written += len(objects)
+    return written
+
+
+def refresh(full=False, top_k=None):
+    """
+    Recompute the stored neighbors of new, changed and affected offers.
+
+    Args:
+        full: Recompute every offer instead of the changes since the last run
+        top_k: Neighbors per offer, defaults to ``SIMILAR_OFFERS_TOP_K``
+
+    Returns:
+        dict: ``offers``, ``terms``, ``refreshed`` offers and ``rows`` written
+    """
+    top_k = top_k or settings.SIMILAR_OFFERS_TOP_K
+    started = timezone.now()
+    watermark = None if full else SimilarOffer.objects.aggregate(value=Max('computed_at'))['value']
+    matrix = load_matrix()
+    if watermark is None:
+        rows = numpy.arange(len(matrix))
+    else:
+        rows = stale_rows(matrix, watermark - REFRESH_OVERLAP, top_k)
+    return {'offers': len(matrix), 'terms': matrix.term_count, 'refreshed': len(rows),
+            'rows': write_neighbors(matrix, rows, top_k, started)}
@@ -0,0 +1,89 @@
+"""
+Tests for the offer facets endpoint.
+"""
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from offer_app import facets
+from offer_app.models import Offer, OfferDetail
+from profile_app.models import Profile
+
+
+# cache hits are asserted to need no queries, which a database cache cannot offer
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class OfferFacetsTests(APITestCase):
+    """Bucket counts, their consistency with the listing and caching."""
+
+    def setUp(self):
+        """Create offers of two creators at different prices and delivery times."""
+        self.creators = []
+        for username in ('business1', 'business2'):
+            user = User.objects.create_user(username=username, password='testpass123')
+            Profile.objects.create(user=user, type='business')
+            self.creators.append(user)
+        self.offers = [
+            self._create_offer(self.creators[0], 'Logo', [(40, 2, ['Logo']), (90, 1, ['Logo', 'Flyer'])]),
+            self._create_offer(self.creators[0], 'Website', [(300, 10, ['Hosting'])]),
+            self._create_offer(self.creators[1], 'Flyer', [(120, 5, ['Flyer'])]),
+            self._create_offer(self.creators[1], 'Draft', []),
+        ]
+        self.url = reverse('offers-facets')
+
+    def _create_offer(self, user, title, details):
+        offer = Offer.objects.create(user=user, title=title, description='Description')
+        for index, (price, days, features) in enumerate(details):
+            OfferDetail.objects.create(
+                offer=offer, title=f'Tier {index}', revisions=1, delivery_time_in_days=days,
+                price=price, features=features, offer_type=('basic', 'standard')[index])
+        return offer
+
+    def test_counts(self):
+        """Offers are counted once per bucket of their cheapest detail."""
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['count'], 4)
+        self.assertEqual([bucket['count'] for bucket in data['price']], [1, 0, 1, 1, 0])
+        self.assertEqual(data['price'][0], {'min': None, 'max': 50, 'count': 1})
+        self.assertEqual([bucket['count'] for bucket in data['max_delivery_time']], [1, 1, 2, 3])
+        self.assertEqual(data['creators'], [
+            {'creator_id': self.creators[0].id, 'count': 2},
+            {'creator_id': self.creators[1].id, 'count': 2},
+        ])
+
+    def test_counts_match_listing(self):
+        """Each count equals the listing count with the bucket's filter added."""
+        for params in ({}, {'search': 'o'}, {'feature': 'Flyer'}, {'min_price': 100},
+                       {'creator_id': self.creators[1].id, 'max_delivery_time': 7}):
+            with self.subTest(params=params):
+                data = self.client.get(self.url, params).json()
+                listing = self.client.get(reverse('offers-list'), params).json()
+                self.assertEqual(data['count'], listing['count'])
+                for bucket in data['max_delivery_time']:
+                    filtered = {**params, 'max_delivery_time': min(
+                        bucket['value'], params.get('max_delivery_time', bucket['value']))}
+                    self.assertEqual(
+                        bucket['count'],
+                        self.client.get(reverse('offers-list'), filtered).json()['count'])
+                for creator in data['creators']:
+                    filtered = {**params, 'creator_id': creator['creator_id']}
+                    self.assertEqual(
+                        creator['count'],
+                        self.client.get(reverse('offers-list'), filtered).json()['count'])
+
+    def test_single_query_and_cache(self):
+        """Counts take one query, are cached per filter set and invalidated on writes."""
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {'search': 'logo', 'page': 3})
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url, {'search': ' logo', 'ordering': 'min_price'}).json()
+        self.assertEqual(cached['count'], 1)
+
+        self.offers[1].title = 'Logo website'
+        self.offers[1].save()
+        self.assertEqual(self.client.get(self.url, {'search': 'logo'}).json()['count'], 2)
+
+    def test_creator_limit(self):
+        """Only the creators with the most offers are listed."""
+        data = facets.facet_counts(Offer.objects.all(), creator_limit=1)
+        self.assertEqual(data['creators'], [{'creator_id': self.creators[0].id, 'count': 2}])
@@ -0,0 +1,67 @@
+"""
+Tests for the feature filter of the offer listing and its side table.
+"""
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from offer_app.models import Offer, OfferDetail, OfferDetailFeature
+from profile_app.models import Profile
+
+
+class OfferFeatureFilterTests(APITestCase):
+    """Filtering offers by a feature of their details."""
+
+    def setUp(self):
+        """Create two offers with different detail features."""
+        self.business_user = User.objects.create_user(username='business', password='testpass123')
+        Profile.objects.create(user=self.business_user, type='business')
+        self.logo = self._create_offer('Logo', [['Logo', 'Flyer'], ['Logo', 'Source files']])
+        self.web = self._create_offer('Website', [['Responsive design'], ['Hosting']])
+        self.url = reverse('offers-list')
+
+    def _create_offer(self, title, feature_lists):
+        offer = Offer.objects.create(user=self.business_user, title=title, description='Description')
+        for index, features in enumerate(feature_lists):
+            OfferDetail.objects.create(
+                offer=offer, title=f'Tier {index}', revisions=1, delivery_time_in_days=5,
+                price=100 * (index + 1), features=features, offer_type=('basic', 'standard')[index])
+        return offer
+
+    def titles(self, **params):
+        response = self.client.get(self.url, {'page_size': 10, **params})
+        self.assertEqual(response.status_code, 200)
+        return [offer['title'] for offer in response.data['results']]
+
+    def test_filter_matches_any_detail(self):
+        """An offer matches once, whichever of its details lists the feature."""
+        self.assertEqual(self.titles(feature='Logo'), ['Logo'])
+        self.assertEqual(self.titles(feature=' Hosting '), ['Website'])
+        self.assertEqual(self.titles(feature='logo'), [])
+        self.assertEqual(sorted(self.titles(feature='')), ['Logo', 'Website'])
+
+    def test_filter_keeps_aggregates(self):
+        """Only the matching offers are returned, with prices over all their details."""
+        response = self.client.get(self.url, {'feature': 'Source files', 'min_price': 100})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(float(response.data['results'][0]['min_price']), 100)
+
+    def test_side_table_follows_writes(self):
+        """Saving a detail rewrites its feature rows and deleting removes them."""
+        detail = self.web.details.get(offer_type='basic')
+        self.assertEqual(self.titles(feature='Responsive design'), ['Website'])
+
+        detail.features = ['SEO', 'SEO ', 'Logo']
+        detail.save()
+        self.assertEqual(
+            sorted(detail.feature_rows.values_list('feature', flat=True)), ['Logo', 'SEO'])
+        self.assertEqual(self.titles(feature='Responsive design'), [])
+        self.assertEqual(self.titles(feature='SEO'), ['Website'])
+
+        detail.price = 50
+        detail.save(update_fields=['price'])
+        self.assertEqual(detail.feature_rows.count(), 2)
+
+        self.web.delete()
+        self.assertFalse(OfferDetailFeature.objects.filter(offer_detail_id=detail.id).exists())
+        self.assertEqual(self.titles(feature='SEO'), [])
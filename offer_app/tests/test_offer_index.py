@@ -0,0 +1,142 @@
+"""
+Tests for the in-memory offer index of the offer listing.
+"""
+import io
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from offer_app import offer_index
+from offer_app.models import Offer, OfferDetail
+
+PARAMS = [
+    {},
+    {'min_price': 100},
+    {'max_delivery_time': 7},
+    {'search': 'logo'},
+    {'search': 'design, freelancer', 'min_price': 50, 'max_delivery_time': 14},
+    {'ordering': 'updated_at'},
+    {'ordering': 'min_price'},
+    {'ordering': '-min_price', 'max_delivery_time': 10},
+    {'creator_id': None, 'ordering': 'min_price'},
+]
+
+
+@override_settings(OFFER_INDEX=True, OFFER_INDEX_REFRESH=0)
+class OfferIndexTests(APITestCase):
+    """The indexed list path returns what the SQL path returns."""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('generate_dataset', users=60, seed=3, stdout=io.StringIO())
+        cls.business_user = User.objects.filter(offers__isnull=False).first()
+
+    def setUp(self):
+        offer_index.reset()
+        self.addCleanup(offer_index.reset)
+        self.client.force_authenticate(user=self.business_user)
+        self.url = reverse('offers-list')
+
+    def get(self, params, indexed=True):
+        params = {'page_size': 100, **params}
+        if 'creator_id' in params:
+            params['creator_id'] = self.business_user.id
+        with self.settings(OFFER_INDEX=indexed):
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def assertSameAsSql(self, params):
+        indexed, sql = self.get(params), self.get(params, indexed=False)
+        self.assertEqual(indexed['count'], sql['count'])
+        ordering = params.get('ordering', '-updated_at').lstrip('-')
+        # ties in min_price may come back in any order from SQL
+        self.assertEqual([offer[ordering] for offer in indexed['results']],
+                         [offer[ordering] for offer in sql['results']])
+        self.assertEqual(sorted(offer['id'] for offer in indexed['results']),
+                         sorted(offer['id'] for offer in sql['results']))
+
+    def test_matches_sql_path(self):
+        """Filters, search and orderings give the same page as SQL."""
+        index = offer_index.get_index()
+        with mock.patch.object(index, 'query', wraps=index.query) as query:
+            for params in PARAMS:
+                with self.subTest(params=params):
+                    self.assertSameAsSql(params)
+        self.assertEqual(query.call_count, len(PARAMS))
+
+    def test_matches_sql_path_without_numpy(self):
+        """The pure Python fallback gives the same results."""
+        with mock.patch.object(offer_index, 'numpy', None):
+            for params in PARAMS:
+                with self.subTest(params=params):
+                    self.assertSameAsSql(params)
+
+    @mock.patch.object(offer_index.MaskedOfferIds, 'chunk_size', 5)
+    def test_pages_match_python_path(self):
+        """Pages resolved chunk by chunk equal slices of the full result."""
+        index = offer_index.get_index()
+        for query in ({}, {'min_price': 150.0, 'ordering': 'min_price'}, {'terms': ('logo',)},
+                      {'creator_id': self.business_user.id, 'ordering': '-min_price'}):
+            ids = index.query(**query)
+            with mock.patch.object(offer_index, 'numpy', None):
+                expected = list(index.query(**query)[:])
+            with self.subTest(query=query):
+                self.assertEqual(len(ids), len(expected))
+                for start in (0, 3, 7, max(len(expected) - 2, 0)):
+                    self.assertEqual(ids[start:start + 6], expected[start:start + 6])
+
+    def test_unsupported_params_use_sql(self):
+        """Feature filters and several ordering fields are answered by SQL."""
+        index = offer_index.get_index()
+        with mock.patch.object(index, 'query') as query:
+            self.get({'feature': 'Support'})
+            self.get({'ordering': 'min_price,updated_at'})
+            self.assertEqual(self.client.get(self.url, {'min_price': 'abc'}).status_code, 400)
+        query.assert_not_called()
+
+    def test_changes_are_picked_up(self):
+        """New, changed and deleted offers show up on the next refresh."""
+        self.get({})
+        offer = Offer.objects.create(user=self.business_user, title='Fresh index offer', description='New')
+        detail = OfferDetail.objects.create(
+            offer=offer, title='Basic', revisions=1, delivery_time_in_days=1, price=9999,
+            features=[], offer_type='basic')
+        self.assertEqual(self.get({'search': 'fresh index'})['count'], 1)
+        self.assertEqual(self.get({'min_price': 9999})['count'], 1)
+
+        detail.price = 5
+        detail.save()
+        self.assertEqual(self.get({'min_price': 9999})['count'], 0)
+        self.assertSameAsSql({'ordering': 'min_price'})
+
+        offer.delete()
+        self.assertEqual(self.get({'search': 'fresh index'})['count'], 0)
+        self.assertSameAsSql({})
+
+    def test_etag(self):
+        """Indexed lists answer conditional requests."""
+        response = self.client.get(self.url, {'page_size': 5})
+        response = self.client.get(self.url, {'page_size': 5}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_memory_report(self):
+        """The report accounts for every column."""
+        report = offer_index.get_index().memory_report()
+        self.assertEqual(report['offers'], Offer.objects.count())
+        self.assertEqual(report['ids'], 8 * Offer.objects.count())
+        self.assertEqual(report['total'], sum(
+            value for key, value in report.items() if key not in ('total', 'offers', 'bytes_per_offer')))
+
+    def test_anonymous_list_is_built_from_index(self):
+        """Cache misses of anonymous listings use the index as well."""
+        self.client.force_authenticate(user=None)
+        index = offer_index.get_index()
+        with mock.patch.object(index, 'query', wraps=index.query) as query:
+            response = self.client.get(self.url, {'page_size': 3, 'ordering': 'min_price'})
+        query.assert_called_once()
+        self.assertEqual(len(response.json()['results']), 3)
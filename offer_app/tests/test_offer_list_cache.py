@@ -0,0 +1,172 @@
+"""
+Tests for the anonymous offer list response cache.
+"""
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from offer_app import cache as offer_list_cache
+from offer_app.models import Offer, OfferDetail
+from profile_app.models import Profile
+
+
+# cache hits are asserted to need no queries, which a database cache cannot offer
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class OfferListCacheTests(APITestCase):
+    """Tests for caching and tag-based invalidation of offer listings."""
+
+    def setUp(self):
+        """Set up two business users with one offer each."""
+        self.business_user = User.objects.create_user(
+            username='business1', password='testpass123')
+        self.profile = Profile.objects.create(user=self.business_user, type='business')
+        self.other_business_user = User.objects.create_user(
+            username='business2', password='testpass123')
+        Profile.objects.create(user=self.other_business_user, type='business')
+
+        self.offer = self._create_offer(self.business_user, "Web Development", 100)
+        self.other_offer = self._create_offer(self.other_business_user, "Logo Design", 200)
+        self.url = reverse('offers-list')
+
+    def _create_offer(self, user, title, price):
+        offer = Offer.objects.create(user=user, title=title, description="Description")
+        OfferDetail.objects.create(
+            offer=offer,
+            title="Basic Plan",
+            revisions=1,
+            delivery_time_in_days=5,
+            price=price,
+            features=["Feature 1"],
+            offer_type="basic"
+        )
+        return offer
+
+    def test_second_anonymous_request_is_served_without_queries(self):
+        """The same anonymous listing is answered from the cache."""
+        first = self.client.get(self.url, {'page_size': 10})
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url, {'page_size': 10})
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.data, second.data)
+
+    def test_equivalent_query_strings_share_an_entry(self):
+        """Empty, unknown and default parameters do not create new entries."""
+        self.client.get(self.url, {'page_size': 10})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.url, {'page_size': ' 10 ', 'page': 1, 'search': '', 'utm_source': 'x'})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_authenticated_requests_are_not_cached(self):
+        """Authenticated users always get a freshly built listing."""
+        self.client.force_authenticate(user=self.business_user)
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        self.assertGreater(len(queries), 0)
+
+    def test_offer_update_invalidates_listing(self):
+        """Updating an offer through the API is visible to anonymous users."""
+        self.client.get(self.url, {'page_size': 10})
+
+        self.client.force_authenticate(user=self.business_user)
+        self.client.patch(
+            reverse('offers-detail', kwargs={'pk': self.offer.id}),
+            {'title': 'Updated Title'}, format='json')
+        self.client.force_authenticate(user=None)
+
+        response = self.client.get(self.url, {'page_size': 10})
+        titles = [offer['title'] for offer in response.data['results']]
+        self.assertIn('Updated Title', titles)
+
+    def test_offer_delete_invalidates_listing(self):
+        """Deleted offers disappear from the cached listing."""
+        self.client.get(self.url, {'page_size': 10})
+
+        self.other_offer.delete()
+
+        response = self.client.get(self.url, {'page_size': 10})
+        self.assertEqual(response.data['count'], 1)
+
+    def test_offer_detail_change_invalidates_listing(self):
+        """Changing a detail price updates min_price in the listing."""
+        self.client.get(self.url, {'creator_id': self.business_user.id})
+
+        detail = self.offer.details.get()
+        detail.price = 50
+        detail.save()
+
+        response = self.client.get(self.url, {'creator_id': self.business_user.id})
+        self.assertEqual(response.data['results'][0]['min_price'], 50)
+
+    def test_profile_change_invalidates_listing(self):
+        """Creator names in user_details follow profile updates."""
+        self.client.get(self.url, {'creator_id': self.business_user.id})
+
+        self.profile.first_name = 'Max'
+        self.profile.save()
+
+        response = self.client.get(self.url, {'creator_id': self.business_user.id})
+        self.assertEqual(response.data['results'][0]['user_details']['first_name'], 'Max')
+
+    def test_other_creator_change_keeps_creator_listing(self):
+        """A creator-filtered listing survives writes to another creator's offers."""
+        self.client.get(self.url, {'creator_id': self.business_user.id})
+
+        self._create_offer(self.other_business_user, "SEO", 300)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'creator_id': self.business_user.id})
+        self.assertEqual(response.data['count'], 1)
+
+    def test_new_offer_invalidates_unfiltered_listing(self):
+        """A new offer shows up in the unfiltered listing."""
+        self.client.get(self.url, {'page_size': 10})
+
+        self._create_offer(self.other_business_user, "SEO", 300)
+
+        response = self.client.get(self.url, {'page_size': 10})
+        self.assertEqual(response.data['count'], 3)
+
+
+# the threads' own connections cannot see a database cache inside the test transaction
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class OfferListCacheStampedeTests(APITestCase):
+    """Tests for stampede protection of the offer list cache."""
+
+    def test_concurrent_misses_build_once(self):
+        """Concurrent requests for a missing entry trigger a single rebuild."""
+        factory = APIRequestFactory()
+        builds = []
+        results = []
+
+        def build():
+            builds.append(1)
+            time.sleep(0.2)
+            return {'count': 0, 'results': []}
+
+        def worker():
+            request = Request(factory.get('/api/offers/', {'page_size': 5}))
+            results.append(offer_list_cache.get_or_build(request, build))
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(len(results), 20)
+        self.assertEqual(sum(1 for _, hit in results if hit), 19)
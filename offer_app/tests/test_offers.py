@@ -2,6 +2,8 @@
 Tests for offer management functionality.
 """
 from rest_framework.test import APITestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth.models import User
 from offer_app.models import Offer, OfferDetail
@@ -267,6 +269,17 @@ class CreateOfferHappyPathTests(APITestCase):
         self.assertIn('standard', offer_types)
         self.assertIn('premium', offer_types)
 
+    def test_create_offer_touches_the_offer_once(self):
+        """Creating three details bumps the new offer's updated_at with one UPDATE."""
+        self.client.force_authenticate(user=self.business_user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('offers-list'), self.offer_data, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        offer_updates = [query['sql'] for query in queries.captured_queries
+                         if query['sql'].startswith('UPDATE "offer_app_offer"')]
+        self.assertEqual(len(offer_updates), 1)
+
 
 class UpdateOfferHappyPathTests(APITestCase):
     """Tests for updating offers - happy paths."""
@@ -357,6 +370,20 @@ class DeleteOfferHappyPathTests(APITestCase):
         offer_exists = Offer.objects.filter(pk=self.offer.pk).exists()
         self.assertFalse(offer_exists)
 
+    def test_delete_offer_does_not_touch_it_per_detail(self):
+        """Details deleted along with their offer run no UPDATE on the offer."""
+        for offer_type in ('basic', 'standard', 'premium'):
+            OfferDetail.objects.create(
+                offer=self.offer, title=offer_type, revisions=1, delivery_time_in_days=1,
+                price=10, features=[], offer_type=offer_type)
+        self.client.force_authenticate(user=self.business_user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(reverse('offers-detail', kwargs={'pk': self.offer.pk}))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(any(query['sql'].startswith('UPDATE "offer_app_offer"')
+                             for query in queries.captured_queries))
+
 
 class ListOffersUnhappyPathTests(APITestCase):
     """Tests for listing offers - unhappy paths."""
@@ -0,0 +1,115 @@
+"""
+Tests for the precomputed similar offers and their endpoint.
+"""
+import io
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from offer_app import similarity
+from offer_app.models import Offer, SimilarOffer
+from profile_app.models import Profile
+
+TEXTS = [
+    ('Logo design', 'Vector logo design for startups.'),
+    ('Minimal logo', 'Minimal logo design with vector files.'),
+    ('Django website', 'Website development with Django and hosting.'),
+    ('Website hosting', 'Hosting and maintenance for your Django website.'),
+    ('Wedding photography', 'Photography of your wedding day.'),
+    ('Portrait photography', 'Studio portrait photography.'),
+]
+
+
+class SimilarOffersTests(APITestCase):
+    """Neighbors are built, refreshed incrementally and served in one query."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='business1', password='testpass123')
+        Profile.objects.create(user=self.user, type='business')
+        self.offers = [self._create_offer(title, description) for title, description in TEXTS]
+        self.client.force_authenticate(user=self.user)
+
+    def _create_offer(self, title, description):
+        return Offer.objects.create(user=self.user, title=title, description=description)
+
+    def neighbors(self, offer):
+        return list(SimilarOffer.objects.filter(offer=offer).values_list('similar_offer_id', flat=True))
+
+    def test_full_build(self):
+        """The most similar offer comes first and unrelated offers are left out."""
+        out = io.StringIO()
+        call_command('build_similar_offers', '--top-k', '2', stdout=out)
+        self.assertIn('Refreshed 6 of 6 offers', out.getvalue())
+        logo, minimal, django, hosting, wedding, portrait = self.offers
+        self.assertEqual(self.neighbors(logo), [minimal.id])
+        self.assertEqual(self.neighbors(django), [hosting.id])
+        self.assertEqual(self.neighbors(wedding), [portrait.id])
+        scores = SimilarOffer.objects.values_list('score', flat=True)
+        self.assertTrue(all(0 < score <= 1 for score in scores))
+
+    def test_deleted_neighbor_keeps_scores_aligned(self):
+        """A neighbor deleted after the matrix was built does not shift the scores."""
+        new = self._create_offer('Logo design express', 'Express logo design in vector format.')
+        matrix = similarity.load_matrix()
+        row = list(matrix.ids).index(new.id)
+        neighbor_rows, scores = matrix.neighbors(row, 2)
+        expected = {int(matrix.ids[neighbor_rows[1]]): round(min(float(scores[1]), 1.0), 4)}
+        Offer.objects.filter(pk=int(matrix.ids[neighbor_rows[0]])).delete()
+
+        similarity.write_neighbors(matrix, [row], 2, timezone.now())
+
+        stored = dict(SimilarOffer.objects.filter(offer=new).values_list('similar_offer_id', 'score'))
+        self.assertEqual(stored, expected)
+        self.assertEqual(SimilarOffer.objects.get(offer=new).rank, 1)
+
+    def test_incremental_refresh(self):
+        """New, changed and deleted offers only update the affected lists."""
+        # older than the overlap re-read before the watermark
+        Offer.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        similarity.refresh(top_k=2)
+        logo, minimal, django, hosting, wedding, portrait = self.offers
+        untouched = set(SimilarOffer.objects.filter(offer__in=[wedding, portrait]).values_list('pk', flat=True))
+
+        new = self._create_offer('Logo design express', 'Express logo design in vector format.')
+        hosting.title = 'Server administration'
+        hosting.description = 'Linux server administration.'
+        hosting.save()
+        stats = similarity.refresh(top_k=2)
+
+        self.assertEqual(set(self.neighbors(new)), {logo.id, minimal.id})
+        self.assertIn(new.id, self.neighbors(logo))
+        self.assertEqual(self.neighbors(django), [])
+        self.assertEqual(self.neighbors(hosting), [])
+        self.assertLess(stats['refreshed'], stats['offers'])
+        self.assertEqual(
+            set(SimilarOffer.objects.filter(offer__in=[wedding, portrait]).values_list('pk', flat=True)),
+            untouched)
+
+        portrait.delete()
+        similarity.refresh(top_k=2)
+        self.assertEqual(self.neighbors(wedding), [])
+
+    def test_endpoint(self):
+        """Neighbors are read in rank order with one query."""
+        similarity.refresh(top_k=2)
+        logo, minimal = self.offers[:2]
+        url = reverse('offers-similar', args=[logo.id])
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([offer['id'] for offer in data], [minimal.id])
+        self.assertEqual(data[0]['title'], 'Minimal logo')
+        self.assertEqual(data[0]['user'], self.user.id)
+        self.assertIn('score', data[0])
+
+    def test_endpoint_errors(self):
+        """Unknown offers return 404, anonymous users 401."""
+        self.assertEqual(self.client.get(reverse('offers-similar', args=[999999])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('offers-similar', args=[self.offers[0].id])).json(), [])
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(reverse('offers-similar', args=[self.offers[0].id])).status_code, 401)
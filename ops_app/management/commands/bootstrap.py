@@ -0,0 +1,188 @@
+import hashlib
+import importlib.util
+import os
+import pkgutil
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.staticfiles.finders import get_finders
+from django.core.checks import Tags
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.recorder import MigrationRecorder
+
+FINGERPRINT_FILE = 'staticfiles.fingerprint'
+# same defaults as collectstatic
+IGNORE_PATTERNS = ['CVS', '.*', '*~']
+
+
+def migration_files():
+    """
+    List the migrations on disk without importing them.
+
+    Returns:
+        set: (app label, migration name) pairs, named like MigrationLoader does
+    """
+    found = set()
+    for app_config in apps.get_app_configs():
+        module_name, _ = MigrationLoader.migrations_module(app_config.label)
+        if module_name is None:
+            continue
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except ModuleNotFoundError:
+            continue
+        if spec is None or spec.submodule_search_locations is None:
+            continue
+        for module in pkgutil.iter_modules(spec.submodule_search_locations):
+            if not module.ispkg and module.name[0] not in '_~':
+                found.add((app_config.label, module.name))
+    return found
+
+
+def unapplied_migrations(using=DEFAULT_DB_ALIAS):
+    """
+    Compare the migrations on disk with the ones recorded as applied.
+
+    Reads the file names and the django_migrations table only, so nothing
+    is imported and no migration graph is built. A squashed migration that
+    has not been recorded yet counts as unapplied, which only costs one
+    ``migrate`` run.
+
+    Args:
+        using: Database alias
+
+    Returns:
+        list: Sorted (app label, migration name) pairs not applied yet
+    """
+    recorder = MigrationRecorder(connections[using])
+    applied = set(recorder.applied_migrations()) if recorder.has_table() else set()
+    return sorted(migration_files() - applied)
+
+
+def missing_cache_tables(using=DEFAULT_DB_ALIAS):
+    """
+    List the tables of database caches that do not exist yet.
+
+    Args:
+        using: Database alias
+
+    Returns:
+        list: Table names createcachetable would create
+    """
+    locations = [cache['LOCATION'] for cache in settings.CACHES.values()
+                 if cache['BACKEND'] == 'django.core.cache.backends.db.DatabaseCache']
+    if not locations:
+        return []
+    existing = set(connections[using].introspection.table_names())
+    return [location for location in locations if location not in existing]
+
+
+def static_fingerprint():
+    """
+    Hash the static files collectstatic would copy.
+
+    Covers the source path and content of every file found by the static
+    files finders (the first file found for a path wins, as in
+    collectstatic) and the static files storage backend.
+
+    Returns:
+        str: Hex digest
+    """
+    sources = {}
+    for finder in get_finders():
+        for path, storage in finder.list(IGNORE_PATTERNS):
+            prefixed = os.path.join(getattr(storage, 'prefix', None) or '', path)
+            sources.setdefault(prefixed, storage.path(path))
+
+    digest = hashlib.sha256(settings.STORAGES['staticfiles']['BACKEND'].encode())
+    for prefixed in sorted(sources):
+        with open(sources[prefixed], 'rb') as source:
+            content = hashlib.file_digest(source, 'sha256').digest()
+        digest.update(f'{prefixed}\0'.encode() + content)
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    """
+    Prepare the container for serving in a single process.
+
+    Replaces the separate ``migrate``, ``collectstatic --clear`` and
+    ``shell`` invocations of the entrypoint, each of which booted Django on
+    its own:
+
+        - ``migrate`` only runs if a migration file is not recorded as
+          applied, ``createcachetable`` only if the table of the database
+          cache is missing,
+        - ``collectstatic`` only runs if the fingerprint of the static
+          sources differs from the one stored in STATIC_ROOT, and without
+          ``--clear``, so unchanged files are not rewritten,
+        - a superuser is created from DJANGO_SUPERUSER_USERNAME,
+          DJANGO_SUPERUSER_EMAIL and DJANGO_SUPERUSER_PASSWORD if all are
+          set and the user does not exist yet.
+
+    Every step reports its duration.
+    """
+
+    help = 'Apply pending migrations, create the cache table, collect changed static files and create the superuser.'
+    # like collectstatic; the full checks import every view and the URLconf
+    # before the first step, which takes longer than the steps themselves
+    requires_system_checks = [Tags.staticfiles]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database to migrate and create the superuser in.')
+        parser.add_argument('--force-static', action='store_true',
+                            help='Collect static files even if the fingerprint is unchanged.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        for label, step in (('Migrations', self._migrate), ('Static files', self._collect_static),
+                            ('Superuser', self._create_superuser)):
+            step_started = time.perf_counter()
+            result = step(options)
+            self.stdout.write(f'{label}: {result} ({(time.perf_counter() - step_started) * 1000:.0f} ms)')
+        self.stdout.write(self.style.SUCCESS(
+            f'Bootstrap finished in {(time.perf_counter() - started) * 1000:.0f} ms'))
+
+    def _migrate(self, options):
+        pending = unapplied_migrations(options['database'])
+        if pending:
+            call_command('migrate', database=options['database'], interactive=False,
+                         verbosity=options['verbosity'], stdout=self.stdout)
+        result = f'{len(pending)} applied' if pending else 'up to date'
+        if missing_cache_tables(options['database']):
+            call_command('createcachetable', database=options['database'])
+            result += ', cache table created'
+        return result
+
+    def _collect_static(self, options):
+        fingerprint = static_fingerprint()
+        fingerprint_path = os.path.join(settings.STATIC_ROOT, FINGERPRINT_FILE)
+        try:
+            with open(fingerprint_path) as stored:
+                unchanged = stored.read() == fingerprint
+        except FileNotFoundError:
+            unchanged = False
+        if unchanged and not options['force_static']:
+            return 'unchanged'
+        call_command('collectstatic', interactive=False, verbosity=0)
+        with open(fingerprint_path, 'w') as stored:
+            stored.write(fingerprint)
+        return 'collected'
+
+    def _create_superuser(self, options):
+        username = os.getenv('DJANGO_SUPERUSER_USERNAME')
+        email = os.getenv('DJANGO_SUPERUSER_EMAIL')
+        password = os.getenv('DJANGO_SUPERUSER_PASSWORD')
+        if not (username and email and password):
+            return 'skipped (environment variables not set)'
+        users = get_user_model()._default_manager.db_manager(options['database'])
+        if users.filter(username=username).exists():
+            return 'already exists'
+        users.create_superuser(username=username, email=email, password=password)
+        return 'created'
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from offer_app import similarity
+
+
+class Command(BaseCommand):
+    """
+    Precompute the "similar offers" of every offer.
+
+    Builds TF-IDF vectors over the offer titles and descriptions and stores
+    the nearest offers of each offer (see offer_app.similarity). Runs after
+    the first one only recompute offers that are new, changed or affected
+    by changes, so the command can run frequently, e.g. from cron.
+    """
+
+    help = 'Build or incrementally refresh the precomputed similar offers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Recompute every offer instead of the changes since the last run.')
+        parser.add_argument('--top-k', type=int,
+                            help='Neighbors per offer (default: SIMILAR_OFFERS_TOP_K).')
+
+    def handle(self, *args, **options):
+        if similarity.numpy is None:
+            raise CommandError('NumPy is required to build similar offers.')
+        if options['top_k'] is not None and options['top_k'] < 1:
+            raise CommandError('--top-k must be at least 1.')
+        started = time.perf_counter()
+        stats = similarity.refresh(full=options['full'], top_k=options['top_k'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {stats['refreshed']} of {stats['offers']} offers "
+            f"({stats['terms']} terms): {stats['rows']} neighbors stored "
+            f"in {time.perf_counter() - started:.1f} s"))
@@ -0,0 +1,353 @@
+import random
+import time
+from array import array
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from django.utils import timezone
+
+from offer_app.cache import invalidate_tags
+from offer_app.features import feature_rows, uses_feature_table
+from offer_app.models import Offer, OfferDetail, OfferDetailFeature
+from order_app import rollups
+from order_app.models import Order
+from profile_app.models import Profile
+from review_app.models import Review
+
+FIRST_NAMES = [
+    'Anna', 'Ben', 'Clara', 'David', 'Elena', 'Felix', 'Greta', 'Hannes', 'Ida', 'Jonas',
+    'Klara', 'Lukas', 'Mia', 'Noah', 'Olivia', 'Paul', 'Rosa', 'Simon', 'Tara', 'Vincent',
+]
+LAST_NAMES = [
+    'Bauer', 'Becker', 'Fischer', 'Hoffmann', 'Klein', 'Koch', 'Meyer', 'Müller', 'Neumann',
+    'Richter', 'Schmidt', 'Schneider', 'Schulz', 'Wagner', 'Weber', 'Wolf',
+]
+CITIES = [
+    'Berlin', 'Hamburg', 'München', 'Köln', 'Frankfurt', 'Stuttgart', 'Leipzig', 'Dresden',
+    'Wien', 'Zürich',
+]
+ADJECTIVES = [
+    'Professional', 'Fast', 'Premium', 'Affordable', 'Custom', 'Modern', 'Minimalist',
+    'Creative', 'Reliable', 'Complete',
+]
+SERVICES = [
+    'Logo Design', 'Website Development', 'SEO Audit', 'Mobile App', 'Copywriting',
+    'Video Editing', 'Translation', 'Data Analysis', 'Photography', 'Social Media Management',
+    'Illustration', 'Web Shop Setup',
+]
+FEATURES = [
+    'Source files', 'Commercial use', 'Responsive design', 'Logo transparency', 'Print ready',
+    'Express delivery', 'Stock images', 'Unlimited revisions', 'Documentation', 'Support',
+]
+REVIEW_TEXTS = [
+    'Great communication and fast delivery.', 'Exactly what I needed.',
+    'Good work, a few revisions were necessary.', 'Would hire again.',
+    'Delivery took longer than expected.', 'Outstanding quality.',
+]
+TIERS = (('basic', 1), ('standard', 2), ('premium', 4))
+TIER_REVISIONS = (1, 3, -1)
+ORDER_STATUSES = ('in_progress', 'completed', 'canceled')
+ORDER_STATUS_WEIGHTS = (3, 6, 1)
+
+
+def batched(iterable, size):
+    """
+    Split an iterable into lists of at most ``size`` items.
+
+    Args:
+        iterable: Items to split
+        size: Maximum batch size
+
+    Yields:
+        list: Next batch
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+@contextmanager
+def explicit_timestamps(*model_classes):
+    """
+    Disable auto_now and auto_now_add so generated timestamps are kept.
+
+    Args:
+        *model_classes: Models whose DateTimeFields are switched off temporarily
+    """
+    saved = []
+    for model in model_classes:
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.DateTimeField):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    """
+    Generate a large, reproducible synthetic dataset for load testing.
+
+    Users with profiles (business/customer mix), offers with three detail
+    tiers, orders across all statuses and reviews are inserted with
+    bulk_create in batches inside one transaction. All values, including
+    timestamps, are drawn from a random generator seeded with ``--seed``,
+    so the same arguments on an empty database always produce the same rows.
+    """
+
+    help = 'Generate a reproducible synthetic dataset with bulk inserts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000,
+                            help='Number of users (each with a profile).')
+        parser.add_argument('--business-ratio', type=float, default=0.2,
+                            help='Share of business users.')
+        parser.add_argument('--offers-per-business', type=int, default=5,
+                            help='Average number of offers per business user.')
+        parser.add_argument('--orders-per-customer', type=int, default=3,
+                            help='Average number of orders per customer.')
+        parser.add_argument('--reviews-per-customer', type=int, default=1,
+                            help='Average number of reviews per customer.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--prefix', default='load',
+                            help='Username prefix of the generated users.')
+        parser.add_argument('--password', default='loadtest',
+                            help='Password of all generated users.')
+        parser.add_argument('--start-date', default='2024-01-01',
+                            help='First day of generated timestamps (YYYY-MM-DD).')
+        parser.add_argument('--days', type=int, default=365,
+                            help='Number of days timestamps are spread over.')
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=f"{options['prefix']}_").exists():
+            raise CommandError(
+                f"Users with prefix '{options['prefix']}_' already exist. "
+                'Use another --prefix or an empty database.')
+
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.start = timezone.make_aware(datetime.strptime(options['start_date'], '%Y-%m-%d'))
+        self.span = options['days'] * 86400
+        self.counts = {}
+        started = time.perf_counter()
+
+        with transaction.atomic(), explicit_timestamps(Profile, Offer, Order, Review):
+            businesses, customers = self._create_users()
+            details, detail_owners, detail_terms = self._create_offers(businesses)
+            self._create_orders(customers, details, detail_owners, detail_terms)
+            # bulk inserts bypass the signals maintaining the rollups
+            self.counts['order rollups'] = rollups.rebuild()
+            self._create_reviews(customers, businesses)
+        invalidate_tags('offers')
+
+        elapsed = time.perf_counter() - started
+        total = sum(self.counts.values())
+        for label, count in self.counts.items():
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s)'))
+
+    def _timestamp(self, after=None):
+        """Return a random timestamp within the configured window, optionally after another."""
+        if after is None:
+            return self.start + timedelta(seconds=self.rng.randrange(self.span))
+        remaining = max(int((self.start + timedelta(seconds=self.span) - after).total_seconds()), 1)
+        return after + timedelta(seconds=self.rng.randrange(remaining))
+
+    def _insert(self, model, rows, label):
+        """
+        Bulk insert rows in batches.
+
+        Args:
+            model: Model class
+            rows: Iterable of unsaved instances
+            label: Name used in the summary
+
+        Returns:
+            array: Primary keys of the inserted rows in insertion order
+        """
+        pks = array('q')
+        for batch in batched(rows, self.options['batch_size']):
+            model.objects.bulk_create(batch)
+            pks.extend(obj.pk for obj in batch)
+        self.counts[label] = self.counts.get(label, 0) + len(pks)
+        return pks
+
+    def _create_users(self):
+        """
+        Create users and their profiles.
+
+        Returns:
+            tuple: (business user IDs, customer user IDs)
+        """
+        options = self.options
+        password = make_password(options['password'])
+        joined = [self._timestamp() for _ in range(options['users'])]
+        is_business = [self.rng.random() < options['business_ratio'] for _ in joined]
+
+        user_ids = self._insert(User, (
+            User(username=f"{options['prefix']}_{index:07d}",
+                 email=f"{options['prefix']}_{index:07d}@example.com",
+                 password=password, date_joined=joined[index])
+            for index in range(options['users'])), 'users')
+
+        rng = self.rng
+        self._insert(Profile, (
+            Profile(
+                user_id=user_id,
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                location=rng.choice(CITIES),
+                tel=f'0{rng.randrange(10**9, 10**10)}',
+                description='Freelancer for digital services.' if business else '',
+                working_hours=f'{rng.randint(7, 10)}-{rng.randint(16, 20)}' if business else '',
+                type='business' if business else 'customer',
+                created_at=created,
+                updated_at=created,
+            )
+            for user_id, business, created in zip(user_ids, is_business, joined)), 'profiles')
+
+        businesses = array('q', (uid for uid, b in zip(user_ids, is_business) if b))
+        customers = array('q', (uid for uid, b in zip(user_ids, is_business) if not b))
+        return businesses, customers
+
+    def _create_offers(self, businesses):
+        """
+        Create offers with basic, standard and premium details.
+
+        Args:
+            businesses: Business user IDs
+
+        Returns:
+            tuple: (offer detail IDs, business user ID of each detail,
+            (prices, delivery times, features) of each detail)
+        """
+        rng = self.rng
+        average = self.options['offers_per_business']
+        owners = array('q')
+        offers = []
+        for business_id in businesses:
+            for _ in range(rng.randint(0, 2 * average)):
+                created = self._timestamp()
+                service = rng.choice(SERVICES)
+                offers.append(Offer(
+                    user_id=business_id,
+                    title=f'{rng.choice(ADJECTIVES)} {service}',
+                    description=f'{service} by an experienced freelancer in {rng.choice(CITIES)}.',
+                    created_at=created,
+                    updated_at=self._timestamp(after=created),
+                ))
+                owners.append(business_id)
+        offer_ids = self._insert(Offer, offers, 'offers')
+        del offers
+        detail_prices, detail_days, detail_features = array('q'), array('q'), []
+
+        def details():
+            for offer_id in offer_ids:
+                base_price = rng.randint(20, 500)
+                base_days = rng.randint(3, 21)
+                for position, (offer_type, factor) in enumerate(TIERS):
+                    detail_prices.append(base_price * factor)
+                    detail_days.append(max(base_days - 2 * position, 1))
+                    detail_features.append(rng.sample(FEATURES, 2 + position))
+                    yield OfferDetail(
+                        offer_id=offer_id,
+                        title=f'{offer_type.capitalize()} package',
+                        revisions=TIER_REVISIONS[position],
+                        delivery_time_in_days=detail_days[-1],
+                        price=detail_prices[-1],
+                        features=detail_features[-1],
+                        offer_type=offer_type,
+                    )
+
+        detail_ids = self._insert(OfferDetail, details(), 'offer details')
+        # bulk_create skips the signal that keeps the feature table in sync
+        if uses_feature_table():
+            self._insert(OfferDetailFeature, (
+                row for detail_id, features in zip(detail_ids, detail_features)
+                for row in feature_rows(detail_id, features)), 'offer detail features')
+        detail_owners = array('q', (owner for owner in owners for _ in TIERS))
+        return detail_ids, detail_owners, (detail_prices, detail_days, detail_features)
+
+    def _create_orders(self, customers, details, detail_owners, detail_terms):
+        """
+        Create orders of customers for random offer details.
+
+        bulk_create skips Order.save, so the offer detail terms are copied
+        onto the orders here.
+
+        Args:
+            customers: Customer user IDs
+            details: Offer detail IDs
+            detail_owners: Business user ID of each offer detail
+            detail_terms: (prices, delivery times, features) of each offer detail
+        """
+        if not details:
+            return
+        rng = self.rng
+        average = self.options['orders_per_customer']
+        prices, days, features = detail_terms
+
+        def orders():
+            for customer_id in customers:
+                for _ in range(rng.randint(0, 2 * average)):
+                    index = rng.randrange(len(details))
+                    created = self._timestamp()
+                    status = rng.choices(ORDER_STATUSES, ORDER_STATUS_WEIGHTS)[0]
+                    # details were created tier by tier for every offer
+                    position = index % len(TIERS)
+                    offer_type = TIERS[position][0]
+                    yield Order(
+                        offer_detail_id=details[index],
+                        customer_user_id=customer_id,
+                        business_user_id=detail_owners[index],
+                        status=status,
+                        title=f'{offer_type.capitalize()} package',
+                        revisions=TIER_REVISIONS[position],
+                        delivery_time_in_days=days[index],
+                        price=prices[index],
+                        features=features[index],
+                        offer_type=offer_type,
+                        created_at=created,
+                        updated_at=created if status == 'in_progress' else self._timestamp(after=created),
+                    )
+
+        self._insert(Order, orders(), 'orders')
+
+    def _create_reviews(self, customers, businesses):
+        """
+        Create at most one review per customer and business user.
+
+        Args:
+            customers: Customer user IDs
+            businesses: Business user IDs
+        """
+        if not businesses:
+            return
+        rng = self.rng
+        average = self.options['reviews_per_customer']
+
+        def reviews():
+            for customer_id in customers:
+                count = min(rng.randint(0, 2 * average), len(businesses))
+                for index in rng.sample(range(len(businesses)), count):
+                    created = self._timestamp()
+                    yield Review(
+                        reviewer_id=customer_id,
+                        business_user_id=businesses[index],
+                        rating=rng.choices((1, 2, 3, 4, 5), (1, 1, 2, 4, 6))[0],
+                        description=rng.choice(REVIEW_TEXTS),
+                        created_at=created,
+                        updated_at=created,
+                    )
+
+        self._insert(Review, reviews(), 'reviews')
@@ -0,0 +1,85 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import profiling
+
+
+class Command(BaseCommand):
+    """
+    List and export request profiles recorded by the profiling middleware.
+
+    Without arguments the stored profiles are listed, newest first. With a
+    profile ID the call tree and the SQL breakdown are printed, or the
+    profile is exported as JSON (``--output``) or as folded stacks for
+    flamegraph tools (``--folded``).
+    """
+
+    help = 'List recorded request profiles or show/export one of them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('profile_id', nargs='?', help='Profile to show or export.')
+        parser.add_argument('--limit', type=int, default=20,
+                            help='Number of profiles to list.')
+        parser.add_argument('--min-percent', type=float, default=1.0,
+                            help='Hide call tree nodes below this share of samples.')
+        parser.add_argument('--folded', action='store_true',
+                            help='Print folded stacks instead of the call tree.')
+        parser.add_argument('--output', help='Write the raw profile JSON to this file.')
+
+    def handle(self, *args, **options):
+        if not options['profile_id']:
+            self._list(options['limit'])
+            return
+        try:
+            data = profiling.load(options['profile_id'])
+        except FileNotFoundError:
+            raise CommandError(f"Profile '{options['profile_id']}' not found.")
+
+        if options['output']:
+            path = Path(options['output'])
+            path.write_text(json.dumps(data, indent=2), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f'Written to {path}'))
+        elif options['folded']:
+            for line in profiling.folded_stacks(data['call_tree']):
+                self.stdout.write(line)
+        else:
+            self._show(data, options['min_percent'])
+
+    def _list(self, limit):
+        ids = profiling.list_profiles()
+        if not ids:
+            self.stdout.write('No profiles recorded.')
+            return
+        for profile_id in ids[:limit]:
+            try:
+                data = profiling.load(profile_id)
+            except (FileNotFoundError, ValueError):
+                continue
+            self.stdout.write(
+                f"{profile_id}  {data['created_at'][:19]}  {data['method']} {data['path']}  "
+                f"{data['status']}  {data['duration_ms']:.1f} ms  "
+                f"{sum(query['count'] for query in data['sql'])} queries")
+
+    def _show(self, data, min_percent):
+        self.stdout.write(
+            f"{data['method']} {data['path']} ({data['route']}) -> {data['status']} "
+            f"in {data['duration_ms']:.1f} ms, {data['samples']} samples "
+            f"every {data['interval_ms']:g} ms")
+        tree = data['call_tree']
+        total = tree['samples'] or 1
+
+        def walk(node, depth):
+            for child in node['children']:
+                share = 100 * child['samples'] / total
+                if share < min_percent:
+                    continue
+                self.stdout.write(f"{'  ' * depth}{share:5.1f}%  {child['name']}")
+                walk(child, depth + 1)
+
+        self.stdout.write('\nCall tree:')
+        walk(tree, 0)
+        self.stdout.write(f"\nSQL ({data['sql_total_ms']:.1f} ms):")
+        for query in data['sql']:
+            self.stdout.write(f"{query['total_ms']:9.2f} ms  {query['count']:4}x  {query['sql']}")
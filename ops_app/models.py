@@ -0,0 +1,44 @@
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class IdempotencyRecord(models.Model):
+    """
+    Stored response of a POST sent with an Idempotency-Key.
+
+    One row per (user, path, key). The row is inserted before the first
+    request runs, with ``status_code`` null until its response is stored,
+    so the unique constraint is the lock duplicates wait on in every
+    gunicorn worker (see core.idempotency).
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='idempotency_records')
+    path = models.CharField(max_length=255)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    data = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    headers = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Idempotency Record'
+        verbose_name_plural = 'Idempotency Records'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'path', 'key'], name='idempotencyrecord_user_path_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at'], name='idempotencyrecord_created_idx'),
+        ]
+
+    def __str__(self):
+        """
+        Return string representation of the record.
+
+        Returns:
+            str: Path and key
+        """
+        return f'{self.path} {self.key}'
@@ -0,0 +1,84 @@
+"""
+Tests for the container bootstrap command.
+"""
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.recorder import MigrationRecorder
+from django.test import TestCase, override_settings
+
+from ops_app.management.commands import bootstrap
+
+SUPERUSER_ENV = {
+    'DJANGO_SUPERUSER_USERNAME': 'admin',
+    'DJANGO_SUPERUSER_EMAIL': 'admin@example.com',
+    'DJANGO_SUPERUSER_PASSWORD': 'testpass123',
+}
+
+
+class BootstrapTests(TestCase):
+    """Each step only does work when something changed."""
+
+    def setUp(self):
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+        self.static_root = static_root.name
+        settings_override = override_settings(STATIC_ROOT=self.static_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def run_bootstrap(self, *args):
+        out = io.StringIO()
+        call_command('bootstrap', *args, stdout=out)
+        return out.getvalue()
+
+    def test_skips_unchanged_steps(self):
+        """A second run applies, collects and creates nothing."""
+        with mock.patch.dict(os.environ, SUPERUSER_ENV):
+            output = self.run_bootstrap()
+            self.assertIn('Migrations: up to date', output)
+            self.assertIn('Static files: collected', output)
+            self.assertIn('Superuser: created', output)
+            self.assertTrue(os.path.exists(os.path.join(self.static_root, 'admin', 'css', 'base.css')))
+
+            with mock.patch.object(bootstrap, 'call_command') as nested_command:
+                output = self.run_bootstrap()
+            nested_command.assert_not_called()
+            self.assertIn('Static files: unchanged', output)
+            self.assertIn('Superuser: already exists', output)
+        self.assertTrue(User.objects.get(username='admin').is_superuser)
+
+    def test_static_sources_change_the_fingerprint(self):
+        """Changed static sources and --force-static collect again."""
+        self.run_bootstrap()
+        fingerprint = bootstrap.static_fingerprint()
+        with tempfile.TemporaryDirectory() as extra:
+            with open(os.path.join(extra, 'app.css'), 'w') as source:
+                source.write('body { margin: 0; }')
+            with override_settings(STATICFILES_DIRS=[extra]):
+                self.assertNotEqual(bootstrap.static_fingerprint(), fingerprint)
+                self.assertIn('Static files: collected', self.run_bootstrap())
+                self.assertIn('Static files: unchanged', self.run_bootstrap())
+        self.assertIn('Static files: collected', self.run_bootstrap('--force-static'))
+
+    def test_unapplied_migrations(self):
+        """Migrations on disk without a django_migrations row are pending."""
+        self.assertEqual(bootstrap.unapplied_migrations(), [])
+        MigrationRecorder.Migration.objects.filter(app='order_app', name='0003_order_snapshot').delete()
+        self.assertEqual(bootstrap.unapplied_migrations(), [('order_app', '0003_order_snapshot')])
+        with mock.patch.object(bootstrap, 'call_command') as nested_command:
+            self.assertIn('Migrations: 1 applied', self.run_bootstrap())
+        self.assertEqual(nested_command.call_args_list[0].args, ('migrate',))
+
+    def test_missing_cache_table_is_created(self):
+        """The database cache table is created when it does not exist."""
+        self.assertEqual(bootstrap.missing_cache_tables(), [])
+        with mock.patch.object(connection.introspection, 'table_names', return_value=[]), \
+                mock.patch.object(bootstrap, 'call_command') as nested_command:
+            self.assertIn('cache table created', self.run_bootstrap())
+        self.assertIn(mock.call('createcachetable', database='default'), nested_command.call_args_list)
@@ -0,0 +1,115 @@
+"""
+Tests for the synthetic dataset generator command.
+"""
+import io
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import F
+from django.test import TestCase
+
+from offer_app.models import Offer, OfferDetail
+from order_app.models import Order
+from profile_app.models import Profile
+from review_app.models import Review
+
+
+def generate(**options):
+    """Run the command with a small default size."""
+    options.setdefault('users', 60)
+    call_command('generate_dataset', stdout=io.StringIO(), **options)
+
+
+def snapshot():
+    """Return the generated rows without database IDs."""
+    return {
+        'profiles': sorted(Profile.objects.values_list(
+            'user__username', 'first_name', 'type', 'created_at')),
+        'offers': sorted(Offer.objects.values_list('user__username', 'title', 'created_at')),
+        'details': sorted(OfferDetail.objects.values_list(
+            'offer__user__username', 'offer__created_at', 'offer_type', 'price')),
+        'orders': sorted(Order.objects.values_list(
+            'customer_user__username', 'business_user__username', 'status', 'created_at')),
+        'reviews': sorted(Review.objects.values_list(
+            'reviewer__username', 'business_user__username', 'rating', 'created_at')),
+    }
+
+
+class GenerateDatasetTests(TestCase):
+    """Tests for generate_dataset."""
+
+    def test_generates_consistent_related_rows(self):
+        """Every user has a profile, offers have three tiers and orders match their detail."""
+        generate()
+
+        self.assertEqual(User.objects.count(), 60)
+        self.assertEqual(Profile.objects.count(), 60)
+        self.assertGreater(Offer.objects.count(), 0)
+        tiers = Counter(OfferDetail.objects.values_list('offer_id', flat=True))
+        self.assertEqual(set(tiers.values()), {3})
+        self.assertGreater(Order.objects.count(), 0)
+        self.assertFalse(Order.objects.exclude(
+            business_user_id=F('offer_detail__offer__user_id')).exists())
+        for field in Order.snapshot_fields:
+            self.assertFalse(Order.objects.exclude(**{field: F(f'offer_detail__{field}')}).exists())
+        self.assertFalse(Offer.objects.exclude(user__profile__type='business').exists())
+        self.assertFalse(Order.objects.exclude(customer_user__profile__type='customer').exists())
+
+    def test_orders_cover_all_statuses(self):
+        """Orders are spread across in_progress, completed and canceled."""
+        generate(users=200)
+
+        statuses = set(Order.objects.values_list('status', flat=True))
+        self.assertEqual(statuses, {'in_progress', 'completed', 'canceled'})
+
+    def test_reviews_are_unique_per_customer_and_business(self):
+        """No customer reviews the same business user twice."""
+        generate(reviews_per_customer=3)
+
+        pairs = list(Review.objects.values_list('reviewer_id', 'business_user_id'))
+        self.assertEqual(len(pairs), len(set(pairs)))
+
+    def test_same_seed_reproduces_the_dataset(self):
+        """Running twice with the same seed yields identical rows."""
+        generate(seed=7)
+        first = snapshot()
+        User.objects.filter(username__startswith='load_').delete()
+
+        generate(seed=7)
+        self.assertEqual(snapshot(), first)
+
+    def test_different_seed_changes_the_dataset(self):
+        """Another seed yields different rows."""
+        generate(seed=1)
+        first = snapshot()
+        User.objects.filter(username__startswith='load_').delete()
+
+        generate(seed=2)
+        self.assertNotEqual(snapshot(), first)
+
+    def test_generated_timestamps_are_kept(self):
+        """Timestamps lie in the requested window and auto_now is restored afterwards."""
+        generate(start_date='2023-03-01', days=10)
+
+        years = set(Offer.objects.values_list('created_at__year', flat=True))
+        self.assertEqual(years, {2023})
+        profile = Profile.objects.first()
+        profile.save()
+        profile.refresh_from_db()
+        self.assertGreater(profile.updated_at.year, 2023)
+
+    def test_generated_users_can_log_in(self):
+        """Generated users share the configured password."""
+        generate(users=5, password='secret-pass')
+
+        user = User.objects.get(username='load_0000000')
+        self.assertTrue(user.check_password('secret-pass'))
+
+    def test_existing_prefix_is_rejected(self):
+        """A second run with the same prefix fails instead of colliding."""
+        generate(users=5)
+
+        with self.assertRaises(CommandError):
+            generate(users=5)
@@ -1,15 +1,20 @@
 from django.contrib import admin
 
+from core.admin import LargeTableAdmin
+
 from .models import Order
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin):
     """Admin configuration for Order model."""
     
     list_display = ['id', 'customer_user', 'business_user', 'status', 'created_at']
     list_filter = ['status', 'created_at']
-    search_fields = ['customer_user__username', 'business_user__username']
+    list_select_related = ['customer_user', 'business_user']
+    search_fields = ['id', 'customer_user__username', 'business_user__username']
+    search_help_text = 'Order ID or exact username of the customer or business user'
+    raw_id_fields = ['offer_detail', 'customer_user', 'business_user']
     readonly_fields = ['created_at', 'updated_at']
 
 # Register your models here.
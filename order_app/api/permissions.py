@@ -1,7 +1,32 @@
-from django.contrib.auth.models import User
-from rest_framework.exceptions import NotFound
 from rest_framework.permissions import BasePermission
 
+from profile_app.models import Profile
+
+
+def _profile_type(request, view):
+    """
+    Return the profile type of the requesting user.
+
+    On order detail actions the view has already loaded the order with both
+    users and their profiles, so the requesting user's profile is taken
+    from there when the user is involved in the order.
+
+    Args:
+        request: HTTP request
+        view: View being accessed
+
+    Returns:
+        str: Profile type or None if the user has no profile
+    """
+    order = getattr(view, 'order', None)
+    if order is not None:
+        for user in (order.business_user, order.customer_user):
+            if user.pk == request.user.pk:
+                profile = getattr(user, 'profile', None)
+                return getattr(profile, 'type', None)
+    return Profile.objects.filter(user_id=request.user.pk).values_list('type', flat=True).first()
+
+
 class IsBusiness(BasePermission):
     """
     Custom permission to only allow business users to update orders.
@@ -18,9 +43,8 @@ class IsBusiness(BasePermission):
         Returns:
             bool: True if user is authenticated business user
         """
-        user = User.objects.get(pk=request.user.pk)
-        return request.user.is_authenticated and getattr(user.profile, 'type', None) == 'business'
-    
+        return request.user.is_authenticated and _profile_type(request, view) == 'business'
+
     def has_object_permission(self, request, view, obj):
         """
         Check if user is the business user associated with the order.
@@ -33,7 +57,7 @@ class IsBusiness(BasePermission):
         Returns:
             bool: True if user is the business user of the order
         """
-        return obj.business_user == request.user
+        return obj.business_user_id == request.user.pk
 
 class IsCustomer(BasePermission):
     """
@@ -51,6 +75,4 @@ class IsCustomer(BasePermission):
         Returns:
             bool: True if user is authenticated customer user
         """
-        user = User.objects.get(pk=request.user.pk)
-        return request.user.is_authenticated and getattr(user.profile, 'type', None) == 'customer'
-
+        return request.user.is_authenticated and _profile_type(request, view) == 'customer'
@@ -1,9 +1,14 @@
+from datetime import timedelta
+
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import NotFound
 from rest_framework.reverse import reverse
 
 from offer_app.models import OfferDetail
+from order_app import rollups
 from order_app.models import Order
 
 
@@ -12,24 +17,14 @@ class OrderSerializer(serializers.ModelSerializer):
     Serializer for order model.
 
     Handles order creation and status updates with field validation.
-    Includes nested offer detail information in read operations.
+    Includes the offer detail terms copied onto the order at creation.
     Validates allowed fields based on request method and action.
     """
 
-    offer_detail_id = serializers.IntegerField(source='offer_detail.id', required=False)
-
-    title = serializers.CharField(source='offer_detail.title', read_only=True)
-    revisions = serializers.IntegerField(
-        source='offer_detail.revisions', read_only=True)
-    delivery_time_in_days = serializers.IntegerField(
-        source='offer_detail.delivery_time_in_days', read_only=True)
-    price = serializers.IntegerField(
-        source='offer_detail.price', read_only=True)
-    features = serializers.ListField(
-        child=serializers.CharField(), source='offer_detail.features', read_only=True)
-    offer_type = serializers.CharField(
-        source='offer_detail.offer_type', read_only=True)
-    
+    offer_detail_id = serializers.IntegerField(required=False)
+
+    features = serializers.ListField(child=serializers.CharField(), read_only=True)
+
     status = serializers.CharField(required=False)
     
     class Meta:
@@ -49,7 +44,7 @@ class OrderSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at'
         ]
-        read_only_fields = ['id', 'customer_user', 'business_user', 'created_at', 'updated_at', 'tite',
+        read_only_fields = ['id', 'customer_user', 'business_user', 'created_at', 'updated_at', 'title',
                             'revisions', 'delivery_time_in_days', 'price', 'features', 'offer_type']
 
     def _get_allowed_fields(self, method, action):
@@ -65,7 +60,7 @@ class OrderSerializer(serializers.ModelSerializer):
         """
         if method == 'POST' and action == 'create':
             return {'offer_detail_id'}, {'offer_detail_id'}
-        elif method == 'PATCH' and action == 'partial_update':
+        elif method in ('PUT', 'PATCH') and action in ('update', 'partial_update'):
             return {'status'}, {'status'}
         return None, None
 
@@ -136,7 +131,7 @@ class OrderSerializer(serializers.ModelSerializer):
         Create a new order.
 
         Retrieves offer detail, sets business and customer users,
-        and creates the order instance.
+        copies the offer detail terms and creates the order instance.
 
         Args:
             validated_data: Dictionary of validated order data
@@ -151,14 +146,15 @@ class OrderSerializer(serializers.ModelSerializer):
         offer_detail_id = self.initial_data.get('offer_detail_id')
         
         try:
-            offer_detail = OfferDetail.objects.get(id=offer_detail_id)
+            offer_detail = OfferDetail.objects.select_related('offer').get(id=offer_detail_id)
         except OfferDetail.DoesNotExist:
             raise NotFound(detail="Offer detail with the given ID does not exist.")
         
-        validated_data['offer_detail'] = offer_detail
-        validated_data['business_user'] = offer_detail.offer.user
-        validated_data['customer_user'] = request.user
-        order = Order.objects.create(**validated_data)
+        validated_data.pop('offer_detail_id', None)
+        order = Order(offer_detail=offer_detail, business_user_id=offer_detail.offer.user_id,
+                      customer_user=request.user, **validated_data)
+        order.copy_offer_detail(offer_detail)
+        order.save()
         return order
 
     def to_representation(self, instance):
@@ -182,11 +178,105 @@ class OrderSerializer(serializers.ModelSerializer):
         action = getattr(view, 'action', None) if view else None
         data.pop('offer_detail_id', None)
 
-        if request and request.method == 'POST' and action == 'create':
+        if request and request.method == 'POST' and action in ('create', 'checkout'):
             data.pop('updated_at', None)
 
             return data
 
         return data
 
-     
\ No newline at end of file
+
+class OrderCheckoutSerializer(serializers.Serializer):
+    """
+    Serializer for creating several orders in one request.
+
+    All requested offer details are loaded with their offers in one joined
+    query and validated together; the orders are inserted with a single
+    bulk_create inside one transaction, so either all or none are created.
+    The same offer detail may appear several times to order it repeatedly.
+    """
+
+    MAX_ITEMS = 50
+
+    offer_detail_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), min_length=1, max_length=MAX_ITEMS)
+
+    def validate_offer_detail_ids(self, value):
+        """
+        Resolve all offer details at once.
+
+        Args:
+            value: Requested offer detail IDs
+
+        Returns:
+            list: OfferDetail instances in request order
+
+        Raises:
+            NotFound: If any of the offer details doesn't exist
+        """
+        details = OfferDetail.objects.select_related('offer').in_bulk(set(value))
+        missing = sorted(set(value) - set(details))
+        if missing:
+            raise NotFound(
+                detail=f"Offer details with the given IDs do not exist: {', '.join(map(str, missing))}.")
+        return [details[pk] for pk in value]
+
+    def create(self, validated_data):
+        """
+        Create one order per requested offer detail.
+
+        Args:
+            validated_data: Dictionary with resolved offer details
+
+        Returns:
+            list: Created Order instances
+        """
+        customer = self.context['request'].user
+        orders = []
+        for detail in validated_data['offer_detail_ids']:
+            order = Order(offer_detail=detail, business_user_id=detail.offer.user_id, customer_user=customer)
+            order.copy_offer_detail(detail)
+            orders.append(order)
+        with transaction.atomic():
+            orders = Order.objects.bulk_create(orders)
+            # bulk_create sends no post_save signals
+            rollups.record_created(orders)
+        return orders
+
+
+
+class OrderAnalyticsQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of the order analytics.
+
+    Without dates the last ``DEFAULT_DAYS`` days up to today are returned.
+    Ranges are limited to ``MAX_DAYS`` days.
+    """
+
+    DEFAULT_DAYS = 30
+    MAX_DAYS = 3660
+
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    interval = serializers.ChoiceField(choices=list(rollups.INTERVALS), default='day')
+
+    def validate(self, attrs):
+        """
+        Fill in missing dates and check the range.
+
+        Args:
+            attrs: Dictionary of validated parameters
+
+        Returns:
+            dict: Parameters with ``start`` and ``end`` set
+
+        Raises:
+            ValidationError: If start is after end or the range is too long
+        """
+        end = attrs.setdefault('end', timezone.localdate())
+        start = attrs.setdefault('start', end - timedelta(days=self.DEFAULT_DAYS - 1))
+        if start > end:
+            raise serializers.ValidationError({'start': 'Must not be after end.'})
+        if (end - start).days >= self.MAX_DAYS:
+            raise serializers.ValidationError({'start': f'Ranges are limited to {self.MAX_DAYS} days.'})
+        return attrs
@@ -1,40 +1,82 @@
 from django.contrib.auth.models import User
 from django.db.models import Q
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from rest_framework import status, views, viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
+from core.async_views import AsyncAPIView
+from core.conditional import ConditionalGetMixin, object_validators
+from core.idempotency import IdempotentCreateMixin, run_once
+from .. import rollups
 from ..models import Order
 from .permissions import IsBusiness, IsCustomer
-from .serializers import OrderSerializer
+from .serializers import OrderAnalyticsQuerySerializer, OrderCheckoutSerializer, OrderSerializer
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(IdempotentCreateMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing orders.
 
     Provides CRUD operations with role-based permissions.
     Customers can create orders, business users can update status, admins can delete.
+    List and retrieve support conditional GET via ETag / Last-Modified.
+    Create and checkout honour the Idempotency-Key header.
+    The analytics action summarizes a business user's orders over time.
     """
 
     permission_classes = [IsAuthenticated]
     serializer_class = OrderSerializer
     queryset = None
 
+    detail_actions = ('retrieve', 'update', 'partial_update', 'destroy')
+
     def initial(self, request, *args, **kwargs):
         """
-        Runs before any action - checks if order exists before permission check.
-        
+        Runs before any action - loads the order before the permission check.
+
+        The order is fetched once with both users (including their
+        profiles) joined. get_object, the conditional GET
+        validators and the permission classes reuse it instead of querying
+        again.
+
         Raises:
             Http404: If order doesn't exist (before permission check)
         """
-        if self.action in ['retrieve', 'update', 'partial_update', 'destroy']:
+        self.order = None
+        if self.action in self.detail_actions:
             pk = self.kwargs.get('pk')
             if pk:
-                get_object_or_404(Order, pk=pk)
+                self.order = get_object_or_404(
+                    Order.objects.select_related('business_user__profile', 'customer_user__profile'),
+                    pk=pk)
         super().initial(request, *args, **kwargs)
 
+    def get_object(self):
+        """
+        Return the order loaded in initial and check object permissions.
+
+        Returns:
+            Order: Requested order
+        """
+        if self.order is None:
+            return super().get_object()
+        self.check_object_permissions(self.request, self.order)
+        return self.order
+
+    def get_object_validators(self):
+        """
+        Compute conditional GET validators from the already loaded order.
+
+        Returns:
+            tuple: (ETag, Last-Modified timestamp)
+        """
+        if self.order is None:
+            return super().get_object_validators()
+        return object_validators((self.order.pk, self.order.updated_at))
+
     def get_permissions(self):
         """
         Get permission classes based on action.
@@ -42,9 +84,9 @@ class OrderViewSet(viewsets.ModelViewSet):
         Returns:
             list: Permission instances for the current action
         """
-        if self.action == 'create':
+        if self.action in ['create', 'checkout']:
             self.permission_classes = [IsAuthenticated, IsCustomer]
-        elif self.action in ['update', 'partial_update',]:
+        elif self.action in ['update', 'partial_update', 'analytics']:
             self.permission_classes = [IsAuthenticated, IsBusiness]
         elif self.action == 'destroy':
             self.permission_classes = [IsAdminUser]
@@ -52,6 +94,112 @@ class OrderViewSet(viewsets.ModelViewSet):
             self.permission_classes = [IsAuthenticated]
         return super().get_permissions()
 
+    def update(self, request, *args, **kwargs):
+        """
+        Change the order status; PUT takes the same path as PATCH.
+
+        ``status`` is the only writable field, so a full update is a status
+        transition and must not save the order through the serializer.
+
+        Args:
+            request: HTTP request with the new status
+            *args: Variable length argument list
+            **kwargs: Arbitrary keyword arguments
+
+        Returns:
+            Response: See partial_update
+        """
+        return self.partial_update(request, *args, **kwargs)
+
+    def partial_update(self, request, *args, **kwargs):
+        """
+        Change the order status with a compare-and-set UPDATE.
+
+        Args:
+            request: HTTP request with the new status
+            *args: Variable length argument list
+            **kwargs: Arbitrary keyword arguments
+
+        Returns:
+            Response: Updated order, or 409 if the transition is not allowed
+            from the current status or the status was changed concurrently
+        """
+        order = self.get_object()
+        serializer = self.get_serializer(order, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        new_status = serializer.validated_data['status']
+
+        if not order.can_transition_to(new_status):
+            return Response(
+                {'detail': f"Cannot change status from '{order.status}' to '{new_status}'."},
+                status=status.HTTP_409_CONFLICT)
+        if not order.transition_to(new_status):
+            return Response(
+                {'detail': 'The order status was changed by another request.'},
+                status=status.HTTP_409_CONFLICT)
+        return Response(self.get_serializer(order).data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def checkout(self, request):
+        """
+        Create orders for several offer details at once.
+
+        Args:
+            request: HTTP request with ``offer_detail_ids``
+
+        Returns:
+            Response: List of created orders
+        """
+        return run_once(request, lambda: self._checkout(request))
+
+    def _checkout(self, request):
+        serializer = OrderCheckoutSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+        orders = serializer.save()
+        return Response(OrderSerializer(orders, many=True, context=self.get_serializer_context()).data,
+                        status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        """
+        Summarize the requesting business user's orders per period.
+
+        Read from the daily rollups, so the cost grows with the number of
+        days in the range, not with the number of orders. Orders count on
+        the day they were created, with the price they were ordered at.
+
+        Args:
+            request: HTTP request with optional ``start``, ``end`` and
+                ``interval`` (day, week or month)
+
+        Returns:
+            Response: Series per period, offer type and status with totals;
+            the total revenue counts completed orders only
+        """
+        params = OrderAnalyticsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start, end, interval = (params.validated_data[key] for key in ('start', 'end', 'interval'))
+        rows = rollups.series(request.user.pk, start, end, interval)
+
+        by_status, by_offer_type = {}, {}
+        for row in rows:
+            for totals, key in ((by_status, row['status']), (by_offer_type, row['offer_type'])):
+                entry = totals.setdefault(key, {'order_count': 0, 'revenue': 0})
+                entry['order_count'] += row['order_count']
+                entry['revenue'] += row['revenue']
+        return Response({
+            'start': start,
+            'end': end,
+            'interval': interval,
+            'totals': {
+                'order_count': sum(entry['order_count'] for entry in by_status.values()),
+                'revenue': by_status.get('completed', {}).get('revenue', 0),
+                'by_status': by_status,
+                'by_offer_type': by_offer_type,
+            },
+            'series': rows,
+        })
+
     def get_queryset(self):
         """
         Get filtered queryset based on action and user.
@@ -68,8 +216,28 @@ class OrderViewSet(viewsets.ModelViewSet):
             )
         else:
             return Order.objects.all()
-        
-class CountOrdersView(views.APIView):
+
+
+async def _aget_business_user(pk):
+    """
+    Load a user together with its profile using the async ORM.
+
+    Args:
+        pk: User ID
+
+    Returns:
+        User: User instance with profile joined
+
+    Raises:
+        Http404: If user doesn't exist
+    """
+    try:
+        return await User.objects.select_related('profile').aget(pk=pk)
+    except User.DoesNotExist:
+        raise Http404('No User matches the given query.')
+
+
+class CountOrdersView(AsyncAPIView):
     """
     API view to count in-progress orders for a business user.
 
@@ -78,7 +246,7 @@ class CountOrdersView(views.APIView):
 
     permission_classes = [IsAuthenticated]
     
-    def get(self, request, pk):
+    async def get(self, request, pk):
         """
         Get count of in-progress orders for a business user.
 
@@ -92,17 +260,17 @@ class CountOrdersView(views.APIView):
         Raises:
             Http404: If user doesn't exist or is not a business user
         """
-        user = get_object_or_404(User, pk=pk)
+        user = await _aget_business_user(pk)
 
         if user.profile.type != 'business':
             return Response({'detail': 'User is not a business user.'}, status=status.HTTP_404_NOT_FOUND)
 
-        count = Order.objects.filter(business_user=user, status = 'in_progress').count()
+        count = await Order.objects.filter(business_user=user, status='in_progress').acount()
         return Response({'order_count': count}, status=status.HTTP_200_OK)
 
 
 
-class CompletedOrdersCountView(views.APIView):
+class CompletedOrdersCountView(AsyncAPIView):
     """
     API view to count completed orders for a business user.
 
@@ -111,7 +279,7 @@ class CompletedOrdersCountView(views.APIView):
 
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, pk):
+    async def get(self, request, pk):
         """
         Get count of completed orders for a business user.
 
@@ -125,10 +293,10 @@ class CompletedOrdersCountView(views.APIView):
         Raises:
             Http404: If user doesn't exist or is not a business user
         """
-        user = get_object_or_404(User, pk=pk)
+        user = await _aget_business_user(pk)
 
         if user.profile.type != 'business':
             return Response({'detail': 'User is not a business user.'}, status=status.HTTP_404_NOT_FOUND)
 
-        count = Order.objects.filter(business_user=user, status = 'completed').count()
+        count = await Order.objects.filter(business_user=user, status='completed').acount()
         return Response({'completed_order_count': count}, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -5,3 +5,7 @@ class OrderAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'order_app'
     verbose_name = 'Orders'
+
+    def ready(self):
+        """Connect signal handlers keeping the daily order rollups up to date."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order_app', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='order',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Order', 'verbose_name_plural': 'Orders'},
+        ),
+        migrations.CreateModel(
+            name='OrderDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('offer_type', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('order_count', models.IntegerField(default=0)),
+                ('revenue', models.BigIntegerField(default=0)),
+                ('business_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Order Daily Rollup',
+                'verbose_name_plural': 'Order Daily Rollups',
+                'ordering': ['business_user', 'day'],
+                'constraints': [models.UniqueConstraint(fields=('business_user', 'day', 'offer_type', 'status'), name='orderdailyrollup_key_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.7 on 2026-10-19 05:05
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+SNAPSHOT_FIELDS = ('title', 'revisions', 'delivery_time_in_days', 'price', 'features', 'offer_type')
+
+
+def copy_offer_details(apps, schema_editor):
+    """Copy the terms of each order's offer detail onto the order in one UPDATE."""
+    Order = apps.get_model('order_app', 'Order')
+    OfferDetail = apps.get_model('offer_app', 'OfferDetail')
+    details = OfferDetail.objects.filter(pk=OuterRef('offer_detail_id'))
+    Order.objects.using(schema_editor.connection.alias).update(**{
+        field: Subquery(details.values(field)[:1]) for field in SNAPSHOT_FIELDS
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offer_app', '0009_similar_offers'),
+        ('order_app', '0002_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='title',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='revisions',
+            field=models.IntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='delivery_time_in_days',
+            field=models.IntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='price',
+            field=models.PositiveIntegerField(default=0),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='features',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='offer_type',
+            field=models.CharField(choices=[('basic', 'basic'), ('standard', 'standard'), ('premium', 'premium')], default='', max_length=20),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_offer_details, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.utils import timezone
 from offer_app.models import OfferDetail
 
 
@@ -9,6 +10,10 @@ class Order(models.Model):
 
     Links a customer to a business user through an offer detail.
     Tracks order status (in_progress, completed, canceled).
+    Title, revisions, delivery time, price, features and offer type are
+    copied from the offer detail when the order is created, so orders
+    render without the offer detail and keep their terms when the offer
+    is edited later.
     """
 
     offer_detail = models.ForeignKey(
@@ -24,8 +29,22 @@ class Order(models.Model):
         ('canceled', 'canceled'),
     ]
 
+    # current status -> statuses it may move to
+    allowed_transitions = {
+        'in_progress': ('completed', 'canceled'),
+    }
+
+    # offer detail fields copied by copy_offer_detail
+    snapshot_fields = ('title', 'revisions', 'delivery_time_in_days', 'price', 'features', 'offer_type')
+
     status = models.CharField(
         max_length=20, choices=status_choices, default='in_progress')
+    title = models.CharField(max_length=255)
+    revisions = models.IntegerField()
+    delivery_time_in_days = models.IntegerField()
+    price = models.PositiveIntegerField()
+    features = models.JSONField(default=list)
+    offer_type = models.CharField(max_length=20, choices=OfferDetail.OFFER_TYPE_CHOICES)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -33,3 +52,103 @@ class Order(models.Model):
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
         ordering = ['-created_at']
+
+    def copy_offer_detail(self, offer_detail=None):
+        """
+        Copy the terms of the offer detail onto the order.
+
+        Args:
+            offer_detail: Offer detail to copy, defaults to the order's one
+        """
+        offer_detail = offer_detail or self.offer_detail
+        for field in self.snapshot_fields:
+            setattr(self, field, getattr(offer_detail, field))
+
+    def save(self, *args, **kwargs):
+        """
+        Save the order, copying the offer detail terms into new orders.
+
+        Orders created through the API are copied explicitly; this covers
+        orders created elsewhere (admin, shell, tests).
+        """
+        if self._state.adding and not self.offer_type:
+            self.copy_offer_detail()
+        super().save(*args, **kwargs)
+
+    def can_transition_to(self, new_status):
+        """
+        Check the transition table for the current status.
+
+        Args:
+            new_status: Target status
+
+        Returns:
+            bool: True if the order may move from its status to new_status
+        """
+        return new_status in self.allowed_transitions.get(self.status, ())
+
+    def transition_to(self, new_status):
+        """
+        Move the order to a new status with a single conditional UPDATE.
+
+        The row is only updated if its stored status still equals the
+        status this instance was loaded with, so of several concurrent
+        transitions exactly one wins. Only ``status`` and ``updated_at``
+        are written; the daily rollups are updated once the change is
+        committed, so the row lock is never held longer than the UPDATE.
+
+        Args:
+            new_status: Target status
+
+        Returns:
+            bool: True if the row was updated, False if its status changed meanwhile
+        """
+        from . import rollups
+
+        now = timezone.now()
+        before = rollups.contribution(self)
+        updated = Order.objects.filter(pk=self.pk, status=self.status).update(
+            status=new_status, updated_at=now)
+        if updated:
+            self.status = new_status
+            self.updated_at = now
+            transaction.on_commit(lambda: rollups.record_change(before, self))
+        return bool(updated)
+
+
+class OrderDailyRollup(models.Model):
+    """
+    Number and value of a business user's orders per day, tier and status.
+
+    One row per (business user, day of order creation, offer type,
+    status). Rows are kept up to date with every order change (see
+    order_app.rollups) and rebuilt from the orders by the
+    ``backfill_order_rollups`` command, so analytics read one row per
+    day instead of every order.
+    """
+
+    business_user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='order_rollups')
+    day = models.DateField()
+    offer_type = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    order_count = models.IntegerField(default=0)
+    revenue = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Order Daily Rollup'
+        verbose_name_plural = 'Order Daily Rollups'
+        ordering = ['business_user', 'day']
+        constraints = [
+            models.UniqueConstraint(fields=['business_user', 'day', 'offer_type', 'status'],
+                                    name='orderdailyrollup_key_uniq'),
+        ]
+
+    def __str__(self):
+        """
+        Return string representation of the rollup row.
+
+        Returns:
+            str: Business user ID, day, offer type and status with the count
+        """
+        return f"{self.business_user_id} {self.day} {self.offer_type}/{self.status}: {self.order_count}"
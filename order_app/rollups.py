@@ -0,0 +1,209 @@
+"""
+Daily order rollups per business user, offer type and status.
+
+Every order counts once, with the price copied onto it at creation, in the
+row of its business user, the day it was created (in the current time
+zone), its offer type and its status. The rows are updated in the same
+transaction as the order, except for status transitions, which update them
+right after their single-statement commit:
+
+    - created orders (``Order.objects.create`` through the post_save
+      signal, checkout through ``record_created``) add to their row,
+    - status transitions (``Order.transition_to``) and other saves move
+      the order from its old row to its new one,
+    - deleted orders are subtracted from their row.
+
+Additions are a single upsert (``INSERT ... ON CONFLICT DO UPDATE``) per
+row, subtractions a plain ``UPDATE``, so a cascade deleting a business user
+never recreates the rows deleted with it. ``rebuild`` recomputes the rows
+from the orders, for the initial backfill and after bulk changes that
+bypass the model (e.g. ``QuerySet.update``).
+
+``series`` answers a date range from the rollups, so its cost depends on the
+number of days, not on the number of orders.
+"""
+from collections import defaultdict
+
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import Order, OrderDailyRollup
+
+INTERVALS = {
+    'day': F('day'),
+    'week': TruncWeek('day'),
+    'month': TruncMonth('day'),
+}
+INSERT_BATCH_SIZE = 1000
+
+
+def contribution(order):
+    """
+    Return the rollup row and price an order counts in.
+
+    Args:
+        order: Order instance
+
+    Returns:
+        tuple: ((business user ID, day, offer type, status), price)
+    """
+    day = timezone.localdate(order.created_at)
+    return (order.business_user_id, day, order.offer_type, order.status), order.price
+
+
+def stored_contribution(order_id):
+    """
+    Return the rollup row and price of an order as stored in the database.
+
+    Args:
+        order_id: Order ID
+
+    Returns:
+        tuple: Same as ``contribution``, or None if the order does not exist
+    """
+    row = (Order.objects.filter(pk=order_id)
+           .values_list('business_user_id', 'created_at', 'offer_type', 'status', 'price')
+           .first())
+    if row is None:
+        return None
+    business_user_id, created_at, offer_type, status, price = row
+    return (business_user_id, timezone.localdate(created_at), offer_type, status), price
+
+
+def apply(changes):
+    """
+    Add order count and revenue changes to the rollup rows.
+
+    Args:
+        changes: Iterable of (row key, order count change, revenue change)
+    """
+    totals = defaultdict(lambda: [0, 0])
+    for key, count, revenue in changes:
+        totals[key][0] += count
+        totals[key][1] += revenue
+    additions = [(*key, count, revenue) for key, (count, revenue) in totals.items() if count > 0]
+    subtractions = [(count, revenue, *key) for key, (count, revenue) in totals.items() if count < 0]
+    if not additions and not subtractions:
+        return
+
+    connection = connections[router.db_for_write(OrderDailyRollup)]
+    quote = connection.ops.quote_name
+    table = quote(OrderDailyRollup._meta.db_table)
+    key_columns = ', '.join(quote(column) for column in ('business_user_id', 'day', 'offer_type', 'status'))
+    with connection.cursor() as cursor:
+        if additions:
+            cursor.executemany(
+                f'INSERT INTO {table} ({key_columns}, order_count, revenue) '
+                f'VALUES (%s, %s, %s, %s, %s, %s) '
+                f'ON CONFLICT ({key_columns}) DO UPDATE SET '
+                f'order_count = {table}.order_count + excluded.order_count, '
+                f'revenue = {table}.revenue + excluded.revenue',
+                [(user_id, connection.ops.adapt_datefield_value(day), offer_type, status, count, revenue)
+                 for user_id, day, offer_type, status, count, revenue in additions])
+        if subtractions:
+            cursor.executemany(
+                f'UPDATE {table} SET order_count = order_count + %s, revenue = revenue + %s '
+                f'WHERE business_user_id = %s AND day = %s AND offer_type = %s AND status = %s',
+                [(count, revenue, user_id, connection.ops.adapt_datefield_value(day), offer_type, status)
+                 for count, revenue, user_id, day, offer_type, status in subtractions])
+
+
+def record_created(orders):
+    """
+    Count new orders.
+
+    Args:
+        orders: Created Order instances
+    """
+    apply((key, 1, price) for key, price in map(contribution, orders))
+
+
+def record_change(before, order):
+    """
+    Move an order from the row it counted in to its current row.
+
+    Args:
+        before: ``contribution`` of the order before the change, or None
+        order: Changed Order instance
+    """
+    key, price = contribution(order)
+    changes = [(key, 1, price)]
+    if before is not None:
+        changes.append((before[0], -1, -before[1]))
+    apply(changes)
+
+
+def record_deleted(order):
+    """
+    Subtract a deleted order.
+
+    Args:
+        order: Deleted Order instance
+    """
+    key, price = contribution(order)
+    apply([(key, -1, -price)])
+
+
+def rebuild(business_user_ids=None, since=None):
+    """
+    Recompute rollup rows from the orders.
+
+    Args:
+        business_user_ids: Only rebuild the rows of these business users
+        since: Only rebuild the rows of this day and later
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    orders = Order.objects.order_by()
+    rollups = OrderDailyRollup.objects.all()
+    if business_user_ids is not None:
+        orders = orders.filter(business_user_id__in=business_user_ids)
+        rollups = rollups.filter(business_user_id__in=business_user_ids)
+    if since is not None:
+        orders = orders.filter(created_at__date__gte=since)
+        rollups = rollups.filter(day__gte=since)
+    rows = (orders.annotate(day=TruncDate('created_at'))
+            .values('business_user_id', 'day', 'offer_type', 'status')
+            .annotate(count=Count('pk'), amount=Sum('price')))
+
+    written = 0
+    with transaction.atomic():
+        rollups.delete()
+        batch = []
+        for row in rows.iterator(chunk_size=INSERT_BATCH_SIZE):
+            batch.append(OrderDailyRollup(
+                business_user_id=row['business_user_id'], day=row['day'],
+                offer_type=row['offer_type'], status=row['status'],
+                order_count=row['count'], revenue=row['amount'] or 0))
+            if len(batch) == INSERT_BATCH_SIZE:
+                written += len(OrderDailyRollup.objects.bulk_create(batch))
+                batch = []
+        written += len(OrderDailyRollup.objects.bulk_create(batch))
+    return written
+
+
+def series(business_user_id, start, end, interval='day'):
+    """
+    Sum a business user's rollups per period, offer type and status.
+
+    Args:
+        business_user_id: Business user ID
+        start: First day (inclusive)
+        end: Last day (inclusive)
+        interval: 'day', 'week' (starting Monday) or 'month'
+
+    Returns:
+        list: Dicts with period, offer_type, status, order_count and revenue,
+        ordered by period; combinations without orders are left out
+    """
+    rows = (OrderDailyRollup.objects
+            .filter(business_user_id=business_user_id, day__range=(start, end), order_count__gt=0)
+            .annotate(period=INTERVALS[interval])
+            .values('period', 'offer_type', 'status')
+            .annotate(count=Sum('order_count'), amount=Sum('revenue'))
+            .order_by('period', 'offer_type', 'status'))
+    return [{'period': row['period'], 'offer_type': row['offer_type'], 'status': row['status'],
+             'order_count': row['count'], 'revenue': row['amount']} for row in rows]
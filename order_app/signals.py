@@ -0,0 +1,52 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import rollups
+from .models import Order
+
+
+@receiver(pre_save, sender=Order)
+def remember_order_rollup(sender, instance, **kwargs):
+    """
+    Remember the rollup row an existing order counts in before it is saved.
+
+    Args:
+        sender: Order model class
+        instance: Order about to be saved
+        **kwargs: Signal arguments
+    """
+    if kwargs.get('raw') or instance._state.adding:
+        return
+    instance._rollup_before = rollups.stored_contribution(instance.pk)
+
+
+@receiver(post_save, sender=Order)
+def update_order_rollup_on_save(sender, instance, created, **kwargs):
+    """
+    Count a new order or move a changed one to its current rollup row.
+
+    Args:
+        sender: Order model class
+        instance: Saved order
+        created: True if the order was inserted
+        **kwargs: Signal arguments
+    """
+    if kwargs.get('raw'):
+        return
+    if created:
+        rollups.record_created([instance])
+    else:
+        rollups.record_change(instance.__dict__.pop('_rollup_before', None), instance)
+
+
+@receiver(post_delete, sender=Order)
+def update_order_rollup_on_delete(sender, instance, **kwargs):
+    """
+    Subtract a deleted order from its rollup row.
+
+    Args:
+        sender: Order model class
+        instance: Deleted order
+        **kwargs: Signal arguments
+    """
+    rollups.record_deleted(instance)
@@ -0,0 +1,146 @@
+"""
+Tests for the daily order rollups and the order analytics endpoint.
+"""
+import io
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from offer_app.models import Offer, OfferDetail
+from order_app import rollups
+from order_app.models import Order, OrderDailyRollup
+from profile_app.models import Profile
+
+
+class OrderRollupTests(APITestCase):
+    """Rollups follow every order change and match a rebuild."""
+
+    def setUp(self):
+        self.customer = User.objects.create_user(username='customer1', password='testpass123')
+        Profile.objects.create(user=self.customer, type='customer')
+        self.business = User.objects.create_user(username='business1', password='testpass123')
+        Profile.objects.create(user=self.business, type='business')
+        offer = Offer.objects.create(user=self.business, title='Logo', description='Logo design')
+        self.basic, self.premium = (
+            OfferDetail.objects.create(offer=offer, title=offer_type, revisions=1, delivery_time_in_days=3,
+                                       price=price, features=[], offer_type=offer_type)
+            for offer_type, price in (('basic', 100), ('premium', 400)))
+
+    def stored(self):
+        return sorted(OrderDailyRollup.objects.filter(order_count__gt=0)
+                      .values_list('business_user_id', 'day', 'offer_type', 'status', 'order_count', 'revenue'))
+
+    def assertMatchesRebuild(self):
+        stored = self.stored()
+        rollups.rebuild()
+        self.assertEqual(stored, self.stored())
+
+    def test_rollups_follow_order_changes(self):
+        """Create, checkout, status transitions, saves and deletes keep the rollups exact."""
+        self.client.force_authenticate(user=self.customer)
+        response = self.client.post(reverse('orders-list'), {'offer_detail_id': self.basic.id})
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post(reverse('orders-checkout'),
+                                    {'offer_detail_ids': [self.premium.id, self.premium.id, self.basic.id]},
+                                    format='json')
+        self.assertEqual(response.status_code, 201)
+        today = timezone.localdate()
+        self.assertEqual(self.stored(), [
+            (self.business.id, today, 'basic', 'in_progress', 2, 200),
+            (self.business.id, today, 'premium', 'in_progress', 2, 800),
+        ])
+
+        self.client.force_authenticate(user=self.business)
+        order_id = response.json()[0]['id']
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(reverse('orders-detail', args=[order_id]), {'status': 'completed'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn((self.business.id, today, 'premium', 'completed', 1, 400), self.stored())
+        self.assertMatchesRebuild()
+
+        order = Order.objects.get(pk=order_id)
+        order.created_at = timezone.now() - timedelta(days=3)
+        order.save()
+        self.assertMatchesRebuild()
+
+        Order.objects.filter(offer_detail=self.basic).first().delete()
+        self.assertMatchesRebuild()
+        self.premium.delete()
+        self.assertMatchesRebuild()
+        self.business.delete()
+        self.assertFalse(OrderDailyRollup.objects.exists())
+
+    def test_backfill_command(self):
+        """The command rebuilds all rows or only the requested ones."""
+        for day in (1, 2, 2):
+            order = Order.objects.create(offer_detail=self.basic, customer_user=self.customer,
+                                         business_user=self.business)
+            Order.objects.filter(pk=order.pk).update(
+                created_at=timezone.make_aware(datetime(2026, 5, day, 12)))
+        OrderDailyRollup.objects.all().delete()
+
+        out = io.StringIO()
+        call_command('backfill_order_rollups', '--since', '2026-05-02', stdout=out)
+        self.assertIn('1 rollup rows written', out.getvalue())
+        self.assertEqual(self.stored(), [(self.business.id, date(2026, 5, 2), 'basic', 'in_progress', 2, 200)])
+        call_command('backfill_order_rollups', '--business-user', str(self.business.id), stdout=out)
+        self.assertEqual(len(self.stored()), 2)
+
+
+class OrderAnalyticsTests(APITestCase):
+    """The analytics endpoint answers date ranges from the rollups."""
+
+    def setUp(self):
+        self.business = User.objects.create_user(username='business1', password='testpass123')
+        Profile.objects.create(user=self.business, type='business')
+        self.customer = User.objects.create_user(username='customer1', password='testpass123')
+        Profile.objects.create(user=self.customer, type='customer')
+        rows = [
+            (date(2026, 3, 2), 'basic', 'completed', 2, 200),
+            (date(2026, 3, 3), 'premium', 'completed', 1, 500),
+            (date(2026, 3, 9), 'basic', 'canceled', 1, 100),
+            (date(2026, 4, 1), 'basic', 'in_progress', 3, 300),
+        ]
+        OrderDailyRollup.objects.bulk_create(
+            OrderDailyRollup(business_user=self.business, day=day, offer_type=offer_type, status=status,
+                             order_count=count, revenue=revenue)
+            for day, offer_type, status, count, revenue in rows)
+        self.url = reverse('orders-analytics')
+        self.client.force_authenticate(user=self.business)
+
+    def test_intervals(self):
+        """Rows are summed per day, week or month within the range."""
+        params = {'start': '2026-03-01', 'end': '2026-03-31'}
+        with self.assertNumQueries(2):
+            data = self.client.get(self.url, {**params, 'interval': 'week'}).json()
+        self.assertEqual([(row['period'], row['offer_type'], row['status'], row['order_count'])
+                          for row in data['series']], [
+            ('2026-03-02', 'basic', 'completed', 2),
+            ('2026-03-02', 'premium', 'completed', 1),
+            ('2026-03-09', 'basic', 'canceled', 1),
+        ])
+        self.assertEqual(data['totals']['order_count'], 4)
+        self.assertEqual(data['totals']['revenue'], 700)
+        self.assertEqual(data['totals']['by_offer_type']['basic'], {'order_count': 3, 'revenue': 300})
+
+        data = self.client.get(self.url, {'start': '2026-03-01', 'end': '2026-04-30', 'interval': 'month'}).json()
+        self.assertEqual([(row['period'], row['offer_type'], row['status'], row['revenue'])
+                          for row in data['series']], [
+            ('2026-03-01', 'basic', 'canceled', 100), ('2026-03-01', 'basic', 'completed', 200),
+            ('2026-03-01', 'premium', 'completed', 500), ('2026-04-01', 'basic', 'in_progress', 300),
+        ])
+        self.assertEqual(len(self.client.get(self.url, params).json()['series']), 3)
+
+    def test_validation_and_permissions(self):
+        """Invalid ranges are rejected and only business users get analytics."""
+        self.assertEqual(self.client.get(self.url, {'start': '2026-04-01', 'end': '2026-03-01'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'start': '2000-01-01', 'end': '2026-03-01'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'interval': 'year'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url).json()['start'],
+                         str(timezone.localdate() - timedelta(days=29)))
+        self.client.force_authenticate(user=self.customer)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -1,7 +1,14 @@
 """
 Tests for order management functionality.
 """
-from rest_framework.test import APITestCase
+import threading
+from unittest import mock
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.test import APIClient, APITestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
 from offer_app.models import Offer, OfferDetail
@@ -393,3 +400,272 @@ class OrderAPIUnhappyPathTests(APITestCase):
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class OrderDetailQueryTests(APITestCase):
+    """The order detail path loads the order once and reuses it for permissions."""
+
+    def setUp(self):
+        """Set up a customer, two business users, a user without profile and an order."""
+        self.customer = User.objects.create_user(username='customer1', password='testpass123')
+        Profile.objects.create(user=self.customer, type='customer')
+        self.business = User.objects.create_user(username='business1', password='testpass123')
+        Profile.objects.create(user=self.business, type='business')
+        self.other_business = User.objects.create_user(username='business2', password='testpass123')
+        Profile.objects.create(user=self.other_business, type='business')
+        self.no_profile = User.objects.create_user(username='plain', password='testpass123')
+
+        offer = Offer.objects.create(user=self.business, title='Offer', description='Description')
+        offer_detail = OfferDetail.objects.create(
+            offer=offer, title='Basic Package', revisions=3, delivery_time_in_days=5,
+            price=150, features=['Feature 1'], offer_type='basic')
+        self.order = Order.objects.create(
+            offer_detail=offer_detail, customer_user=self.customer, business_user=self.business)
+        self.url = reverse('orders-detail', kwargs={'pk': self.order.id})
+
+    def test_status_update_loads_the_order_once(self):
+        """Test that a status PATCH needs one SELECT and one UPDATE besides the rollups."""
+        self.client.force_authenticate(user=self.business)
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(self.url, {'status': 'completed'}, format='json')
+
+        statements = [query['sql'] for query in queries.captured_queries
+                      if not query['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))]
+        self.assertEqual(len(statements), 4)
+        self.assertEqual([sql.split()[0] for sql in statements[:2]], ['SELECT', 'UPDATE'])
+        self.assertTrue(all('orderdailyrollup' in sql for sql in statements[2:]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'completed')
+        self.assertEqual(response.data['title'], 'Basic Package')
+
+    def test_retrieve_loads_the_order_once(self):
+        """Test that retrieve computes validators and the response from one query."""
+        self.client.force_authenticate(user=self.customer)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+
+    def test_missing_order_is_404_before_403(self):
+        """Test that users without permission still get 404 for a missing order."""
+        url = reverse('orders-detail', kwargs={'pk': 99999})
+        for user in (self.customer, self.no_profile):
+            with self.subTest(user=user.username):
+                self.client.force_authenticate(user=user)
+                response = self.client.patch(url, {'status': 'completed'}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_users_not_owning_the_order_cannot_update_it(self):
+        """Test that other business users and users without profile get 403."""
+        for user in (self.other_business, self.no_profile, self.customer):
+            with self.subTest(user=user.username):
+                self.client.force_authenticate(user=user)
+                response = self.client.patch(self.url, {'status': 'completed'}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'in_progress')
+
+
+class OrderStatusTransitionTests(APITestCase):
+    """Status changes follow the transition table and only write status and updated_at."""
+
+    def setUp(self):
+        """Set up a customer, a business user and an in-progress order."""
+        self.customer = User.objects.create_user(username='customer1', password='testpass123')
+        Profile.objects.create(user=self.customer, type='customer')
+        self.business = User.objects.create_user(username='business1', password='testpass123')
+        Profile.objects.create(user=self.business, type='business')
+        offer = Offer.objects.create(user=self.business, title='Offer', description='Description')
+        offer_detail = OfferDetail.objects.create(
+            offer=offer, title='Basic Package', revisions=3, delivery_time_in_days=5,
+            price=150, features=['Feature 1'], offer_type='basic')
+        self.order = Order.objects.create(
+            offer_detail=offer_detail, customer_user=self.customer, business_user=self.business)
+        self.url = reverse('orders-detail', kwargs={'pk': self.order.id})
+        self.client.force_authenticate(user=self.business)
+
+    def test_finished_orders_cannot_change_status(self):
+        """Test that transitions outside the table return 409."""
+        cases = (('completed', 'canceled'), ('canceled', 'completed'),
+                 ('completed', 'in_progress'), ('in_progress', 'in_progress'))
+        for current, target in cases:
+            with self.subTest(current=current, target=target):
+                Order.objects.filter(pk=self.order.pk).update(status=current)
+                response = self.client.patch(self.url, {'status': target}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+                self.order.refresh_from_db()
+                self.assertEqual(self.order.status, current)
+
+    def test_put_uses_the_same_transitions(self):
+        """Test that PUT only changes the status, through the transition table."""
+        response = self.client.put(self.url, {'status': 'completed', 'price': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.put(self.url, {'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.put(self.url, {'status': 'in_progress'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.order.refresh_from_db()
+        self.assertEqual((self.order.status, self.order.price), ('completed', 150))
+
+    def test_update_writes_only_status_and_updated_at(self):
+        """Test that the transition is one conditional UPDATE of two columns."""
+        before = self.order.updated_at
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(self.url, {'status': 'completed'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        updates = [query['sql'] for query in queries.captured_queries
+                   if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        set_clause = updates[0].split(' SET ')[1].split(' WHERE ')[0]
+        self.assertEqual(sorted(part.split(' = ')[0].strip('"') for part in set_clause.split(', ')),
+                         ['status', 'updated_at'])
+        self.assertIn('"status" = \'in_progress\'', updates[0].split(' WHERE ')[1])
+        self.order.refresh_from_db()
+        self.assertGreater(self.order.updated_at, before)
+        self.assertEqual(response.data['updated_at'], serializers.DateTimeField().to_representation(
+            self.order.updated_at))
+
+    def test_stale_transition_returns_409(self):
+        """Test that an order changed after it was loaded is not overwritten."""
+        stale = Order.objects.get(pk=self.order.pk)
+        self.assertTrue(Order.objects.get(pk=self.order.pk).transition_to('canceled'))
+        self.assertFalse(stale.transition_to('completed'))
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, 'canceled')
+
+
+class OrderStatusConcurrencyTests(TransactionTestCase):
+    """Parallel status PATCHes for one order: exactly one wins."""
+
+    def setUp(self):
+        """Set up a business user with an in-progress order."""
+        customer = User.objects.create_user(username='customer1', password='testpass123')
+        Profile.objects.create(user=customer, type='customer')
+        self.business = User.objects.create_user(username='business1', password='testpass123')
+        Profile.objects.create(user=self.business, type='business')
+        offer = Offer.objects.create(user=self.business, title='Offer', description='Description')
+        offer_detail = OfferDetail.objects.create(
+            offer=offer, title='Basic Package', revisions=3, delivery_time_in_days=5,
+            price=150, features=['Feature 1'], offer_type='basic')
+        self.order = Order.objects.create(
+            offer_detail=offer_detail, customer_user=customer, business_user=self.business)
+
+    def test_parallel_transitions(self):
+        """Test that of parallel transitions one returns 200 and the others 409."""
+        targets = ['completed', 'canceled'] * 4
+        barrier = threading.Barrier(len(targets))
+        transition_to = Order.transition_to
+        results = {}
+
+        def synchronized_transition(order, new_status):
+            # every request has loaded and validated the order before any UPDATE runs
+            barrier.wait(timeout=10)
+            return transition_to(order, new_status)
+
+        def send(index, target):
+            client = APIClient()
+            client.force_authenticate(user=self.business)
+            try:
+                response = client.patch(reverse('orders-detail', kwargs={'pk': self.order.pk}),
+                                        {'status': target}, format='json')
+                results[index] = (target, response.status_code)
+            finally:
+                connection.close()
+
+        with mock.patch.object(Order, 'transition_to', synchronized_transition):
+            threads = [threading.Thread(target=send, args=item) for item in enumerate(targets)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        codes = sorted(code for _, code in results.values())
+        self.assertEqual(codes, [status.HTTP_200_OK] + [status.HTTP_409_CONFLICT] * (len(targets) - 1))
+        winner = next(target for target, code in results.values() if code == status.HTTP_200_OK)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, winner)
+
+
+class OrderCheckoutTests(APITestCase):
+    """Tests for creating several orders in one request."""
+
+    def setUp(self):
+        """Set up a customer, two business users with offers and their details."""
+        self.customer = User.objects.create_user(username='customer1', password='testpass123')
+        Profile.objects.create(user=self.customer, type='customer')
+        self.businesses = []
+        self.details = []
+        for index in range(2):
+            business = User.objects.create_user(username=f'business{index}', password='testpass123')
+            Profile.objects.create(user=business, type='business')
+            offer = Offer.objects.create(user=business, title=f'Offer {index}', description='Description')
+            self.businesses.append(business)
+            self.details.extend(
+                OfferDetail.objects.create(
+                    offer=offer, title=f'{offer_type} {index}', revisions=1, delivery_time_in_days=5,
+                    price=price, features=['Feature'], offer_type=offer_type)
+                for offer_type, price in (('basic', 100), ('premium', 300)))
+        self.url = reverse('orders-checkout')
+        self.client.force_authenticate(user=self.customer)
+
+    def test_checkout_creates_all_orders(self):
+        """Test that every requested detail becomes an order of the right business user."""
+        ids = [self.details[0].id, self.details[3].id, self.details[0].id]
+        response = self.client.post(self.url, {'offer_detail_ids': ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([order['title'] for order in response.data], ['basic 0', 'premium 1', 'basic 0'])
+        self.assertEqual([order['business_user'] for order in response.data],
+                         [self.businesses[0].id, self.businesses[1].id, self.businesses[0].id])
+        self.assertTrue(all(order['customer_user'] == self.customer.id
+                            and order['status'] == 'in_progress' and order['id']
+                            for order in response.data))
+        self.assertNotIn('updated_at', response.data[0])
+        self.assertEqual(Order.objects.filter(customer_user=self.customer).count(), 3)
+
+    def test_checkout_query_count_does_not_grow_with_items(self):
+        """Test that details are resolved in one query and inserted in one statement."""
+        ids = [detail.id for detail in self.details] * 5
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'offer_detail_ids': ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 20)
+        statements = [query['sql'] for query in queries.captured_queries
+                      if not query['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT'))]
+        self.assertEqual([sql.split()[0] for sql in statements[:3]], ['SELECT', 'SELECT', 'INSERT'])
+        # one executemany upsert of the daily rollups
+        self.assertEqual(len(statements), 4)
+        self.assertIn('orderdailyrollup', statements[3])
+
+    def test_unknown_detail_creates_nothing(self):
+        """Test that one unknown ID rejects the whole checkout with 404."""
+        response = self.client.post(
+            self.url, {'offer_detail_ids': [self.details[0].id, 99998, 99999]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn('99998, 99999', response.data['detail'])
+        self.assertFalse(Order.objects.exists())
+
+    def test_invalid_payloads(self):
+        """Test that empty, oversized and malformed lists are rejected."""
+        payloads = ({}, {'offer_detail_ids': []}, {'offer_detail_ids': ['abc']},
+                    {'offer_detail_ids': [self.details[0].id] * 51})
+        for payload in payloads:
+            with self.subTest(payload=str(payload)[:40]):
+                response = self.client.post(self.url, payload, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_only_customers_can_check_out(self):
+        """Test that business users and anonymous users cannot check out."""
+        payload = {'offer_detail_ids': [self.details[0].id]}
+        self.client.force_authenticate(user=self.businesses[0])
+        self.assertEqual(self.client.post(self.url, payload, format='json').status_code,
+                         status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.post(self.url, payload, format='json').status_code,
+                         status.HTTP_401_UNAUTHORIZED)
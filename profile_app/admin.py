@@ -1,15 +1,20 @@
 from django.contrib import admin
 
+from core.admin import LargeTableAdmin
+
 from .models import Profile
 
 
 @admin.register(Profile)
-class ProfileAdmin(admin.ModelAdmin):
+class ProfileAdmin(LargeTableAdmin):
     """Admin configuration for Profile model."""
     
     list_display = ['user', 'type', 'first_name', 'last_name', 'location', 'created_at']
     list_filter = ['type', 'created_at']
-    search_fields = ['user__username', 'user__email', 'first_name', 'last_name']
+    list_select_related = ['user']
+    search_fields = ['id', 'user__username']
+    search_help_text = 'Profile ID or exact username'
+    raw_id_fields = ['user']
     readonly_fields = ['created_at']
 
 # Register your models here.
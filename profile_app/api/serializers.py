@@ -2,6 +2,8 @@ from collections import OrderedDict
 
 from rest_framework import serializers
 
+from core.thumbnails import variant_urls
+
 from ..models import Profile
 
 
@@ -18,12 +20,26 @@ class ProfileSerializer(serializers.ModelSerializer):
     username = serializers.CharField(
         source='user.username', read_only=True)
     email = serializers.EmailField(required=False)
+    file_thumbnails = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = Profile
-        fields = ['user', 'username', 'first_name', 'last_name', 'file', 'location',
-                  'tel', 'description',  'working_hours', 'type', 'email', 'created_at', ]
-        read_only_fields = ['created_at', 'type', 'user', 'username']
+        fields = ['user', 'username', 'first_name', 'last_name', 'file', 'file_thumbnails',
+                  'location', 'tel', 'description',  'working_hours', 'type', 'email',
+                  'created_at', ]
+        read_only_fields = ['created_at', 'type', 'user', 'username', 'file_thumbnails']
+
+    def get_file_thumbnails(self, obj):
+        """
+        Get URLs of the resized profile picture variants.
+
+        Args:
+            obj: Profile instance
+
+        Returns:
+            dict: 'avatar' URL, None while not generated yet
+        """
+        return variant_urls(obj.file, obj.file_variants, ('avatar',), self.context.get('request'))
 
     def to_representation(self, instance):
         """
@@ -46,8 +62,9 @@ class ProfileSerializer(serializers.ModelSerializer):
                 data[field] = ''
 
         data['email'] = instance.user.email or ""
-        field_order = ['user', 'username', 'first_name', 'last_name', 'file', 'location',
-                       'tel', 'description',  'working_hours', 'type', 'email', 'created_at', ]
+        field_order = ['user', 'username', 'first_name', 'last_name', 'file', 'file_thumbnails',
+                       'location', 'tel', 'description',  'working_hours', 'type', 'email',
+                       'created_at', ]
 
         ordered = OrderedDict()
         for field in field_order:
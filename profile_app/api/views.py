@@ -1,8 +1,14 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, mixins
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
 
+from core.async_views import AsyncAPIViewMixin
+from core.conditional import not_modified_response, object_validators, set_validators
+from core.uploads import ImageUploadMixin
 from ..models import Profile
 from .permissions import IsOwnerOrReadOnly
 from .serializers import (
@@ -13,12 +19,15 @@ from .serializers import (
 )
 
 
-class ProfileDetailView(generics.RetrieveAPIView, mixins.UpdateModelMixin):
+class ProfileDetailView(ImageUploadMixin, AsyncAPIViewMixin, generics.RetrieveAPIView, mixins.UpdateModelMixin):
     """
     API view for retrieving and updating user profiles.
 
     Allows authenticated users to view any profile,
     but only profile owners can update their own profile.
+    GET is served by the async ORM and supports conditional requests based on
+    the profile's updated_at; PATCH keeps the synchronous update path and
+    streams the profile picture through ImageUploadMixin.
     """
 
     serializer_class = ProfileSerializer
@@ -41,7 +50,25 @@ class ProfileDetailView(generics.RetrieveAPIView, mixins.UpdateModelMixin):
         self.check_object_permissions(self.request, obj)
         return obj
 
-    def get(self, request, *args, **kwargs):
+    async def aget_object(self):
+        """
+        Async counterpart of get_object with the related user joined.
+
+        Returns:
+            Profile: The requested profile instance
+
+        Raises:
+            Http404: If profile doesn't exist
+            PermissionDenied: If user lacks required permissions
+        """
+        try:
+            obj = await Profile.objects.select_related('user').aget(user_id=self.kwargs['pk'])
+        except Profile.DoesNotExist:
+            raise Http404('No Profile matches the given query.')
+        await sync_to_async(self.check_object_permissions)(self.request, obj)
+        return obj
+
+    async def get(self, request, *args, **kwargs):
         """
         Handle GET requests to retrieve a profile.
 
@@ -51,9 +78,16 @@ class ProfileDetailView(generics.RetrieveAPIView, mixins.UpdateModelMixin):
             **kwargs: Arbitrary keyword arguments
 
         Returns:
-            Response: Profile data
+            Response: Profile data or 304 Not Modified
         """
-        return self.retrieve(request, *args, **kwargs)
+        instance = await self.aget_object()
+        etag, last_modified = object_validators((instance.pk, instance.updated_at))
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), etag, last_modified)
 
     def patch(self, request, *args, **kwargs):
         """
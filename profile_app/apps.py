@@ -5,3 +5,7 @@ class ProfileAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'profile_app'
     verbose_name = 'Profiles'
+
+    def ready(self):
+        """Connect signal handlers generating profile picture variants."""
+        from . import signals  # noqa: F401
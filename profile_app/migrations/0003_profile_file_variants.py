@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profile_app', '0002_alter_profile_options_profile_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='file_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
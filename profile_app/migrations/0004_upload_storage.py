@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:32
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profile_app', '0003_profile_file_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='file',
+            field=models.FileField(blank=True, null=True, storage=core.storage.get_upload_storage, upload_to='profiles/'),
+        ),
+    ]
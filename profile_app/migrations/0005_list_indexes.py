@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profile_app', '0004_upload_storage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['type', 'created_at'], name='profile_type_created_at_idx'),
+        ),
+    ]
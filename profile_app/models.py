@@ -1,6 +1,8 @@
 from django.contrib.auth.models import User
 from django.db import models
 
+from core.storage import get_upload_storage
+
 
 class Profile(models.Model):
     """
@@ -13,7 +15,9 @@ class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     first_name = models.CharField(max_length=30, null=True, blank=True)
     last_name = models.CharField(max_length=30, null=True, blank=True)
-    file = models.FileField(upload_to='profiles/', null=True, blank=True)
+    file = models.FileField(
+        upload_to='profiles/', storage=get_upload_storage, null=True, blank=True)
+    file_variants = models.JSONField(default=dict, blank=True, editable=False)
     location = models.CharField(max_length=100, null=True, blank=True)
     tel = models.CharField(max_length=15, null=True, blank=True)
     description = models.TextField(null=True, blank=True)
@@ -21,7 +25,12 @@ class Profile(models.Model):
     type = models.CharField(max_length=50, choices=[(
         'customer', 'customer'), ('business', 'business')], default='customer')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
     class Meta:
         verbose_name = 'Profile'
         verbose_name_plural = 'Profiles'
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['type', 'created_at'], name='profile_type_created_at_idx'),
+        ]
\ No newline at end of file
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core import thumbnails
+
+from .models import Profile
+
+PROFILE_IMAGE_VARIANTS = ('avatar',)
+
+
+@receiver(post_save, sender=Profile)
+def generate_profile_image_variants(sender, instance, **kwargs):
+    """
+    Schedule the avatar variant for a new or replaced profile picture.
+
+    Args:
+        sender: Profile model class
+        instance: Saved profile
+        **kwargs: Signal arguments
+    """
+    if kwargs.get('raw'):
+        return
+    if thumbnails.needs_variants(instance.file, instance.file_variants):
+        thumbnails.schedule(Profile, instance.pk, 'file', 'file_variants', PROFILE_IMAGE_VARIANTS)
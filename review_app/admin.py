@@ -1,15 +1,21 @@
 from django.contrib import admin
 
+from core.admin import LargeTableAdmin
+
 from .models import Review
 
 
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(LargeTableAdmin):
     """Admin configuration for Review model."""
     
     list_display = ['reviewer', 'business_user', 'rating', 'created_at']
     list_filter = ['rating', 'created_at']
-    search_fields = ['reviewer__username', 'business_user__username', 'description']
+    # both users are also read by Review.__str__
+    list_select_related = ['reviewer', 'business_user']
+    search_fields = ['id', 'reviewer__username', 'business_user__username']
+    search_help_text = 'Review ID or exact username of the reviewer or business user'
+    raw_id_fields = ['reviewer', 'business_user']
     readonly_fields = ['created_at', 'updated_at']
 
 # Register your models here.
@@ -3,17 +3,21 @@ from rest_framework import filters as drf_filters
 from rest_framework import status, viewsets
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
+from core.conditional import ConditionalGetMixin
+from core.idempotency import IdempotentCreateMixin
 from ..filters.review_filter import ReviewFilter
 from ..models import Review
 from .permissions import IsCustomer, IsReviewer
 from .serializers import ReviewSerializer
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(IdempotentCreateMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing reviews.
 
     Provides CRUD operations with filtering and ordering capabilities.
     Customers can create reviews, only reviewers can update/delete their own reviews.
+    List and retrieve support conditional GET via ETag / Last-Modified.
+    Create honours the Idempotency-Key header.
     """
 
     serializer_class = ReviewSerializer
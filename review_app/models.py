@@ -19,7 +19,12 @@ class Review(models.Model):
     class Meta:
         verbose_name = 'Review'
         verbose_name_plural = 'Reviews'
-        ordering = ['-created_at']    
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['updated_at'], name='review_updated_at_idx'),
+            models.Index(fields=['rating'], name='review_rating_idx'),
+        ]
+    
     def __str__(self):
         """
         Return string representation of the review.